@@ -1,16 +1,25 @@
-"""
-ASGI config for backend project.
-
-It exposes the ASGI callable as a module-level variable named ``application``.
-
-For more information on this file, see
-https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
-"""
-
-import os
-
-from django.core.asgi import get_asgi_application
-
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
-
-application = get_asgi_application()
+"""
+ASGI config for backend project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with gunicorn and uvicorn workers (see ``gunicorn.conf.py``):
+
+    gunicorn backend.asgi:application -c gunicorn.conf.py
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+# Public read endpoints run as async views, so slow clients wait on the event
+# loop instead of holding the thread shared by sync views.
+os.environ.setdefault("ASYNC_READ_VIEWS", "True")
+# Persistent connections are per thread and async requests hop between
+# threads, so reuse would leak connections.
+os.environ.setdefault("DATABASE_CONN_MAX_AGE", "0")
+
+application = get_asgi_application()
@@ -0,0 +1,138 @@
+"""
+Async counterparts of the DRF view machinery for ASGI deployments.
+
+DRF dispatches synchronously, which under ASGI runs every request on the
+single thread shared by sync views. ``AsyncAPIViewMixin`` gives a view an
+async ``dispatch``, so a worker can serve many slow clients from one event
+loop while the blocking parts (authentication, throttling, serialization
+that touches the database) are offloaded with ``sync_to_async``.
+
+Async views cannot run inside ``ATOMIC_REQUESTS`` transactions, so they are
+marked non-atomic; use them for read-only endpoints only.
+"""
+
+from functools import wraps
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.db import transaction
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.http import condition
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+
+
+class AsyncAPIViewMixin:
+    """
+    Mixin for ``APIView`` subclasses whose handlers are ``async def``.
+
+    Must come before the DRF view class in the bases. ``options`` is made
+    async as well, since Django requires all handlers of a view to agree.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return transaction.non_atomic_requests(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentication may load the user and throttling hits the cache.
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def options(self, request, *args, **kwargs):
+        return await sync_to_async(super().options)(request, *args, **kwargs)
+
+    async def aget_object(self):
+        """Async ``get_object`` for ``GenericAPIView`` subclasses."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        obj = await aget_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate_queryset(self, queryset):
+        """
+        Async ``paginate_queryset`` for ``PageNumberPagination``.
+
+        The count and the page rows are fetched with the async ORM; the DRF
+        paginator is then left in the same state as after its own
+        ``paginate_queryset``, so ``get_paginated_response`` works unchanged.
+        """
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        if not isinstance(paginator, PageNumberPagination):
+            return await sync_to_async(self.paginate_queryset)(queryset)
+
+        request = self.request
+        page_size = paginator.get_page_size(request)
+        if not page_size:
+            return None
+
+        django_paginator = paginator.django_paginator_class(queryset, page_size)
+        # ``count`` is a cached property; prime it so ``page()`` does not query.
+        django_paginator.count = await queryset.acount()
+        page_number = paginator.get_page_number(request, django_paginator)
+        try:
+            paginator.page = django_paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = paginator.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if django_paginator.num_pages > 1 and paginator.template is not None:
+            paginator.display_page_controls = True
+        paginator.request = request
+        return [row async for row in paginator.page.object_list]
+
+
+def async_condition(etag_func=None, last_modified_func=None):
+    """
+    ``condition`` for async view methods.
+
+    Django's ``condition`` calls the validators inside the event loop, where
+    the ORM refuses to run; here they are computed in a worker thread first and
+    the precomputed values are handed to ``condition``.
+    """
+
+    def decorator(handler):
+        @wraps(handler)
+        async def wrapper(self, request, *args, **kwargs):
+            etag = last_modified = None
+            if etag_func is not None:
+                etag = await sync_to_async(etag_func)(request, *args, **kwargs)
+            if last_modified_func is not None:
+                last_modified = await sync_to_async(last_modified_func)(request, *args, **kwargs)
+
+            async def view(request, *args, **kwargs):
+                return await handler(self, request, *args, **kwargs)
+
+            conditional = condition(
+                etag_func=(lambda *a, **kw: etag) if etag_func else None,
+                last_modified_func=(lambda *a, **kw: last_modified) if last_modified_func else None,
+            )
+            return await conditional(view)(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
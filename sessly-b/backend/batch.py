@@ -0,0 +1,156 @@
+"""
+Batch endpoint: several GET requests to the API in one round trip.
+
+Sub-requests are dispatched in-process to the regular views, with the
+batch request's user forced onto them, so authentication runs once and
+every item gets exactly the body and status the view would return on its
+own.
+"""
+
+import logging
+from urllib.parse import urlsplit
+
+import orjson
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connections, transaction
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import resolve, reverse
+from rest_framework import serializers, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+# Request metadata that belongs to the batch request itself.
+_DROPPED_META = (
+    "CONTENT_LENGTH",
+    "CONTENT_TYPE",
+    "HTTP_IF_MATCH",
+    "HTTP_IF_MODIFIED_SINCE",
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_IF_UNMODIFIED_SINCE",
+    "wsgi.input",
+)
+
+
+def _item_view(func):
+    """
+    Wrap a resolved view the way the request handler would.
+
+    Mirrors ``BaseHandler.make_view_atomic``: with ``ATOMIC_REQUESTS`` every
+    sync item runs in its own (nested) transaction, so an item whose error
+    handling marks it for rollback does not poison the items after it.
+    """
+    if iscoroutinefunction(func):
+        return async_to_sync(func)
+    non_atomic_requests = getattr(func, "_non_atomic_requests", set())
+    for alias, settings_dict in connections.settings.items():
+        if settings_dict["ATOMIC_REQUESTS"] and alias not in non_atomic_requests:
+            func = transaction.atomic(using=alias)(func)
+    return func
+
+
+class BatchItemSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=["GET"], default="GET")
+    path = serializers.CharField(max_length=2048)
+
+    def validate_path(self, value):
+        path = urlsplit(value).path
+        if not path.startswith("/api/"):
+            raise serializers.ValidationError("Dozwolone sa tylko sciezki /api/.")
+        if path == reverse("api-batch"):
+            raise serializers.ValidationError("Zapytania zbiorcze nie moga byc zagniezdzone.")
+        return value
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    requests = serializers.ListField(child=BatchItemSerializer(), allow_empty=False)
+
+    def validate_requests(self, value):
+        limit = settings.BATCH_MAX_REQUESTS
+        if len(value) > limit:
+            raise serializers.ValidationError(f"Maksymalna liczba zapytan w paczce to {limit}.")
+        return value
+
+
+class BatchView(APIView):
+    """
+    POST /api/batch/ with ``{"requests": [{"path": "/api/users/me/"}, ...]}``.
+
+    Returns ``{"responses": [{"path", "status", "body"}, ...]}`` in request
+    order; a failing item does not fail the batch. Streaming endpoints
+    (exports, event streams) cannot be batched and answer 400.
+    """
+
+    permission_classes = (AllowAny,)
+
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        responses = [
+            self.dispatch_item(request, item["path"])
+            for item in serializer.validated_data["requests"]
+        ]
+        return Response({"responses": responses}, status=status.HTTP_200_OK)
+
+    def build_subrequest(self, request, path, query):
+        outer = request._request
+        sub = HttpRequest()
+        sub.method = "GET"
+        sub.path = sub.path_info = path
+        sub.META = {key: value for key, value in outer.META.items() if key not in _DROPPED_META}
+        sub.META.update(
+            REQUEST_METHOD="GET",
+            PATH_INFO=path,
+            QUERY_STRING=query,
+            HTTP_ACCEPT="application/json",
+        )
+        sub.GET = QueryDict(query)
+        sub.COOKIES = outer.COOKIES
+        if hasattr(outer, "user"):
+            sub.user = outer.user
+        if request.user.is_authenticated:
+            # Picked up by DRF's Request: the user authenticated for the batch
+            # is reused instead of authenticating every item again.
+            sub._force_auth_user = request.user
+            sub._force_auth_token = request.auth
+        return sub
+
+    def dispatch_item(self, request, target):
+        split = urlsplit(target)
+        result = {"path": target}
+        try:
+            match = resolve(split.path)
+            sub = self.build_subrequest(request, split.path, split.query)
+            sub.resolver_match = match
+            response = _item_view(match.func)(sub, *match.args, **match.kwargs)
+            if response.streaming:
+                # Never read: an event stream does not end.
+                response.close()
+                result.update(
+                    status=status.HTTP_400_BAD_REQUEST,
+                    body={"detail": "Odpowiedzi strumieniowe nie sa obslugiwane w paczce."},
+                )
+            else:
+                if hasattr(response, "render"):
+                    response.render()
+                result.update(status=response.status_code, body=self.item_body(response))
+        except Http404:
+            result.update(status=status.HTTP_404_NOT_FOUND, body={"detail": "Nie znaleziono."})
+        except PermissionDenied:
+            result.update(status=status.HTTP_403_FORBIDDEN, body={"detail": "Brak uprawnien."})
+        except Exception:
+            logger.exception("Batch item %s failed", target)
+            result.update(status=status.HTTP_500_INTERNAL_SERVER_ERROR, body=None)
+        return result
+
+    @staticmethod
+    def item_body(response):
+        if not response.content:
+            return None
+        if response.get("Content-Type", "").startswith("application/json"):
+            return orjson.loads(response.content)
+        return response.content.decode(response.charset, errors="replace")
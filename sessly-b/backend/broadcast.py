@@ -0,0 +1,143 @@
+"""
+In-process fan-out of change notifications to async subscribers.
+
+``Broadcaster.publish`` may be called from any thread (signal handlers,
+``on_commit`` callbacks of sync views); every subscriber is woken on its own
+event loop. Notifications are not queued per subscriber beyond a single
+pending one: they mean "something changed, re-read", so a burst of changes
+collapses into one wake-up.
+
+Without a relay only subscribers in the same process are reached, since each
+ASGI worker keeps its own broadcaster. With a ``RedisRelay`` every
+publication goes through a Redis pub/sub channel and reaches the
+subscribers of all workers.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=1)
+
+    def notify(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The subscriber's loop is closed; it is about to unsubscribe.
+            pass
+
+    def _put(self, event):
+        if not self._queue.full():
+            self._queue.put_nowait(event)
+
+    async def wait(self, timeout=None):
+        """Return the next notification, or raise ``TimeoutError``."""
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class RedisRelay:
+    """
+    Carries publications between processes over one Redis pub/sub channel.
+
+    Publishing sends to the channel instead of notifying directly; a listener
+    thread, started with the first subscriber of the process, hands every
+    message back to its broadcaster, including the process's own. Keys and
+    events must be JSON serialisable (tuple keys arrive as tuples).
+    """
+
+    def __init__(self, url, channel):
+        self.url = url
+        self.channel = channel
+        self._client = None
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def _redis(self):
+        if self._client is None:
+            import redis  # only needed when a relay is configured
+
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    @property
+    def listening(self):
+        return self._listener is not None
+
+    def send(self, key, event=None):
+        self._redis().publish(self.channel, orjson.dumps([key, event]))
+
+    def listen(self, deliver):
+        """Start handing received messages to ``deliver(key, event)``, once per process."""
+        with self._lock:
+            if self._listener is not None:
+                return
+
+            def handle(message):
+                key, event = orjson.loads(message["data"])
+                deliver(tuple(key) if isinstance(key, list) else key, event)
+
+            pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: handle})
+            self._listener = pubsub.run_in_thread(
+                sleep_time=1.0, daemon=True, exception_handler=self._listener_failed
+            )
+
+    @staticmethod
+    def _listener_failed(exc, pubsub, thread):
+        # The pub/sub connection reconnects and resubscribes on the next read.
+        logger.warning("Broadcast relay connection failed: %s", exc)
+        time.sleep(1)
+
+
+class Broadcaster:
+    def __init__(self, relay=None):
+        self.relay = relay
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, key, event=None):
+        if self.relay is not None:
+            self.relay.send(key, event)
+        else:
+            self.deliver(key, event)
+
+    def deliver(self, key, event=None):
+        """Notify the subscribers of ``key`` in this process."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        for subscription in subscribers:
+            subscription.notify(event)
+
+    def has_subscribers(self, key=None):
+        with self._lock:
+            if key is None:
+                return bool(self._subscribers)
+            return key in self._subscribers
+
+    @asynccontextmanager
+    async def subscribe(self, key):
+        if self.relay is not None and not self.relay.listening:
+            await asyncio.to_thread(self.relay.listen, self.deliver)
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[key].add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(key)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[key]
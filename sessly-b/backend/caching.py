@@ -0,0 +1,355 @@
+"""
+Caching helpers shared by the read-heavy API endpoints.
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import LRUCache
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+# Renderer formats whose output is identical for every client and therefore
+# safe to store; the browsable API embeds per-request HTML.
+CACHEABLE_FORMATS = {"json", "msgpack"}
+
+
+def response_caches_enabled():
+    """
+    Whether the tag-versioned caches below may be used at all; they need a
+    cache shared by every worker (see ``RESPONSE_CACHES_ENABLED``).
+    """
+    return settings.RESPONSE_CACHES_ENABLED
+
+
+def _tag_key(namespace, tag):
+    return f"cachetag:{namespace}:{tag}"
+
+
+def get_tag_versions(namespace, tags):
+    """
+    Return the current version of every tag, creating missing ones.
+
+    Versions live in the shared Django cache so that an invalidation in one
+    process is seen by all of them. A missing version is initialised with a
+    fresh timestamp rather than a constant, so an evicted tag can never
+    resurrect entries stored under its previous version.
+    """
+    keys = {tag: _tag_key(namespace, tag) for tag in tags}
+    stored = cache.get_many(list(keys.values()))
+    versions = {}
+    for tag, key in keys.items():
+        version = stored.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        versions[tag] = version
+    return versions
+
+
+def invalidate_tags(namespace, tags):
+    """Bump the version of every tag, orphaning the entries stored under it."""
+    cache.set_many(
+        {_tag_key(namespace, tag): time.time_ns() for tag in set(tags)},
+        timeout=None,
+    )
+
+
+class TaggedPayloadCache:
+    """
+    Process-local LRU of rendered response bodies with tag-based invalidation.
+
+    Every entry key embeds the versions of its tags (see ``make_key``), so
+    bumping a tag with ``invalidate_tags`` makes all entries carrying it
+    unreachable; the LRU then evicts them as new payloads arrive. The LRU is bounded by the total
+    size of the stored payloads in bytes.
+
+    Args:
+        namespace: Prefix separating tag versions of different caches
+        max_bytes: Memory budget for the stored payloads
+        timeout: Upper bound in seconds on the age of an entry
+    """
+
+    def __init__(self, namespace, max_bytes, timeout=300):
+        self.namespace = namespace
+        self.timeout = timeout
+        self._entries = LRUCache(maxsize=max_bytes, getsizeof=lambda entry: len(entry[1]))
+        self._lock = threading.Lock()
+
+    def make_key(self, key, tags):
+        """
+        Build the entry key from ``key`` and the current tag versions.
+
+        Resolve it before computing the payload and store under the same key,
+        so a payload computed during an invalidation is never stored under
+        the new versions.
+        """
+        if not response_caches_enabled():
+            return (key,)
+        versions = get_tag_versions(self.namespace, tags)
+        return (key,) + tuple(sorted(versions.items()))
+
+    def get(self, versioned_key):
+        if not response_caches_enabled():
+            return None
+        with self._lock:
+            entry = self._entries.get(versioned_key)
+        if entry is None:
+            return None
+        expires_at, payload, content_type = entry
+        if expires_at < time.monotonic():
+            return None
+        return payload, content_type
+
+    def set(self, versioned_key, payload, content_type):
+        if not response_caches_enabled() or len(payload) > self._entries.maxsize:
+            return
+        entry = (time.monotonic() + self.timeout, payload, content_type)
+        with self._lock:
+            self._entries[versioned_key] = entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def is_cacheable_request(request):
+    renderer = getattr(request, "accepted_renderer", None)
+    return renderer is not None and renderer.format in CACHEABLE_FORMATS
+
+
+def store_rendered_content(response, store):
+    """
+    Call ``store(payload, content_type)`` once DRF has rendered ``response``.
+
+    The body is captured by a post-render callback, so a cache miss is
+    rendered only once and the caller can still return the ``Response``.
+    """
+
+    def callback(rendered):
+        if rendered.status_code == 200:
+            store(rendered.content, rendered["Content-Type"])
+
+    response.add_post_render_callback(callback)
+    return response
+
+
+def payload_response(payload, content_type, cache_status=None):
+    """Wrap an already rendered payload in a plain ``HttpResponse``."""
+    response = HttpResponse(payload, content_type=content_type)
+    if cache_status:
+        response["X-Cache"] = cache_status
+    return response
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Run at most one computation per key at a time in this process.
+
+    Callers arriving while a computation for their key is running wait for
+    it and share its result (or exception) instead of computing again.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def is_running(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, fn):
+        """Return ``(result, shared)``; ``shared`` is true for the waiters."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+default_flight = SingleFlight()
+
+
+def _due_for_refresh(entry, beta):
+    """
+    Probabilistic early expiration ("XFetch"): the closer an entry is to
+    its expiry and the longer it took to compute, the likelier a reader is
+    to refresh it ahead of time, so expiries of hot keys are spread out
+    instead of hitting every reader at once.
+    """
+    _, delta, expires_at = entry
+    if beta <= 0 or delta <= 0:
+        return time.time() >= expires_at
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+def cache_store(key, value, timeout, delta=0.0):
+    """Store ``value`` with the time it took to compute, for early refresh."""
+    if not response_caches_enabled():
+        return
+    cache.set(key, (value, delta, time.time() + timeout), timeout)
+
+
+def _compute_and_store(key, compute, timeout):
+    started = time.monotonic()
+    value = compute()
+    cache_store(key, value, timeout, delta=time.monotonic() - started)
+    return value
+
+
+def _wait_for_entry(key, deadline):
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_compute(key, compute, timeout, *, beta=None, lock_timeout=None, flight=default_flight):
+    """
+    Return ``(value, computed)`` for ``key`` in the shared cache, calling
+    ``compute()`` and storing its result on a miss.
+
+    Protects hot keys against stampedes: entries are refreshed early with a
+    probability growing towards their expiry, concurrent misses in one
+    process share one computation, and with ``lock_timeout`` (defaults to
+    ``CACHE_STAMPEDE_LOCK_TIMEOUT``; 0 disables) only the process holding a
+    short lock in the cache computes while the others keep serving the
+    current value or, on a cold miss, wait up to ``lock_timeout`` seconds
+    for it. ``computed`` is true only for the caller that ran ``compute``.
+    """
+    if not response_caches_enabled():
+        return compute(), True
+    if beta is None:
+        beta = settings.CACHE_EARLY_REFRESH_BETA
+    if lock_timeout is None:
+        lock_timeout = settings.CACHE_STAMPEDE_LOCK_TIMEOUT
+
+    entry = cache.get(key)
+    if entry is not None and (not _due_for_refresh(entry, beta) or flight.is_running(key)):
+        return entry[0], False
+
+    def load():
+        if not lock_timeout:
+            return _compute_and_store(key, compute, timeout), True
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, lock_timeout):
+            current = entry or _wait_for_entry(key, time.monotonic() + lock_timeout)
+            if current is not None:
+                return current[0], False
+            # The lock holder is too slow or gone; compute anyway.
+            return _compute_and_store(key, compute, timeout), True
+        try:
+            return _compute_and_store(key, compute, timeout), True
+        finally:
+            cache.delete(lock_key)
+
+    (value, computed), shared = flight.do(key, load)
+    return value, computed and not shared
+
+
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _run_in_worker(fn):
+    try:
+        fn()
+    finally:
+        # Worker threads keep their own connections; do not leak them.
+        connections.close_all()
+
+
+def _submit_refresh(fn):
+    _refresh_executor.submit(_run_in_worker, fn)
+
+
+def _store_versioned(key, compute, version, timeout):
+    value = compute()
+    cache.set(key, (value, version, time.time()), timeout)
+    return value
+
+
+def _schedule_refresh(key, compute, version, timeout, lock_timeout):
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    lock_key = f"{key}:refresh"
+    if not cache.add(lock_key, 1, lock_timeout):
+        # Another process is refreshing it.
+        with _refreshing_lock:
+            _refreshing.discard(key)
+        return
+
+    def refresh():
+        try:
+            _store_versioned(key, compute, version, timeout)
+        except Exception:
+            logger.exception("Background refresh of %s failed", key)
+        finally:
+            cache.delete(lock_key)
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    _submit_refresh(refresh)
+
+
+def get_stale_while_revalidate(key, compute, version, soft_ttl, max_stale, flight=default_flight):
+    """
+    Return ``(value, stale)`` for ``key``, serving a recent value at once.
+
+    Entries record the ``version`` they were computed for and when. An
+    entry computed for the current version within ``soft_ttl`` seconds is
+    fresh. An older or superseded one is still returned while younger than
+    ``max_stale`` seconds and recomputed in a background thread, once per
+    key across processes. Anything older is recomputed in the request.
+    """
+    if not response_caches_enabled():
+        return compute(), False
+    entry = cache.get(key)
+    if entry is not None:
+        value, entry_version, computed_at = entry
+        age = time.time() - computed_at
+        if entry_version == version and age < soft_ttl:
+            return value, False
+        if age < max_stale:
+            _schedule_refresh(key, compute, version, max_stale, lock_timeout=max(soft_ttl, 1))
+            return value, True
+
+    value, _ = flight.do(key, lambda: _store_versioned(key, compute, version, max_stale))
+    return value, False
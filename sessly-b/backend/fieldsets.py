@@ -0,0 +1,93 @@
+"""
+Sparse fieldsets (``?fields=``) and on-demand expansion (``?expand=``).
+
+Without ``fields`` an endpoint returns its full representation, so existing
+clients are unaffected. With ``fields`` only the listed fields are returned
+and nested blocks are included only when they are listed in ``fields`` or
+``expand``; views use the selection to skip the columns, joins and prefetches
+nobody asked for.
+"""
+
+from __future__ import annotations
+
+from typing import FrozenSet, Iterable, NamedTuple, Optional
+
+from rest_framework.exceptions import ValidationError
+
+
+class FieldSelection(NamedTuple):
+    fields: Optional[FrozenSet[str]]
+    expand: FrozenSet[str]
+
+    def includes(self, name: str) -> bool:
+        return self.fields is None or name in self.fields or name in self.expand
+
+    def filter(self, names: Iterable[str]) -> list:
+        return [name for name in names if self.includes(name)]
+
+    @property
+    def is_full(self) -> bool:
+        return self.fields is None
+
+    @property
+    def cache_token(self) -> str:
+        if self.fields is None:
+            return ""
+        return ",".join(sorted(self.fields | self.expand))
+
+
+FULL_SELECTION = FieldSelection(None, frozenset())
+
+
+def _split(raw: str) -> list:
+    return [item.strip() for item in raw.split(",") if item.strip()]
+
+
+def parse_field_selection(request, available: Iterable[str], expandable: Iterable[str] = ()) -> FieldSelection:
+    """
+    Read ``fields`` and ``expand`` from the query string.
+
+    Args:
+        request: DRF request
+        available: Names of all fields of the representation
+        expandable: Names of the nested blocks among ``available``
+
+    Raises:
+        ValidationError: On unknown field names or non-expandable ``expand`` entries
+    """
+    available = set(available)
+    expandable = set(expandable)
+    params = request.query_params
+    fields = _split(params.get("fields", ""))
+    expand = _split(params.get("expand", ""))
+
+    errors = {}
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        errors["fields"] = f"Nieznane pola: {', '.join(unknown)}"
+    unknown = [name for name in expand if name not in expandable]
+    if unknown:
+        errors["expand"] = f"Nie mozna rozwinac pol: {', '.join(unknown)}"
+    if errors:
+        raise ValidationError(errors)
+
+    if not fields:
+        return FULL_SELECTION
+    return FieldSelection(frozenset(fields), frozenset(expand))
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin dropping the fields excluded by ``context["selection"]``.
+
+    Fields are removed before representation, so excluded nested serializers
+    and method fields never run.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selection = self.context.get("selection")
+        if selection is not None and not selection.is_full:
+            for name in list(self.fields):
+                if not selection.includes(name):
+                    self.fields.pop(name)
@@ -0,0 +1,78 @@
+"""
+Parsers for Django REST Framework: orjson-backed JSON and MessagePack.
+"""
+
+import codecs
+import struct
+import uuid
+from datetime import time, timedelta
+
+import msgpack
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from backend.renderers import (
+    MSGPACK_EXT_DATE,
+    MSGPACK_EXT_TIME,
+    MSGPACK_EXT_UUID,
+    ORJSONRenderer,
+    MSGPACK_EPOCH_DATE,
+)
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parses JSON request bodies with orjson.
+
+    orjson rejects ``NaN`` and ``Infinity`` literals, which matches DRF's
+    STRICT_JSON behaviour.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            if codecs.lookup(encoding).name != "utf-8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+def msgpack_ext_hook(code, payload):
+    """Decode the extension types written by ``MessagePackRenderer``."""
+    if code == MSGPACK_EXT_UUID:
+        return uuid.UUID(bytes=payload)
+    if code == MSGPACK_EXT_TIME:
+        if len(payload) == 2:
+            minutes = struct.unpack(">H", payload)[0]
+            return time(minutes // 60, minutes % 60)
+        seconds = struct.unpack(">I", payload)[0]
+        return time(seconds // 3600, seconds % 3600 // 60, seconds % 60)
+    if code == MSGPACK_EXT_DATE:
+        return MSGPACK_EPOCH_DATE + timedelta(days=struct.unpack(">i", payload)[0])
+    return msgpack.ExtType(code, payload)
+
+
+class MessagePackParser(BaseParser):
+    """Parses ``application/msgpack`` request bodies."""
+
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(
+                stream.read(),
+                raw=False,
+                timestamp=3,
+                strict_map_key=False,
+                ext_hook=msgpack_ext_hook,
+            )
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
@@ -0,0 +1,131 @@
+"""
+Renderers for Django REST Framework: orjson-backed JSON and MessagePack.
+"""
+
+import struct
+import uuid
+from datetime import date, datetime, time
+
+import msgpack
+import orjson
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+_fallback_encoder = JSONEncoder()
+
+
+def orjson_default(obj):
+    """
+    Encode the types orjson does not handle natively (Decimal, timedelta,
+    lazy strings, querysets, ...) exactly like DRF's ``JSONEncoder``.
+    """
+    return _fallback_encoder.default(obj)
+
+
+def dumps(data):
+    """Serialize ``data`` to JSON bytes with the project's orjson options."""
+    return orjson.dumps(data, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for ``JSONRenderer`` producing the same bytes.
+
+    UUIDs, datetimes, dates and times are encoded natively by orjson in the
+    same format as DRF's encoder (``Z`` suffix for UTC); everything else goes
+    through the DRF encoder's ``default``. Indented output and non-default
+    UNICODE_JSON/COMPACT_JSON settings fall back to the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if (
+            self.get_indent(accepted_media_type, renderer_context)
+            or not api_settings.UNICODE_JSON
+            or not api_settings.COMPACT_JSON
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = dumps(data)
+        # Same escaping DRF applies so the output is valid JavaScript.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+# MessagePack extension type codes shared with the mobile clients.
+# Aware datetimes use the standard Timestamp extension (-1).
+MSGPACK_EXT_UUID = 1
+MSGPACK_EXT_TIME = 2
+MSGPACK_EXT_DATE = 3
+
+MSGPACK_EPOCH_DATE = date(1970, 1, 1)
+
+
+def msgpack_default(obj):
+    """
+    Compact encoding of the types MessagePack lacks:
+
+    - UUID: ext 1 with the 16 raw bytes
+    - time: ext 2 with minutes since midnight (uint16) or, when seconds are
+      set, seconds since midnight (uint32)
+    - date: ext 3 with days since 1970-01-01 (int32)
+
+    Naive datetimes become ISO strings; everything else is encoded like the
+    JSON renderer does.
+    """
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(MSGPACK_EXT_UUID, obj.bytes)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, time):
+        if obj.second or obj.microsecond:
+            seconds = obj.hour * 3600 + obj.minute * 60 + obj.second
+            return msgpack.ExtType(MSGPACK_EXT_TIME, struct.pack(">I", seconds))
+        return msgpack.ExtType(MSGPACK_EXT_TIME, struct.pack(">H", obj.hour * 60 + obj.minute))
+    if isinstance(obj, date):
+        return msgpack.ExtType(MSGPACK_EXT_DATE, struct.pack(">i", (obj - MSGPACK_EPOCH_DATE).days))
+    return _fallback_encoder.default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack renderer selected with ``Accept: application/msgpack``.
+
+    Views that can emit native ``time`` values instead of preformatted
+    strings check ``native_times`` on the accepted renderer.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    native_times = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=msgpack_default, datetime=True, use_bin_type=True)
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """
+    Always pick the first renderer, whatever the client accepts.
+
+    For views that build their own (e.g. file download) responses, so an
+    ``Accept: text/csv`` request is not refused before the view runs; errors
+    are still rendered as JSON.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0] if parsers else None
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
@@ -95,7 +95,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "backend.static.PublishedDirectoryMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -159,19 +159,86 @@ CACHES = {
     }
 }
 
-# In production, use Redis for better performance
-# Uncomment and configure when Redis is available:
-# REDIS_URL = get_env("REDIS_URL")
-# if REDIS_URL:
-#     CACHES = {
-#         'default': {
-#             'BACKEND': 'django_redis.cache.RedisCache',
-#             'LOCATION': REDIS_URL,
-#             'OPTIONS': {
-#                 'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#             }
-#         }
-#     }
+# Shared cache for deployments with more than one worker process.
+REDIS_URL = get_env("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# The tag-versioned response caches (listing, detail, availability, directory
+# counts) and the ETags derived from the tag versions are only coherent when
+# every worker process uses the same cache: with the per-process
+# LocMemCache an invalidation is only seen by the worker that made it. They
+# are therefore off in production without REDIS_URL (and under gunicorn with
+# several workers, see gunicorn.conf.py) unless enabled explicitly.
+RESPONSE_CACHES_ENABLED = get_bool_env(
+    "RESPONSE_CACHES_ENABLED", str(bool(REDIS_URL) or not IS_PRODUCTION)
+)
+
+BUSINESS_LIST_CACHE_MAX_BYTES = int(get_env("BUSINESS_LIST_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+BUSINESS_LIST_CACHE_TIMEOUT = int(get_env("BUSINESS_LIST_CACHE_TIMEOUT", "300"))
+BUSINESS_DETAIL_CACHE_TIMEOUT = int(get_env("BUSINESS_DETAIL_CACHE_TIMEOUT", "3600"))
+AVAILABILITY_CACHE_TIMEOUT = int(get_env("AVAILABILITY_CACHE_TIMEOUT", "300"))
+# Stale-while-revalidate for anonymous availability reads: lists younger
+# than the soft TTL are served as fresh, older ones (or ones invalidated by
+# a booking) up to the max stale age while they are refreshed in the
+# background. Bookings always re-check the slot.
+AVAILABILITY_SWR = get_bool_env("AVAILABILITY_SWR", "False")
+AVAILABILITY_SWR_SOFT_TTL = int(get_env("AVAILABILITY_SWR_SOFT_TTL", "5"))
+AVAILABILITY_SWR_MAX_STALE = int(get_env("AVAILABILITY_SWR_MAX_STALE", "30"))
+DIRECTORY_COUNTS_CACHE_TIMEOUT = int(get_env("DIRECTORY_COUNTS_CACHE_TIMEOUT", "300"))
+
+# Stampede protection for hot cache entries (backend.caching.get_or_compute):
+# weight of the probabilistic early refresh (0 disables it) and lifetime of
+# the cross-process recompute lock in seconds (0 disables the lock).
+CACHE_EARLY_REFRESH_BETA = float(get_env("CACHE_EARLY_REFRESH_BETA", "1.0"))
+CACHE_STAMPEDE_LOCK_TIMEOUT = int(get_env("CACHE_STAMPEDE_LOCK_TIMEOUT", "5"))
+
+# Route the public catalog and availability reads to their async views
+# (businesses/async_views.py). Enabled by backend/asgi.py; under WSGI the
+# sync views are used.
+ASYNC_READ_VIEWS = get_bool_env("ASYNC_READ_VIEWS", "False")
+
+# Changed appointments returned per delta sync call (?updated_since=).
+APPOINTMENT_SYNC_BATCH_SIZE = int(get_env("APPOINTMENT_SYNC_BATCH_SIZE", "200"))
+# Seconds a sync cursor stays behind the current time: longest expected
+# transaction, since changes are stamped before they commit.
+APPOINTMENT_SYNC_CURSOR_LAG = int(get_env("APPOINTMENT_SYNC_CURSOR_LAG", "60"))
+# Days deletions are kept for delta sync (manage.py prune_sync_tombstones);
+# older cursors get a full sync.
+APPOINTMENT_SYNC_RETENTION_DAYS = int(get_env("APPOINTMENT_SYNC_RETENTION_DAYS", "30"))
+
+# Owner appointment list (GET /api/businesses/<slug>/appointments/): longest
+# date window in days and the default and largest page sizes.
+OWNER_APPOINTMENTS_MAX_WINDOW_DAYS = int(get_env("OWNER_APPOINTMENTS_MAX_WINDOW_DAYS", "93"))
+OWNER_APPOINTMENTS_PAGE_SIZE = int(get_env("OWNER_APPOINTMENTS_PAGE_SIZE", "50"))
+OWNER_APPOINTMENTS_MAX_PAGE_SIZE = int(get_env("OWNER_APPOINTMENTS_MAX_PAGE_SIZE", "200"))
+# Longest window of the unpaginated calendar agenda (.../appointments/agenda/).
+OWNER_AGENDA_MAX_WINDOW_DAYS = int(get_env("OWNER_AGENDA_MAX_WINDOW_DAYS", "31"))
+# Rows fetched per round trip by the streamed export (.../appointments/export/).
+APPOINTMENT_EXPORT_CHUNK_SIZE = int(get_env("APPOINTMENT_EXPORT_CHUNK_SIZE", "2000"))
+
+# Bulk imports (businesses/imports.py): rows written per bulk_create and
+# per-row errors listed in a report (all are counted).
+IMPORT_CHUNK_SIZE = int(get_env("IMPORT_CHUNK_SIZE", "500"))
+IMPORT_MAX_REPORTED_ERRORS = int(get_env("IMPORT_MAX_REPORTED_ERRORS", "100"))
+
+# Longest owner analytics series (GET /api/businesses/my-business/<id>/analytics/),
+# in day, week or month buckets.
+ANALYTICS_MAX_BUCKETS = int(get_env("ANALYTICS_MAX_BUCKETS", "400"))
+
+# Upper bound on the sub-requests of one POST /api/batch/.
+BATCH_MAX_REQUESTS = int(get_env("BATCH_MAX_REQUESTS", "10"))
+
+# Availability stream (GET /api/businesses/<slug>/availability/stream/):
+# seconds between keep-alive comments and before the server closes the
+# stream (clients reconnect through EventSource).
+AVAILABILITY_STREAM_KEEPALIVE = int(get_env("AVAILABILITY_STREAM_KEEPALIVE", "15"))
+AVAILABILITY_STREAM_MAX_SECONDS = int(get_env("AVAILABILITY_STREAM_MAX_SECONDS", "300"))
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -203,6 +270,17 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Static copy of the public directory (businesses/publishing.py), written by
+# `manage.py publish_directory` and, when enabled, re-published on change.
+# Served by backend.static.PublishedDirectoryMiddleware; keep it out of
+# `collectstatic --clear` runs or publish again afterwards.
+DIRECTORY_PUBLISH_ENABLED = get_bool_env("DIRECTORY_PUBLISH_ENABLED", "False")
+DIRECTORY_PUBLISH_ROOT = STATIC_ROOT / "directory"
+DIRECTORY_PUBLISH_URL = f"{STATIC_URL}directory/"
+# Origin the published documents are rendered for (pagination links).
+DIRECTORY_PUBLISH_BASE_URL = get_env("DIRECTORY_PUBLISH_BASE_URL", "http://localhost")
+DIRECTORY_PUBLISH_RETAIN_SECONDS = int(get_env("DIRECTORY_PUBLISH_RETAIN_SECONDS", "86400"))
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -218,10 +296,12 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_PARSER_CLASSES": [
-        "rest_framework.parsers.JSONParser",
+        "backend.parsers.ORJSONParser",
+        "backend.parsers.MessagePackParser",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "backend.renderers.ORJSONRenderer",
+        "backend.renderers.MessagePackRenderer",
     ],
     "EXCEPTION_HANDLER": "backend.exceptions.custom_exception_handler",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
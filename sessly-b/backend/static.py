@@ -0,0 +1,54 @@
+"""
+WhiteNoise middleware that also serves the published directory.
+
+WhiteNoise indexes ``STATIC_ROOT`` once at startup, so documents published
+afterwards would not be found and the index would keep stale sizes for the
+mutable ``manifest.json``. Files under ``DIRECTORY_PUBLISH_URL`` are
+therefore looked up on disk per request instead. Their content-hashed
+names are cached forever; everything else keeps WhiteNoise's defaults.
+"""
+
+import os
+import re
+
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError
+
+_HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.json$")
+
+
+class PublishedDirectoryMiddleware(WhiteNoiseMiddleware):
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        self.published_root = os.path.abspath(settings.DIRECTORY_PUBLISH_ROOT) + os.path.sep
+        self.published_prefix = settings.DIRECTORY_PUBLISH_URL
+        self.files = {
+            url: static_file
+            for url, static_file in self.files.items()
+            if not url.startswith(self.published_prefix)
+        }
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.published_prefix):
+            static_file = self.find_published_file(request.path_info)
+            if static_file is not None:
+                return self.serve(static_file, request)
+        return super().__call__(request)
+
+    def find_published_file(self, url):
+        if not self.url_is_canonical(url):
+            return None
+        path = os.path.join(self.published_root, url[len(self.published_prefix):])
+        if not self.path_is_child_of(path, self.published_root) or not os.path.isfile(path):
+            return None
+        try:
+            return self.get_static_file(path, url)
+        except MissingFileError:
+            # Pruned between the check and the stat.
+            return None
+
+    def immutable_file_test(self, path, url):
+        if url.startswith(self.published_prefix):
+            return bool(_HASHED_NAME.search(url))
+        return super().immutable_file_test(path, url)
@@ -18,8 +18,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from backend.batch import BatchView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/batch/", BatchView.as_view(), name="api-batch"),
     path("api/users/", include("users.urls")),
     path("api/businesses/", include("businesses.urls")),
 ]
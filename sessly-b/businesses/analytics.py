@@ -0,0 +1,209 @@
+"""
+Owner analytics: bookings, revenue and cancellation rate over time.
+
+Everything is read from the daily rollup (``BusinessDailyStats``), so a
+report costs the same few indexed range queries over at most one row per
+day, service and staff member of the requested range, however long the
+appointment history is.
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db.models import DateField, DecimalField, IntegerField, Sum, Value
+from django.db.models.functions import Coalesce, Trunc
+
+from .models import Business, BusinessDailyStats
+
+INTERVALS = ("day", "week", "month")
+COMPARISONS = ("previous", "year")
+
+_COUNT_COLUMNS = ("pending", "confirmed", "cancelled", "created", "booked_minutes")
+
+
+def bucket_start(day: date, interval: str) -> date:
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, interval: str) -> date:
+    if interval == "week":
+        return start + timedelta(days=7)
+    if interval == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def bucket_starts(date_from: date, date_to: date, interval: str) -> List[date]:
+    """Starts of the buckets covering ``date_from``..``date_to`` (inclusive)."""
+    starts = []
+    start = bucket_start(date_from, interval)
+    while start <= date_to:
+        starts.append(start)
+        start = _next_bucket(start, interval)
+    return starts
+
+
+def bucket_count(date_from: date, date_to: date, interval: str) -> int:
+    if interval == "week":
+        return (bucket_start(date_to, interval) - bucket_start(date_from, interval)).days // 7 + 1
+    if interval == "month":
+        return (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
+    return (date_to - date_from).days + 1
+
+
+def comparison_range(date_from: date, date_to: date, compare: str) -> tuple[date, date]:
+    """The range a report is compared with: the preceding one of the same length, or a year earlier."""
+    if compare == "year":
+        return _year_earlier(date_from), _year_earlier(date_to)
+    length = date_to - date_from + timedelta(days=1)
+    return date_from - length, date_to - length
+
+
+def _year_earlier(day: date) -> date:
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:  # 29 February
+        return day.replace(year=day.year - 1, day=28)
+
+
+def _sums() -> Dict[str, Any]:
+    sums = {
+        column: Coalesce(Sum(column), Value(0), output_field=IntegerField())
+        for column in _COUNT_COLUMNS
+    }
+    money = DecimalField(max_digits=12, decimal_places=2)
+    sums["revenue"] = Coalesce(Sum("revenue"), Value(Decimal("0")), output_field=money)
+    return sums
+
+
+def _metrics(row: Dict[str, Any]) -> Dict[str, Any]:
+    bookings = row["pending"] + row["confirmed"] + row["cancelled"]
+    return {
+        "bookings": bookings,
+        "confirmed": row["confirmed"],
+        "cancelled": row["cancelled"],
+        "cancellation_rate": round(row["cancelled"] / bookings, 4) if bookings else 0.0,
+        "new_bookings": row["created"],
+        "booked_minutes": row["booked_minutes"],
+        "revenue": row["revenue"],
+    }
+
+
+def _total(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    total: Dict[str, Any] = {column: 0 for column in _COUNT_COLUMNS}
+    total["revenue"] = Decimal("0")
+    for row in rows:
+        for column in total:
+            total[column] += row[column]
+    return total
+
+
+def _series(rows, date_from: date, date_to: date, interval: str) -> List[Dict[str, Any]]:
+    empty = _total(())
+    by_period = {row["period"]: row for row in rows}
+    return [
+        {"period": start, **_metrics(by_period.get(start, empty))}
+        for start in bucket_starts(date_from, date_to, interval)
+    ]
+
+
+def _period_report(queryset, date_from: date, date_to: date, interval: str) -> Dict[str, Any]:
+    rows = list(
+        queryset.filter(date__gte=date_from, date__lte=date_to)
+        .annotate(period=Trunc("date", interval, output_field=DateField()))
+        .order_by()
+        .values("period")
+        .annotate(**_sums())
+    )
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "totals": _metrics(_total(rows)),
+        "series": _series(rows, date_from, date_to, interval),
+    }
+
+
+def _breakdown(rows, **labels) -> List[Dict[str, Any]]:
+    """Rows of a breakdown with any activity, busiest first and unassigned last."""
+    items = []
+    for row in rows:
+        if not any(row[column] for column in (*_COUNT_COLUMNS, "revenue")):
+            # Left behind by moved or deleted appointments.
+            continue
+        items.append({**{key: label(row) for key, label in labels.items()}, **_metrics(row)})
+    items.sort(key=lambda item: (-item["bookings"], item["name"] is None, item["name"] or ""))
+    return items
+
+
+def _staff_name(row: Dict[str, Any]) -> Optional[str]:
+    if row["staff_id"] is None:
+        return None
+    full_name = f"{row['staff__user__first_name']} {row['staff__user__last_name']}".strip()
+    return full_name or row["staff__user__username"]
+
+
+def business_analytics(
+    business: Business,
+    date_from: date,
+    date_to: date,
+    interval: str = "day",
+    service_id=None,
+    staff_id=None,
+    compare: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Analytics report of ``business`` for ``date_from``..``date_to``.
+
+    Appointments count on the day they start (business time zone), except
+    ``new_bookings``, which counts them on the day they were booked. Series
+    buckets are labelled with their first day (Monday for weeks) and the
+    empty ones are included, so the first and last bucket may extend past
+    the range while only its days are counted.
+
+    Args:
+        business: Business to report on
+        date_from: First day of the range
+        date_to: Last day of the range
+        interval: ``day``, ``week`` or ``month`` buckets
+        service_id: Only count appointments of this service
+        staff_id: Only count appointments of this staff member
+        compare: Add the ``previous`` range of the same length, or the same
+            range a ``year`` earlier, as ``comparison``
+    """
+    queryset = BusinessDailyStats.objects.filter(business=business)
+    if service_id is not None:
+        queryset = queryset.filter(service_id=service_id)
+    if staff_id is not None:
+        queryset = queryset.filter(staff_id=staff_id)
+
+    report = {"interval": interval, **_period_report(queryset, date_from, date_to, interval)}
+
+    in_range = queryset.filter(date__gte=date_from, date__lte=date_to).order_by()
+    report["by_service"] = _breakdown(
+        in_range.values("service_id", "service__name").annotate(**_sums()),
+        service_id=lambda row: row["service_id"],
+        name=lambda row: row["service__name"],
+    )
+    report["by_staff"] = _breakdown(
+        in_range.values(
+            "staff_id", "staff__user__username", "staff__user__first_name", "staff__user__last_name"
+        ).annotate(**_sums()),
+        staff_id=lambda row: row["staff_id"],
+        name=_staff_name,
+    )
+
+    report["comparison"] = None
+    if compare:
+        previous_from, previous_to = comparison_range(date_from, date_to, compare)
+        report["comparison"] = {
+            "compare": compare,
+            **_period_report(queryset, previous_from, previous_to, interval),
+        }
+    return report
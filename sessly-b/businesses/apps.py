@@ -5,3 +5,6 @@ class BusinessesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "businesses"
 
+    def ready(self):
+        from . import signals  # noqa: F401
+
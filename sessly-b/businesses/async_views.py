@@ -0,0 +1,122 @@
+"""
+Async versions of the public read endpoints, served under ASGI.
+
+They reuse the query building, caching and serialization of the sync views
+in ``views.py`` and only replace the request flow: lookups, counts and page
+rows go through the async ORM, and the remaining blocking steps run in a
+worker thread. Routing picks them when ``ASYNC_READ_VIEWS`` is enabled.
+"""
+
+import asyncio
+import time
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from backend.async_views import AsyncAPIViewMixin, async_condition
+from backend.caching import is_cacheable_request
+from .conditional import (
+    business_availability_etag,
+    business_detail_etag,
+    business_detail_last_modified,
+)
+from .serializers import BusinessAvailabilitySerializer
+from .streams import availability_broadcaster, availability_key
+from .views import BusinessAvailabilityView, BusinessDetailView, BusinessListView
+
+
+class AsyncBusinessListView(AsyncAPIViewMixin, BusinessListView):
+    async def get(self, request, *args, **kwargs):
+        facets = self.get_requested_facets()
+        cache_key, cached = await sync_to_async(self.get_cached_response)(facets)
+        if cached is not None:
+            return cached
+
+        page = await self.apaginate_queryset(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        return await sync_to_async(self.finalize_listing)(response, facets, cache_key)
+
+
+class AsyncBusinessDetailView(AsyncAPIViewMixin, BusinessDetailView):
+    @async_condition(
+        etag_func=business_detail_etag,
+        last_modified_func=business_detail_last_modified,
+    )
+    async def get(self, request, *args, **kwargs):
+        self.get_selection()
+        if is_cacheable_request(request):
+            # Same stampede-protected path as the sync view; a miss renders
+            # in the worker thread.
+            return await sync_to_async(self.retrieve_cached)(request, *args, **kwargs)
+
+        # Everything the serializer reads is selected or prefetched here.
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+
+class AsyncBusinessAvailabilityView(AsyncAPIViewMixin, BusinessAvailabilityView):
+    @async_condition(etag_func=business_availability_etag)
+    async def get(self, request, slug: str):
+        business = await aget_object_or_404(self.get_business_queryset(), slug=slug)
+        data = await sync_to_async(self.get_availability_data)(request, business)
+        return self.availability_response(request, data)
+
+
+class AsyncBusinessAvailabilityStreamView(AsyncAPIViewMixin, APIView):
+    """
+    GET <slug>/availability/stream/?date=&service_id= as Server-Sent Events.
+
+    Sends an ``availability`` event with the same body as the availability
+    endpoint on connect and again whenever an appointment on that day is
+    booked, moved or cancelled, with ``: keepalive`` comments in between.
+    The stream ends after ``AVAILABILITY_STREAM_MAX_SECONDS``.
+    """
+
+    permission_classes = BusinessAvailabilityView.permission_classes
+
+    async def get(self, request, slug: str):
+        business = await aget_object_or_404(
+            BusinessAvailabilityView().get_business_queryset(), slug=slug
+        )
+        serializer = BusinessAvailabilitySerializer(
+            data=request.query_params, context={"business": business}
+        )
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        key = availability_key(business.pk, serializer.validated_data["date"])
+
+        response = StreamingHttpResponse(
+            self.stream(serializer, key), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Keeps nginx from buffering the stream.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, serializer, key):
+        deadline = time.monotonic() + settings.AVAILABILITY_STREAM_MAX_SECONDS
+        # Subscribe before the first read, so a booking made meanwhile is
+        # not missed.
+        async with availability_broadcaster.subscribe(key) as subscription:
+            while True:
+                yield await self.render_event(serializer)
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    try:
+                        await subscription.wait(
+                            min(settings.AVAILABILITY_STREAM_KEEPALIVE, remaining)
+                        )
+                        break
+                    except asyncio.TimeoutError:
+                        yield b": keepalive\n\n"
+
+    async def render_event(self, serializer):
+        data = await sync_to_async(serializer.to_representation)(serializer.validated_data)
+        return b"event: availability\ndata: " + orjson.dumps(data) + b"\n\n"
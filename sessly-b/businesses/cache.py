@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from backend.caching import (
+    TaggedPayloadCache,
+    get_or_compute,
+    get_stale_while_revalidate,
+    get_tag_versions,
+    invalidate_tags,
+)
+
+BUSINESS_LIST_NAMESPACE = "business-list"
+BUSINESS_DETAIL_NAMESPACE = "business-detail"
+AVAILABILITY_NAMESPACE = "availability"
+DIRECTORY_COUNTS_NAMESPACE = "directory-counts"
+ALL_BUSINESSES_TAG = "all"
+
+business_list_cache = TaggedPayloadCache(
+    BUSINESS_LIST_NAMESPACE,
+    max_bytes=settings.BUSINESS_LIST_CACHE_MAX_BYTES,
+    timeout=settings.BUSINESS_LIST_CACHE_TIMEOUT,
+)
+
+
+def _invalidate_now_and_on_commit(namespace: str, tags) -> None:
+    """
+    Bump tags right away and once more after commit: a request served
+    between the two may have cached data from before the commit.
+    """
+    tags = set(tags)
+    invalidate_tags(namespace, tags)
+    transaction.on_commit(lambda: invalidate_tags(namespace, tags))
+
+
+def business_list_tags(category: Optional[str], city: Optional[str]) -> List[str]:
+    """
+    Tags of a listing request. A request narrowed to a category or a city
+    only depends on businesses in it; any other request may include every
+    business and is tagged with the catch-all tag.
+    """
+    tags = []
+    if category:
+        tags.append(f"category:{category}")
+    if city and city.strip():
+        tags.append(f"city:{city.strip().lower()}")
+    return tags or [ALL_BUSINESSES_TAG]
+
+
+def invalidate_business_listing(directory_keys: Iterable[Tuple[str, str]]) -> None:
+    """
+    Invalidate the cached listings a business contributes to, given its
+    ``counters.directory_keys`` before and after the change.
+    """
+    tags = {ALL_BUSINESSES_TAG}
+    for dimension, value in directory_keys:
+        tags.add(f"{dimension}:{value.lower()}" if dimension == "city" else f"{dimension}:{value}")
+    _invalidate_now_and_on_commit(BUSINESS_LIST_NAMESPACE, tags)
+
+
+def business_detail_cache_key(slug: str, renderer_format: str, fieldset: str = "") -> str:
+    version = get_tag_versions(BUSINESS_DETAIL_NAMESPACE, [slug])[slug]
+    key = f"{BUSINESS_DETAIL_NAMESPACE}:{slug}:{version}:{renderer_format}"
+    if fieldset:
+        key = f"{key}:{hashlib.sha1(fieldset.encode()).hexdigest()}"
+    return key
+
+
+def get_or_render_business_detail(key: str, render: Callable[[], Tuple[bytes, str]]):
+    """``(payload, content_type), rendered`` for a detail entry; see ``get_or_compute``."""
+    return get_or_compute(key, render, settings.BUSINESS_DETAIL_CACHE_TIMEOUT)
+
+
+def invalidate_business_detail(*slugs: str) -> None:
+    """Drop the rendered detail payloads of the given business slugs."""
+    slugs = {slug for slug in slugs if slug}
+    if slugs:
+        _invalidate_now_and_on_commit(BUSINESS_DETAIL_NAMESPACE, slugs)
+
+
+def _availability_tags(business_id, target_date: date) -> List[str]:
+    # Bookings invalidate their days, opening hours their weekdays (0 is
+    # Monday, as in ``BusinessOpeningHour``), services the whole business.
+    return [
+        f"{business_id}:{target_date.isoformat()}",
+        f"{business_id}:weekday:{target_date.weekday()}",
+        str(business_id),
+    ]
+
+
+def _availability_version(business_id, target_date: date) -> str:
+    versions = get_tag_versions(AVAILABILITY_NAMESPACE, _availability_tags(business_id, target_date))
+    return ":".join(str(version) for _, version in sorted(versions.items()))
+
+
+def get_or_compute_availability(business_id, service_id, target_date: date, compute: Callable[[], list]) -> list:
+    version = _availability_version(business_id, target_date)
+    key = f"{AVAILABILITY_NAMESPACE}:{service_id}:{target_date.isoformat()}:{version}"
+    value, _ = get_or_compute(key, compute, settings.AVAILABILITY_CACHE_TIMEOUT)
+    return value
+
+
+def get_recent_availability(business_id, service_id, target_date: date, compute: Callable[[], list]) -> list:
+    """
+    Availability that may be up to ``AVAILABILITY_SWR_MAX_STALE`` seconds
+    old, refreshed in the background; see ``get_stale_while_revalidate``.
+    """
+    value, _ = get_stale_while_revalidate(
+        f"{AVAILABILITY_NAMESPACE}-swr:{service_id}:{target_date.isoformat()}",
+        compute,
+        version=_availability_version(business_id, target_date),
+        soft_ttl=settings.AVAILABILITY_SWR_SOFT_TTL,
+        max_stale=settings.AVAILABILITY_SWR_MAX_STALE,
+    )
+    return value
+
+
+def invalidate_availability(business_id, dates: Iterable[date] = (), weekdays: Iterable[int] = ()) -> None:
+    """
+    Invalidate the given days and weekdays of a business, or all of them
+    without ``dates`` and ``weekdays``.
+    """
+    tags = {f"{business_id}:{day.isoformat()}" for day in dates}
+    tags.update(f"{business_id}:weekday:{weekday}" for weekday in weekdays)
+    tags = tags or {str(business_id)}
+    _invalidate_now_and_on_commit(AVAILABILITY_NAMESPACE, tags)
+
+
+def get_or_compute_directory_counts(dimension: str, compute: Callable[[], Dict[str, int]]) -> Dict[str, int]:
+    version = get_tag_versions(DIRECTORY_COUNTS_NAMESPACE, [dimension])[dimension]
+    key = f"{DIRECTORY_COUNTS_NAMESPACE}:{dimension}:{version}"
+    value, _ = get_or_compute(key, compute, settings.DIRECTORY_COUNTS_CACHE_TIMEOUT)
+    return value
+
+
+def invalidate_directory_counts(dimensions: Iterable[str]) -> None:
+    _invalidate_now_and_on_commit(DIRECTORY_COUNTS_NAMESPACE, dimensions)
@@ -0,0 +1,150 @@
+"""
+Validators (ETag / Last-Modified) for conditional GET on read endpoints.
+
+Every function takes the request and view kwargs, as expected by
+``django.views.decorators.http.condition``, and only runs cheap version or
+``Max(updated_at)`` queries, so a ``304 Not Modified`` skips the view and
+its serialization entirely.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import date, datetime, timezone as dt_timezone
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from backend.caching import get_tag_versions, response_caches_enabled
+from .cache import BUSINESS_DETAIL_NAMESPACE
+from .models import Appointment, Business, BusinessDirectoryCounter
+from .services import _day_bounds, get_business_timezone
+
+
+def _weak_etag(request, *parts) -> str:
+    # Weak because the representation also depends on content negotiation.
+    raw = "|".join(str(part) for part in (*parts, request.META.get("HTTP_ACCEPT", "")))
+    return 'W/"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _business_version(slug: str) -> Optional[int]:
+    # Bumped by the signals on every change of the business, its services
+    # and its opening hours (see ``cache.invalidate_business_detail``).
+    # Without a shared cache the version is per worker, so there is none.
+    if not response_caches_enabled():
+        return None
+    return get_tag_versions(BUSINESS_DETAIL_NAMESPACE, [slug])[slug]
+
+
+def business_detail_etag(request, slug: str, **kwargs) -> Optional[str]:
+    version = _business_version(slug)
+    if version is None:
+        return None
+    return _weak_etag(
+        request,
+        "business",
+        slug,
+        version,
+        request.GET.get("fields", ""),
+        request.GET.get("expand", ""),
+    )
+
+
+def business_detail_last_modified(request, slug: str, **kwargs) -> Optional[datetime]:
+    version = _business_version(slug)
+    if version is None:
+        return None
+    return datetime.fromtimestamp(version / 1e9, tz=dt_timezone.utc)
+
+
+def business_categories_etag(request, **kwargs) -> Optional[str]:
+    last_modified = BusinessDirectoryCounter.objects.filter(
+        dimension=BusinessDirectoryCounter.Dimension.CATEGORY
+    ).aggregate(last=Max("updated_at"))["last"]
+    if last_modified is None:
+        return None
+    return _weak_etag(request, "categories", last_modified.isoformat())
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    try:
+        return date.fromisoformat(value or "")
+    except ValueError:
+        return None
+
+
+def serves_stale_availability(request) -> bool:
+    """Anonymous availability reads may be served stale (``AVAILABILITY_SWR``)."""
+    return settings.AVAILABILITY_SWR and not request.user.is_authenticated
+
+
+def business_availability_etag(request, slug: str, **kwargs) -> Optional[str]:
+    """
+    Availability depends on the business version (hours and services), on
+    the appointments overlapping the day and, for today, on the current
+    time, since past slots drop out of the list minute by minute.
+    """
+    if serves_stale_availability(request):
+        # The body may lag behind the database; see ``stale_availability_etag``.
+        return None
+    target_date = _parse_date(request.GET.get("date"))
+    service_id = request.GET.get("service_id")
+    if target_date is None or not service_id:
+        # Let the view report the validation error.
+        return None
+    version = _business_version(slug)
+    if version is None:
+        return None
+
+    business = Business.objects.filter(slug=slug).only("id", "timezone").first()
+    if business is None:
+        return None
+
+    tz = get_business_timezone(business)
+    day_start, day_end = _day_bounds(target_date, tz)
+    appointments = Appointment.objects.filter(
+        business=business, start__lt=day_end, end__gt=day_start
+    ).aggregate(total=Count("id"), last=Max("updated_at"))
+
+    now_local = timezone.now().astimezone(tz)
+    clock = now_local.strftime("%H:%M") if target_date == now_local.date() else ""
+    return _weak_etag(
+        request,
+        "availability",
+        slug,
+        version,
+        service_id,
+        target_date.isoformat(),
+        appointments["total"],
+        appointments["last"].isoformat() if appointments["last"] else "",
+        clock,
+    )
+
+
+def stale_availability_etag(request, data) -> str:
+    """ETag of an availability body served stale, derived from the body itself."""
+    return _weak_etag(request, "availability", data["service_id"], data["date"], *data["slots"])
+
+
+def customer_appointments_etag(request, **kwargs) -> Optional[str]:
+    if not request.user.is_authenticated:
+        return None
+    # Rows embed their service and business slug, so edits of those count too.
+    summary = Appointment.objects.filter(customer=request.user).aggregate(
+        total=Count("id"),
+        last=Max("updated_at"),
+        service=Max("service__updated_at"),
+        business=Max("business__updated_at"),
+    )
+    return _weak_etag(
+        request,
+        "customer-appointments",
+        request.user.pk,
+        request.GET.urlencode(),
+        summary["total"],
+        *(summary[name].isoformat() if summary[name] else "" for name in ("last", "service", "business")),
+        # The upcoming/past split moves with the clock.
+        timezone.now().strftime("%Y-%m-%dT%H:%M") if request.GET.get("time") else "",
+    )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .cache import get_or_compute_directory_counts, invalidate_directory_counts
+from .models import Business, BusinessDirectoryCounter
+
+Dimension = BusinessDirectoryCounter.Dimension
+
+
+def directory_keys(category: str, city: str) -> Tuple[Tuple[str, str], ...]:
+    """Counter rows a business with the given category and city contributes to."""
+    keys = [(Dimension.CATEGORY, category)]
+    city = (city or "").strip()
+    if city:
+        keys.append((Dimension.CITY, city))
+    return tuple(keys)
+
+
+def adjust_directory_counters(keys: Iterable[Tuple[str, str]], delta: int) -> None:
+    keys = list(keys)
+    if not keys or not delta:
+        return
+
+    BusinessDirectoryCounter.objects.bulk_create(
+        [BusinessDirectoryCounter(dimension=dim, value=value) for dim, value in keys],
+        ignore_conflicts=True,
+    )
+    now = timezone.now()
+    for dim, value in keys:
+        BusinessDirectoryCounter.objects.filter(dimension=dim, value=value).update(
+            total=F("total") + delta, updated_at=now
+        )
+    invalidate_directory_counts({dim for dim, _ in keys})
+
+
+def get_directory_counts(dimension: str) -> Dict[str, int]:
+    def load():
+        return dict(
+            BusinessDirectoryCounter.objects.filter(dimension=dimension, total__gt=0).values_list(
+                "value", "total"
+            )
+        )
+
+    return get_or_compute_directory_counts(dimension, load)
+
+
+@transaction.atomic
+def reconcile_directory_counters() -> int:
+    """
+    Recompute every counter from the businesses table and return the number
+    of rows that had drifted.
+    """
+    expected: Dict[Tuple[str, str], int] = {}
+    for row in Business.objects.values("category").annotate(total=Count("id")).order_by():
+        expected[(Dimension.CATEGORY, row["category"])] = row["total"]
+    for row in Business.objects.values("city").annotate(total=Count("id")).order_by():
+        city = (row["city"] or "").strip()
+        if city:
+            key = (Dimension.CITY, city)
+            expected[key] = expected.get(key, 0) + row["total"]
+
+    drifted = 0
+    existing = {
+        (counter.dimension, counter.value): counter
+        for counter in BusinessDirectoryCounter.objects.select_for_update()
+    }
+    for key, counter in existing.items():
+        total = expected.pop(key, 0)
+        if counter.total != total:
+            counter.total = total
+            counter.save(update_fields=["total", "updated_at"])
+            drifted += 1
+
+    BusinessDirectoryCounter.objects.bulk_create(
+        [
+            BusinessDirectoryCounter(dimension=dim, value=value, total=total)
+            for (dim, value), total in expected.items()
+        ]
+    )
+    invalidate_directory_counts(Dimension.values)
+    return drifted + len(expected)
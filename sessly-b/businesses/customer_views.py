@@ -3,18 +3,24 @@ Views for customer-facing appointment management.
 """
 
 import logging
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from backend.exceptions import ErrorCode
+from backend.fieldsets import parse_field_selection
 from backend.logging_config import log_appointment_action
 from backend.responses import error_response, success_response
+from .conditional import customer_appointments_etag
 from .models import Appointment
-from .serializers import AppointmentSerializer
+from .serializers import APPOINTMENT_ROWS, AppointmentSerializer
+from .sync import SYNC_COLUMNS, appointment_changes, decode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +31,7 @@ class CustomerAppointmentViewSet(viewsets.ReadOnlyModelViewSet):
     
     Endpoints:
     - GET /api/appointments/ - List all user's appointments
+    - GET /api/appointments/?updated_since=<cursor> - Changes since the last sync
     - GET /api/appointments/{id}/ - Get appointment detail
     - POST /api/appointments/{id}/cancel/ - Cancel appointment
     - POST /api/appointments/{id}/reschedule/ - Reschedule appointment (TODO)
@@ -56,6 +63,54 @@ class CustomerAppointmentViewSet(viewsets.ReadOnlyModelViewSet):
         
         return queryset
     
+    def get_selection(self):
+        """Sparse fieldset requested with ``?fields=`` / ``?expand=``."""
+        return parse_field_selection(
+            self.request, APPOINTMENT_ROWS.field_names, APPOINTMENT_ROWS.nested_field_names
+        )
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == 'GET':
+            context['selection'] = self.get_selection()
+        return context
+    
+    @method_decorator(condition(etag_func=customer_appointments_etag))
+    def list(self, request, *args, **kwargs):
+        """List appointments; answers 304 when nothing changed since the client's ETag."""
+        selection = self.get_selection()
+        if 'updated_since' in request.query_params:
+            return self.sync(request, selection)
+        queryset = APPOINTMENT_ROWS.values(self.filter_queryset(self.get_queryset()), selection)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(APPOINTMENT_ROWS.format(page, selection))
+        return Response(APPOINTMENT_ROWS.format(queryset, selection))
+    
+    def sync(self, request, selection):
+        """
+        Delta sync: appointments changed after the ``updated_since`` cursor,
+        ids of the deleted ones and the cursor for the next call. ``reset``
+        means a full sync: the client drops its copy before applying it.
+        
+        Status and time filters are ignored, so an appointment leaving such a
+        filter is still reported to the client.
+        """
+        cursor = decode_cursor(request.query_params['updated_since'])
+        page = appointment_changes(
+            request.user,
+            cursor,
+            limit=settings.APPOINTMENT_SYNC_BATCH_SIZE,
+            rows=lambda queryset: APPOINTMENT_ROWS.values(queryset, selection, extra=SYNC_COLUMNS),
+        )
+        return Response({
+            'results': APPOINTMENT_ROWS.format(page.changed, selection),
+            'deleted': page.deleted,
+            'cursor': page.cursor,
+            'has_more': page.has_more,
+            'reset': page.reset,
+        })
+    
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
         """
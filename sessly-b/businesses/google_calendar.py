@@ -7,6 +7,7 @@ from functools import lru_cache
 from typing import Optional
 
 from django.conf import settings
+from django.utils import timezone
 
 try:
     from google.oauth2.service_account import Credentials
@@ -187,5 +188,8 @@ def sync_appointment_with_google(appointment_id):
 
     google_event_id = event.get("id")
     if google_event_id and google_event_id != appointment.google_event_id:
-        Appointment.objects.filter(pk=appointment.pk).update(google_event_id=google_event_id)
+        # ``update()`` skips ``auto_now``; bump it so delta sync sees the change.
+        Appointment.objects.filter(pk=appointment.pk).update(
+            google_event_id=google_event_id, updated_at=timezone.now()
+        )
     return google_event_id
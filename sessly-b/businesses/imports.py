@@ -0,0 +1,405 @@
+"""
+Bulk import of services, opening hours and historical appointments.
+
+Rows come from CSV, JSON (an array, or ``{"rows": [...]}``) or JSON Lines.
+CSV and JSON Lines are read as a stream, so the ``import_business_data``
+command handles files of any size; a JSON array is loaded at once. Every
+row is validated by its serializer. Valid rows are written with
+``bulk_create`` in chunks of ``IMPORT_CHUNK_SIZE``. Invalid ones are
+skipped and reported by row number (the n-th record, header excluded).
+An upload is imported in one transaction; the command commits every chunk
+on its own, so a long import holds no transaction and a late failure keeps
+the chunks before it.
+
+``bulk_create`` sends no signals, so the importers invalidate the caches,
+re-publish the directory and rebuild the daily rollup themselves once a
+run finishes.
+"""
+
+from __future__ import annotations
+
+import abc
+import csv
+import io
+from dataclasses import dataclass, field
+from pathlib import PurePath
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from .cache import invalidate_availability, invalidate_business_detail, invalidate_business_listing
+from .counters import directory_keys
+from .models import Appointment, Business, BusinessOpeningHour, BusinessService, BusinessStaff
+from .publishing import schedule_directory_publish
+from .rollups import rebuild_daily_stats
+from .serializers import (
+    AppointmentImportRowSerializer,
+    BusinessServiceSerializer,
+    OpeningHourImportRowSerializer,
+)
+
+IMPORT_FILE_TYPES = ("csv", "json", "jsonl")
+
+Row = Dict[str, Any]
+
+
+class ImportFormatError(Exception):
+    """The input cannot be read as rows at all."""
+
+
+def file_type_for(name: str) -> str:
+    suffix = PurePath(name or "").suffix.lower().lstrip(".")
+    if suffix == "ndjson":
+        return "jsonl"
+    if suffix not in IMPORT_FILE_TYPES:
+        raise ImportFormatError("Nieobslugiwany typ pliku (csv, json lub jsonl).")
+    return suffix
+
+
+def _csv_rows(stream) -> Iterator[Row]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        for record in csv.DictReader(text):
+            # Empty cells mean "not given", so defaults apply.
+            yield {
+                key.strip(): value.strip()
+                for key, value in record.items()
+                if key is not None and isinstance(value, str) and value.strip()
+            }
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFormatError(f"Nieprawidlowy plik CSV: {exc}") from exc
+    finally:
+        # Leave the underlying stream open for its owner.
+        text.detach()
+
+
+def _json_lines(stream) -> Iterator[Any]:
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield orjson.loads(line)
+        except orjson.JSONDecodeError as exc:
+            raise ImportFormatError(f"Nieprawidlowy JSON w linii {number}.") from exc
+
+
+def _json_rows(stream) -> List[Any]:
+    try:
+        data = orjson.loads(stream.read())
+    except orjson.JSONDecodeError as exc:
+        raise ImportFormatError("Nieprawidlowy plik JSON.") from exc
+    return rows_from_data(data)
+
+
+def rows_from_data(data: Any) -> List[Any]:
+    """Rows of an already parsed JSON document."""
+    if isinstance(data, dict):
+        data = data.get("rows")
+    if not isinstance(data, list):
+        raise ImportFormatError('Oczekiwano listy wierszy lub obiektu {"rows": [...]}.')
+    return data
+
+
+def read_rows(stream, file_type: str) -> Iterable[Any]:
+    """Rows of the binary ``stream`` holding a ``file_type`` file."""
+    if file_type == "csv":
+        return _csv_rows(stream)
+    if file_type == "jsonl":
+        return _json_lines(stream)
+    if file_type == "json":
+        return _json_rows(stream)
+    raise ImportFormatError("Nieobslugiwany typ pliku (csv, json lub jsonl).")
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    failed: int = 0
+    dry_run: bool = False
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, row: int, errors: Any) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "dry_run": self.dry_run,
+            "errors": self.errors,
+        }
+
+
+class BaseImporter(abc.ABC):
+    """
+    Validates rows with ``serializer_class`` and writes them in chunks.
+
+    Subclasses implement ``save`` (write one chunk of validated rows) and
+    may implement ``check`` (cross-row validation) and ``finish``. With
+    ``commit_per_chunk`` every chunk is committed on its own instead of the
+    whole run being one transaction.
+    """
+
+    serializer_class = None
+
+    def __init__(
+        self,
+        business: Business,
+        dry_run: bool = False,
+        chunk_size: Optional[int] = None,
+        commit_per_chunk: bool = False,
+    ):
+        self.business = business
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self.commit_per_chunk = commit_per_chunk
+
+    def get_serializer_context(self) -> Dict[str, Any]:
+        return {"business": self.business}
+
+    def check(self, data: Row) -> Optional[Dict[str, Any]]:
+        """Errors of a valid row against the rows before it, if any."""
+        return None
+
+    @abc.abstractmethod
+    def save(self, chunk: List[Tuple[int, Row]], result: ImportResult) -> None:
+        """Write one chunk of validated rows and count them in ``result``."""
+
+    def finish(self) -> None:
+        pass
+
+    def run(self, rows: Iterable[Any]) -> ImportResult:
+        result = ImportResult(dry_run=self.dry_run)
+        if not self.commit_per_chunk:
+            with transaction.atomic():
+                self._import(rows, result)
+                self._finish(result)
+            return result
+        try:
+            self._import(rows, result)
+        finally:
+            # Chunks committed before a failure stay imported.
+            self._finish(result)
+        return result
+
+    def _import(self, rows: Iterable[Any], result: ImportResult) -> None:
+        context = self.get_serializer_context()
+        chunk: List[Tuple[int, Row]] = []
+        for number, row in enumerate(rows, start=1):
+            if not isinstance(row, dict):
+                result.add_error(number, {"non_field_errors": ["Wiersz musi byc obiektem."]})
+                continue
+            serializer = self.serializer_class(data=row, context=context)
+            if not serializer.is_valid():
+                result.add_error(number, serializer.errors)
+                continue
+            errors = self.check(serializer.validated_data)
+            if errors:
+                result.add_error(number, errors)
+                continue
+            chunk.append((number, serializer.validated_data))
+            if len(chunk) >= self.chunk_size:
+                self._save(chunk, result)
+                chunk = []
+        if chunk:
+            self._save(chunk, result)
+
+    def _save(self, chunk: List[Tuple[int, Row]], result: ImportResult) -> None:
+        with transaction.atomic():
+            self.save(chunk, result)
+            if self.dry_run:
+                # The rows are written too, so the database checks them.
+                transaction.set_rollback(True)
+
+    def _finish(self, result: ImportResult) -> None:
+        if result.imported and not self.dry_run:
+            with transaction.atomic():
+                self.finish()
+
+
+def _business_changed(business: Business, weekdays: Iterable[int] = ()) -> None:
+    keys = directory_keys(business.category, business.city)
+    invalidate_availability(business.pk, weekdays=weekdays)
+    invalidate_business_listing(keys)
+    invalidate_business_detail(business.slug)
+    schedule_directory_publish(slugs=[business.slug], directory_keys=keys)
+
+
+class ServiceImporter(BaseImporter):
+    """Creates services; names must be new to the business."""
+
+    serializer_class = BusinessServiceSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._names = {
+            name.casefold()
+            for name in BusinessService.objects.filter(business=self.business).values_list("name", flat=True)
+        }
+
+    def check(self, data):
+        name = data["name"].casefold()
+        if name in self._names:
+            return {"name": ["Usluga o tej nazwie juz istnieje."]}
+        self._names.add(name)
+        return None
+
+    def save(self, chunk, result):
+        BusinessService.objects.bulk_create(
+            [BusinessService(business=self.business, **data) for _, data in chunk]
+        )
+        result.imported += len(chunk)
+
+    def finish(self):
+        _business_changed(self.business)
+
+
+class OpeningHourImporter(BaseImporter):
+    """Sets the hours of the given weekdays; other weekdays are left alone."""
+
+    serializer_class = OpeningHourImportRowSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._days = set()
+
+    def check(self, data):
+        if data["day_of_week"] in self._days:
+            return {"day_of_week": ["Dzien tygodnia powtarza sie w pliku."]}
+        self._days.add(data["day_of_week"])
+        return None
+
+    def save(self, chunk, result):
+        BusinessOpeningHour.objects.bulk_create(
+            [BusinessOpeningHour(business=self.business, **data) for _, data in chunk],
+            update_conflicts=True,
+            unique_fields=["business", "day_of_week"],
+            update_fields=["is_closed", "open_time", "close_time"],
+        )
+        result.imported += len(chunk)
+
+    def finish(self):
+        _business_changed(self.business, weekdays=self._days)
+
+
+class AppointmentImporter(BaseImporter):
+    """
+    Creates past or future appointments as given, without slot checks.
+
+    Services are matched by name and staff members by username or e-mail.
+    Customers are matched by e-mail; unknown ones get an inactive customer
+    account without a usable password, which they can claim by resetting it.
+    """
+
+    serializer_class = AppointmentImportRowSerializer
+
+    def get_serializer_context(self):
+        staff = {}
+        for member in BusinessStaff.objects.filter(business=self.business).select_related("user"):
+            staff[member.user.username.casefold()] = member
+            staff[member.user.email.casefold()] = member
+        return {
+            **super().get_serializer_context(),
+            "services": {
+                service.name.casefold(): service
+                for service in BusinessService.objects.filter(business=self.business)
+            },
+            "staff": staff,
+        }
+
+    def _customers(self, chunk) -> Dict[str, Any]:
+        User = get_user_model()
+        details = {}
+        for _, data in chunk:
+            details.setdefault(data["customer_email"].casefold(), data)
+        lookup = Q()
+        for email in details:
+            lookup |= Q(email__iexact=email)
+        customers = {user.email.casefold(): user for user in User.objects.filter(lookup)}
+
+        missing = [email for email in details if email not in customers]
+        if missing:
+            password = make_password(None)
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=details[email]["customer_email"],
+                        email=details[email]["customer_email"],
+                        first_name=details[email]["customer_first_name"],
+                        last_name=details[email]["customer_last_name"],
+                        role=User.Role.CUSTOMER,
+                        is_active=False,
+                        password=password,
+                    )
+                    for email in missing
+                ],
+                ignore_conflicts=True,
+            )
+            lookup = Q()
+            for email in missing:
+                lookup |= Q(email__iexact=email)
+            customers.update({user.email.casefold(): user for user in User.objects.filter(lookup)})
+        return customers
+
+    def save(self, chunk, result):
+        customers = self._customers(chunk)
+        appointments = []
+        for number, data in chunk:
+            customer = customers.get(data["customer_email"].casefold())
+            if customer is None:
+                # The e-mail is taken as another account's username.
+                result.add_error(number, {"customer_email": ["Nie mozna utworzyc konta klienta."]})
+                continue
+            appointments.append(
+                Appointment(
+                    business=self.business,
+                    service=data["service"],
+                    staff=data.get("staff"),
+                    customer=customer,
+                    status=data["status"],
+                    start=data["start"],
+                    end=data["end"],
+                    buffer_minutes=data["service"].buffer_minutes,
+                    notes=data["notes"],
+                    confirmed_at=data["start"] if data["status"] == Appointment.Status.CONFIRMED else None,
+                )
+            )
+        Appointment.objects.bulk_create(appointments)
+        result.imported += len(appointments)
+
+    def finish(self):
+        rebuild_daily_stats([self.business])
+        invalidate_availability(self.business.pk)
+
+
+IMPORTERS = {
+    "services": ServiceImporter,
+    "opening_hours": OpeningHourImporter,
+    "appointments": AppointmentImporter,
+}
+
+
+def import_request(request, business: Business, importer_class) -> ImportResult:
+    """
+    Run ``importer_class`` on an upload: a multipart ``file`` (type from its
+    extension or the ``type`` field) or a JSON body. ``?dry_run=true`` only
+    validates.
+    """
+    dry_run = request.query_params.get("dry_run", "").lower() in ("1", "true", "yes")
+    upload = request.FILES.get("file")
+    try:
+        if upload is not None:
+            rows = read_rows(upload, request.data.get("type") or file_type_for(upload.name))
+        else:
+            rows = rows_from_data(request.data)
+        return importer_class(business, dry_run=dry_run).run(rows)
+    except ImportFormatError as exc:
+        raise ValidationError({"file": [str(exc)]}) from exc
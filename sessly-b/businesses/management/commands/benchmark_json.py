@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import time as clock
+from datetime import time, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Tuple
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from backend.renderers import ORJSONRenderer
+from businesses.models import Appointment, Business, BusinessOpeningHour, BusinessService
+from businesses.serializers import AdminAppointmentSerializer, BusinessDetailSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the stock DRF JSONRenderer with ORJSONRenderer on payloads "
+        "produced by the existing serializers. Sample rows are created in a "
+        "transaction that is always rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--businesses", type=int, default=50)
+        parser.add_argument("--appointments", type=int, default=500)
+        parser.add_argument("--rounds", type=int, default=50)
+
+    def handle(self, *args, **options):
+        payloads: Dict[str, object] = {}
+        try:
+            with transaction.atomic():
+                self._build_payloads(options, payloads)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        stock, fast = JSONRenderer(), ORJSONRenderer()
+        self.stdout.write(f"{'payload':<24}{'bytes':>10}{'stock ms':>12}{'orjson ms':>12}{'speedup':>10}")
+        for name, data in payloads.items():
+            expected = stock.render(data)
+            if fast.render(data) != expected:
+                raise CommandError(f"Rozbiezny wynik renderowania dla '{name}'.")
+
+            stock_ms = self._time(lambda: stock.render(data), options["rounds"])
+            fast_ms = self._time(lambda: fast.render(data), options["rounds"])
+            self.stdout.write(
+                f"{name:<24}{len(expected):>10}{stock_ms:>12.3f}{fast_ms:>12.3f}{stock_ms / fast_ms:>9.1f}x"
+            )
+
+    def _time(self, func: Callable[[], bytes], rounds: int) -> float:
+        started = clock.perf_counter()
+        for _ in range(rounds):
+            func()
+        return (clock.perf_counter() - started) * 1000 / rounds
+
+    def _build_payloads(self, options, payloads: Dict[str, object]) -> None:
+        User = get_user_model()
+        customer = User.objects.create_user(
+            username="benchmark-customer", email="benchmark@example.com", password=None
+        )
+        businesses: List[Business] = []
+        services: List[Tuple[Business, BusinessService]] = []
+        for index in range(options["businesses"]):
+            business = Business.objects.create(
+                name=f"Benchmark {index}",
+                slug=f"benchmark-{index}",
+                category=Business.Category.BEAUTY,
+                description="Zażółć gęślą jaźń. " * 5,
+                address_line1=f"ul. Testowa {index}",
+                city="Warszawa",
+                postal_code="00-001",
+                latitude=Decimal("52.229700"),
+                longitude=Decimal("21.012200"),
+            )
+            for day in range(7):
+                BusinessOpeningHour.objects.create(
+                    business=business,
+                    day_of_week=day,
+                    is_closed=day == 6,
+                    open_time=None if day == 6 else time(9),
+                    close_time=None if day == 6 else time(17),
+                )
+            for position in range(5):
+                service = BusinessService.objects.create(
+                    business=business,
+                    name=f"Usługa {position}",
+                    duration_minutes=30 + position * 15,
+                    price_amount=Decimal("99.99") + position,
+                )
+                services.append((business, service))
+            businesses.append(business)
+
+        start = timezone.now().replace(microsecond=0)
+        appointments = []
+        for index in range(options["appointments"]):
+            business, service = services[index % len(services)]
+            begin = start + timedelta(hours=index)
+            appointments.append(
+                Appointment(
+                    business=business,
+                    service=service,
+                    customer=customer,
+                    start=begin,
+                    end=begin + timedelta(minutes=service.duration_minutes),
+                    notes="Proszę o kontakt",
+                )
+            )
+        Appointment.objects.bulk_create(appointments)
+
+        detail_qs = Business.objects.filter(pk__in=[b.pk for b in businesses]).prefetch_related(
+            "services", "opening_hours"
+        )
+        payloads["business_detail"] = BusinessDetailSerializer(detail_qs, many=True).data
+        payloads["admin_appointments"] = AdminAppointmentSerializer(
+            Appointment.objects.filter(customer=customer).select_related("business", "service", "customer"),
+            many=True,
+        ).data
+        payloads["native_rows"] = list(
+            Appointment.objects.filter(customer=customer).values(
+                "id", "start", "end", "service__price_amount", "created_at"
+            )
+        )
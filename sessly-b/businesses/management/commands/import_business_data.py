@@ -0,0 +1,52 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from businesses.imports import IMPORT_FILE_TYPES, IMPORTERS, ImportFormatError, file_type_for, read_rows
+from businesses.models import Business
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import services, opening hours or historical appointments of a business "
+        "from a CSV, JSON or JSON Lines file (CSV and JSON Lines are streamed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("slug", help="Business to import into.")
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path", help="Input file, '-' for stdin.")
+        parser.add_argument("--type", choices=IMPORT_FILE_TYPES, help="File type (default: from the extension).")
+        parser.add_argument("--dry-run", action="store_true", help="Only validate, write nothing.")
+        parser.add_argument("--chunk-size", type=int, help="Rows per bulk insert and transaction (default: IMPORT_CHUNK_SIZE).")
+
+    def handle(self, *args, **options):
+        business = Business.objects.filter(slug=options["slug"]).first()
+        if business is None:
+            raise CommandError(f"Nie znaleziono firm: {options['slug']}")
+
+        path = options["path"]
+        try:
+            file_type = options["type"] or file_type_for(path)
+            importer = IMPORTERS[options["kind"]](
+                business,
+                dry_run=options["dry_run"],
+                chunk_size=options["chunk_size"],
+                commit_per_chunk=True,
+            )
+            if path == "-":
+                result = importer.run(read_rows(sys.stdin.buffer, file_type))
+            else:
+                with open(path, "rb") as stream:
+                    result = importer.run(read_rows(stream, file_type))
+        except (ImportFormatError, OSError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        for error in result.errors:
+            self.stderr.write(f"Wiersz {error['row']}: {error['errors']}")
+        if result.failed > len(result.errors):
+            self.stderr.write(f"... oraz {result.failed - len(result.errors)} kolejnych bledow")
+        message = f"Zaimportowano wierszy: {result.imported}, odrzucono: {result.failed}"
+        if result.dry_run:
+            message += " (proba, nic nie zapisano)"
+        self.stdout.write(self.style.SUCCESS(message) if not result.failed else message)
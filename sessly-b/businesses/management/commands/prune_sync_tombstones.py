@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from businesses.sync import prune_sync_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete delta sync tombstones older than APPOINTMENT_SYNC_RETENTION_DAYS."
+
+    def handle(self, *args, **options):
+        deleted = prune_sync_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"Usunieto znacznikow usuniecia: {deleted}"))
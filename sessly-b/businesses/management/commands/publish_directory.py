@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from businesses.publishing import PublishError, publish_directory
+
+
+class Command(BaseCommand):
+    help = "Render the public business directory into hashed, precompressed static files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--root",
+            help="Target directory (defaults to DIRECTORY_PUBLISH_ROOT).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = publish_directory(options["root"])
+        except PublishError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Opublikowano dokumentow: {len(result.written)}, usunieto: {len(result.removed)}"
+            )
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from businesses.models import Business
+from businesses.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily appointment rollup behind the owner statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Only these businesses (default: all).")
+
+    def handle(self, *args, **options):
+        businesses = None
+        if options["slugs"]:
+            businesses = list(Business.objects.filter(slug__in=options["slugs"]).only("id", "slug", "timezone"))
+            missing = set(options["slugs"]) - {business.slug for business in businesses}
+            if missing:
+                raise CommandError(f"Nie znaleziono firm: {', '.join(sorted(missing))}")
+        written = rebuild_daily_stats(businesses)
+        self.stdout.write(self.style.SUCCESS(f"Zapisano wierszy statystyk: {written}"))
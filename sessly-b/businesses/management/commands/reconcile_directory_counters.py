@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from businesses.counters import reconcile_directory_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-category and per-city business counters."
+
+    def handle(self, *args, **options):
+        fixed = reconcile_directory_counters()
+        self.stdout.write(self.style.SUCCESS(f"Zaktualizowano licznikow: {fixed}"))
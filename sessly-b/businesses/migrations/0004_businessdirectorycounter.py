@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:12
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    Business = apps.get_model("businesses", "Business")
+    BusinessDirectoryCounter = apps.get_model("businesses", "BusinessDirectoryCounter")
+
+    totals = {}
+    for row in Business.objects.values("category").annotate(total=Count("id")).order_by():
+        totals[("category", row["category"])] = row["total"]
+    for row in Business.objects.values("city").annotate(total=Count("id")).order_by():
+        city = (row["city"] or "").strip()
+        if city:
+            totals[("city", city)] = totals.get(("city", city), 0) + row["total"]
+
+    BusinessDirectoryCounter.objects.bulk_create(
+        [
+            BusinessDirectoryCounter(dimension=dimension, value=value, total=total)
+            for (dimension, value), total in totals.items()
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0002_seed_sample_business'),
+        ('businesses', '0003_business_nip'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessDirectoryCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('category', 'Kategoria'), ('city', 'Miasto')], max_length=16)),
+                ('value', models.CharField(max_length=128)),
+                ('total', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('dimension', 'value'),
+                'unique_together': {('dimension', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
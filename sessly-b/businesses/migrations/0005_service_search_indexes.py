@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0004_businessdirectorycounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['category', 'city'], name='businesses__categor_4342bb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessservice',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['business', 'price_amount'], name='service_active_business_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessservice',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['price_amount', 'duration_minutes'], name='service_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessservice',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['duration_minutes'], name='service_active_duration_idx'),
+        ),
+    ]
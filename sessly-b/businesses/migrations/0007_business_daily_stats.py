@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:21
+
+from collections import defaultdict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_daily_stats(apps, schema_editor):
+    Business = apps.get_model("businesses", "Business")
+    Appointment = apps.get_model("businesses", "Appointment")
+    BusinessDailyStats = apps.get_model("businesses", "BusinessDailyStats")
+
+    for business in Business.objects.only("id", "timezone").iterator():
+        try:
+            tz = ZoneInfo(business.timezone or settings.TIME_ZONE)
+        except ZoneInfoNotFoundError:
+            tz = ZoneInfo(settings.TIME_ZONE)
+
+        totals = defaultdict(lambda: defaultdict(int))
+        rows = Appointment.objects.filter(business=business).values(
+            "start", "end", "status", "created_at", "service__price_amount"
+        )
+        for row in rows.iterator():
+            day = totals[row["start"].astimezone(tz).date()]
+            day[row["status"]] += 1
+            if row["status"] != "cancelled":
+                day["booked_minutes"] += int((row["end"] - row["start"]).total_seconds() // 60)
+            if row["status"] == "confirmed" and row["service__price_amount"] is not None:
+                day["revenue"] += row["service__price_amount"]
+            totals[row["created_at"].astimezone(tz).date()]["created"] += 1
+
+        BusinessDailyStats.objects.bulk_create(
+            [BusinessDailyStats(business=business, date=date, **row) for date, row in totals.items()],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0006_appointment_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('pending', models.IntegerField(default=0)),
+                ('confirmed', models.IntegerField(default=0)),
+                ('cancelled', models.IntegerField(default=0)),
+                ('created', models.IntegerField(default=0)),
+                ('booked_minutes', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='businesses.business')),
+            ],
+            options={
+                'ordering': ('business', 'date'),
+                'unique_together': {('business', 'date')},
+            },
+        ),
+        migrations.RunPython(populate_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:40
+
+from collections import defaultdict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def rebuild_daily_stats(apps, schema_editor):
+    Business = apps.get_model("businesses", "Business")
+    Appointment = apps.get_model("businesses", "Appointment")
+    BusinessDailyStats = apps.get_model("businesses", "BusinessDailyStats")
+
+    BusinessDailyStats.objects.all().delete()
+    for business in Business.objects.only("id", "timezone").iterator():
+        try:
+            tz = ZoneInfo(business.timezone or settings.TIME_ZONE)
+        except ZoneInfoNotFoundError:
+            tz = ZoneInfo(settings.TIME_ZONE)
+
+        totals = defaultdict(lambda: defaultdict(int))
+        rows = Appointment.objects.filter(business=business).values(
+            "start", "end", "status", "created_at", "service_id", "staff_id", "service__price_amount"
+        )
+        for row in rows.iterator():
+            dimensions = (row["service_id"], row["staff_id"])
+            day = totals[(row["start"].astimezone(tz).date(), *dimensions)]
+            day[row["status"]] += 1
+            if row["status"] != "cancelled":
+                day["booked_minutes"] += int((row["end"] - row["start"]).total_seconds() // 60)
+            if row["status"] == "confirmed" and row["service__price_amount"] is not None:
+                day["revenue"] += row["service__price_amount"]
+            totals[(row["created_at"].astimezone(tz).date(), *dimensions)]["created"] += 1
+
+        BusinessDailyStats.objects.bulk_create(
+            [
+                BusinessDailyStats(
+                    business=business, date=date, service_id=service_id, staff_id=staff_id, **row
+                )
+                for (date, service_id, staff_id), row in totals.items()
+            ],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0007_business_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='businessdailystats',
+            unique_together=set(),
+        ),
+        # Nullable until the rows are rebuilt, see 0009.
+        migrations.AddField(
+            model_name='businessdailystats',
+            name='service',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='businesses.businessservice'),
+        ),
+        migrations.AddField(
+            model_name='businessdailystats',
+            name='staff',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='businesses.businessstaff'),
+        ),
+        migrations.AddIndex(
+            model_name='businessdailystats',
+            index=models.Index(fields=['business', 'date'], name='business_daily_stats_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='businessdailystats',
+            constraint=models.UniqueConstraint(condition=models.Q(('staff__isnull', False)), fields=('business', 'date', 'service', 'staff'), name='business_daily_stats_staff_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='businessdailystats',
+            constraint=models.UniqueConstraint(condition=models.Q(('staff__isnull', True)), fields=('business', 'date', 'service'), name='business_daily_stats_uniq'),
+        ),
+        migrations.RunPython(rebuild_daily_stats, migrations.RunPython.noop),
+    ]
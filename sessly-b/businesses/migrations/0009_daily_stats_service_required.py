@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0008_daily_stats_breakdown'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='businessdailystats',
+            name='service',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='businesses.businessservice'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('businesses', '0009_daily_stats_service_required'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['business', 'status', 'start'], name='appointment_biz_status_idx'),
+        ),
+    ]
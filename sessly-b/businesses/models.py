@@ -44,6 +44,9 @@ class Business(models.Model):
 
     class Meta:
         ordering = ("name",)
+        indexes = [
+            models.Index(fields=["category", "city"]),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - repr
         return self.name
@@ -130,6 +133,23 @@ class BusinessService(models.Model):
 
     class Meta:
         ordering = ("name",)
+        indexes = [
+            models.Index(
+                fields=["business", "price_amount"],
+                condition=models.Q(is_active=True),
+                name="service_active_business_idx",
+            ),
+            models.Index(
+                fields=["price_amount", "duration_minutes"],
+                condition=models.Q(is_active=True),
+                name="service_active_price_idx",
+            ),
+            models.Index(
+                fields=["duration_minutes"],
+                condition=models.Q(is_active=True),
+                name="service_active_duration_idx",
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - repr
         return f"{self.name} ({self.business.name})"
@@ -180,7 +200,11 @@ class Appointment(models.Model):
         ordering = ("-start",)
         indexes = [
             models.Index(fields=["business", "start"]),
+            # Owner appointment list filtered by status, paged in start order.
+            models.Index(fields=["business", "status", "start"], name="appointment_biz_status_idx"),
             models.Index(fields=["customer", "start"]),
+            # Delta sync (``?updated_since=``) walks this in (updated_at, id) order.
+            models.Index(fields=["customer", "updated_at", "id"], name="appointment_customer_sync_idx"),
         ]
 
     def __str__(self) -> str:  # pragma: no cover - repr
@@ -193,3 +217,101 @@ class Appointment(models.Model):
         expected_end = self.start + timedelta(minutes=self.service.duration_minutes)
         if expected_end != self.end:
             raise ValidationError("Czas zakonczenia musi odpowiadac dlugosci uslugi.")
+
+
+class BusinessDirectoryCounter(models.Model):
+    """Number of businesses per category or city, kept current by signals."""
+
+    class Dimension(models.TextChoices):
+        CATEGORY = "category", "Kategoria"
+        CITY = "city", "Miasto"
+
+    dimension = models.CharField(max_length=16, choices=Dimension.choices)
+    value = models.CharField(max_length=128)
+    total = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("dimension", "value")
+        ordering = ("dimension", "value")
+
+    def __str__(self) -> str:  # pragma: no cover - repr
+        return f"{self.dimension}:{self.value}={self.total}"
+
+
+class AppointmentTombstone(models.Model):
+    """Record of a deleted appointment, reported to clients by delta sync."""
+
+    appointment_id = models.UUIDField()
+    # No constraint: tombstones are written while a deleted customer's
+    # appointments cascade, and must not block that delete.
+    customer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["customer", "deleted_at"])]
+
+    def __str__(self) -> str:  # pragma: no cover - repr
+        return f"{self.appointment_id} deleted {self.deleted_at.isoformat()}"
+
+
+class BusinessDailyStats(models.Model):
+    """
+    Per business, day (business time zone, by appointment start), service
+    and staff member totals behind the owner dashboard and analytics, kept
+    current by signals.
+
+    ``created`` counts appointments by the day they were booked instead.
+    ``booked_minutes`` covers pending and confirmed appointments, ``revenue``
+    the service prices of confirmed ones.
+    """
+
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name="daily_stats")
+    date = models.DateField()
+    # No constraints: the rows are zeroed by the deltas of the appointments
+    # a deleted service or staff member takes with it, not by a cascade.
+    service = models.ForeignKey(
+        BusinessService,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    staff = models.ForeignKey(
+        BusinessStaff,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    pending = models.IntegerField(default=0)
+    confirmed = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    booked_minutes = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("business", "date")
+        indexes = [models.Index(fields=["business", "date"], name="business_daily_stats_idx")]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["business", "date", "service", "staff"],
+                condition=models.Q(staff__isnull=False),
+                name="business_daily_stats_staff_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["business", "date", "service"],
+                condition=models.Q(staff__isnull=True),
+                name="business_daily_stats_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - repr
+        return f"{self.business_id}:{self.date.isoformat()}"
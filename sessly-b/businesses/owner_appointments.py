@@ -0,0 +1,80 @@
+"""
+Owner appointment feed: a date window of a business' appointments, read a
+page at a time.
+
+Windows are whole days in the business time zone. Pages follow a keyset
+cursor over ``(start, id)``, so every page is one range scan of the
+``(business, start)`` or ``(business, status, start)`` index, however many
+appointments the business has.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db.models import Q, QuerySet
+
+from .models import Appointment, Business
+from .services import _day_bounds, get_business_timezone
+from .sync import Cursor, encode_cursor
+
+# Columns every fetched row must carry to build the next cursor.
+PAGE_COLUMNS = ("id", "start")
+
+
+def appointments_in_window(
+    business: Business,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    status: Optional[str] = None,
+) -> QuerySet[Appointment]:
+    """Appointments starting on the local days ``date_from``..``date_to`` (``None`` leaves that end open)."""
+    tz = get_business_timezone(business)
+    queryset = Appointment.objects.filter(business=business)
+    if date_from is not None:
+        queryset = queryset.filter(start__gte=_day_bounds(date_from, tz)[0])
+    if date_to is not None:
+        queryset = queryset.filter(start__lt=_day_bounds(date_to, tz)[1])
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+@dataclass
+class AppointmentPage:
+    rows: List[Dict[str, Any]]
+    cursor: Optional[str]
+    has_more: bool
+
+
+def appointment_page(
+    queryset: QuerySet[Appointment],
+    cursor: Optional[Cursor],
+    limit: int,
+    rows: Optional[Callable[[QuerySet], QuerySet]] = None,
+) -> AppointmentPage:
+    """
+    The ``limit`` appointments of ``queryset`` following ``cursor`` in start order.
+
+    Args:
+        queryset: Appointments to page through
+        cursor: Decoded cursor of the previous page, ``None`` for the first
+        limit: Page size
+        rows: Optional callable turning the queryset into the ``values()``
+            rows to fetch; they must include ``PAGE_COLUMNS``
+    """
+    if cursor is not None:
+        moment, last_id = cursor
+        after = Q(start__gt=moment)
+        if last_id is not None:
+            after |= Q(start=moment, id__gt=last_id)
+        queryset = queryset.filter(after)
+    queryset = queryset.order_by("start", "id")
+
+    fetched = list((rows(queryset) if rows else queryset.values(*PAGE_COLUMNS))[: limit + 1])
+    has_more = len(fetched) > limit
+    page = fetched[:limit]
+    next_cursor = encode_cursor((page[-1]["start"], page[-1]["id"])) if has_more else None
+    return AppointmentPage(rows=page, cursor=next_cursor, has_more=has_more)
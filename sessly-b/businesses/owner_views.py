@@ -2,18 +2,24 @@
 Views for business owners to manage their businesses.
 """
 
-from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from backend.exceptions import ErrorCode
 from backend.responses import error_response, success_response
 from users.permissions import IsBusinessOwner
 from .models import Business, BusinessOpeningHour, BusinessService
+from .analytics import business_analytics
+from .imports import OpeningHourImporter, ServiceImporter, import_request
+from .rollups import business_stats
+from .services import replace_opening_hours
 from .serializers import (
+    BusinessAnalyticsQuerySerializer,
     BusinessCreateUpdateSerializer,
     BusinessDetailSerializer,
     BusinessOpeningHourSerializer,
@@ -61,27 +67,42 @@ class BusinessManagementViewSet(viewsets.ModelViewSet):
         - Upcoming appointments
         - Completed appointments
         - Cancelled appointments
-        - Revenue (if price data available)
+        - Booked minutes and revenue (confirmed appointments)
+        
+        Served from the daily rollup (see ``rollups.business_stats``).
         """
         business = self.get_object()
+        return success_response(data=business_stats(business))
+
+    @action(detail=True, methods=['get'])
+    def analytics(self, request, pk=None):
+        """
+        Get bookings, revenue and cancellation rate over time.
         
-        from django.db.models import Count, Q
-        from datetime import datetime, timedelta
-        from django.utils import timezone
-        
-        now = timezone.now()
-        thirty_days_ago = now - timedelta(days=30)
+        Query parameters:
+        - date_from, date_to - range (default: the last 30 days)
+        - interval - day, week or month buckets (default: day)
+        - service, staff - only count one service or staff member
+        - compare - previous (the preceding range) or year (a year earlier)
         
-        stats = business.appointments.aggregate(
-            total=Count('id'),
-            upcoming=Count('id', filter=Q(start__gte=now, status='pending')),
-            confirmed=Count('id', filter=Q(status='confirmed')),
-            completed=Count('id', filter=Q(start__lt=now, status='confirmed')),
-            cancelled=Count('id', filter=Q(status='cancelled')),
-            last_30_days=Count('id', filter=Q(created_at__gte=thirty_days_ago)),
+        Served from the daily rollup (see ``analytics.business_analytics``).
+        """
+        business = self.get_object()
+        params = BusinessAnalyticsQuerySerializer(
+            data=request.query_params, context={"business": business}
         )
-        
-        return success_response(data=stats)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+        report = business_analytics(
+            business,
+            query["date_from"],
+            query["date_to"],
+            interval=query["interval"],
+            service_id=query.get("service"),
+            staff_id=query.get("staff"),
+            compare=query.get("compare"),
+        )
+        return success_response(data=report)
 
 
 class BusinessServiceViewSet(viewsets.ModelViewSet):
@@ -119,6 +140,23 @@ class BusinessServiceViewSet(viewsets.ModelViewSet):
         """Ensure business is set correctly on update."""
         business = self.get_business()
         serializer.save(business=business)
+    
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        url_name='import',
+        parser_classes=[*api_settings.DEFAULT_PARSER_CLASSES, MultiPartParser],
+    )
+    def import_rows(self, request, slug=None):
+        """
+        Bulk create services from a CSV/JSON/JSON Lines ``file`` upload or a
+        JSON list of rows; ``?dry_run=true`` only validates.
+        
+        Returns the number of imported rows and the errors of the others.
+        """
+        result = import_request(request, self.get_business(), ServiceImporter)
+        return success_response(data=result.as_dict())
 
 
 class BusinessOpeningHoursViewSet(viewsets.ModelViewSet):
@@ -157,6 +195,21 @@ class BusinessOpeningHoursViewSet(viewsets.ModelViewSet):
         business = self.get_business()
         serializer.save(business=business)
     
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        url_name='import',
+        parser_classes=[*api_settings.DEFAULT_PARSER_CLASSES, MultiPartParser],
+    )
+    def import_rows(self, request, slug=None):
+        """
+        Set the hours of the weekdays given in a CSV/JSON/JSON Lines ``file``
+        upload or a JSON list of rows; ``?dry_run=true`` only validates.
+        """
+        result = import_request(request, self.get_business(), OpeningHourImporter)
+        return success_response(data=result.as_dict())
+    
     @action(detail=False, methods=['post'])
     def bulk_update(self, request, slug=None):
         """
@@ -168,6 +221,8 @@ class BusinessOpeningHoursViewSet(viewsets.ModelViewSet):
             {"day_of_week": 1, "is_closed": false, "open_time": "09:00", "close_time": "17:00"},
             ...
         ]
+        
+        Days missing from the list are removed.
         """
         business = self.get_business()
         hours_data = request.data
@@ -179,19 +234,20 @@ class BusinessOpeningHoursViewSet(viewsets.ModelViewSet):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         
-        with transaction.atomic():
-            # Delete existing hours
-            BusinessOpeningHour.objects.filter(business=business).delete()
-            
-            # Create new hours
-            created_hours = []
-            for hour_data in hours_data:
-                serializer = self.get_serializer(data=hour_data)
-                serializer.is_valid(raise_exception=True)
-                hour = serializer.save(business=business)
-                created_hours.append(hour)
+        serializer = self.get_serializer(data=hours_data, many=True)
+        serializer.is_valid(raise_exception=True)
+        days = [row['day_of_week'] for row in serializer.validated_data]
+        if len(set(days)) != len(days):
+            return error_response(
+                error_code=ErrorCode.VALIDATION_ERROR,
+                message="Każdy dzień tygodnia może wystąpić tylko raz",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Only new, changed and dropped days are written.
+        week, _ = replace_opening_hours(business, serializer.validated_data)
         
-        serializer = self.get_serializer(created_hours, many=True)
+        serializer = self.get_serializer(week, many=True)
         return success_response(
             data=serializer.data,
             message="Godziny otwarcia zostały zaktualizowane",
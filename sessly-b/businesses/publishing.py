@@ -0,0 +1,344 @@
+"""
+Static publishing of the public business directory.
+
+The anonymous directory reads (category counts, the first listing page, per
+category listing pages and business profiles) are rendered through the
+regular views and written under ``DIRECTORY_PUBLISH_ROOT`` as content-hashed
+JSON files with gzip siblings, e.g. ``businesses/<slug>.<hash>.json``, so
+WhiteNoise and a CDN in front of it can cache them forever.
+``manifest.json`` maps each document name to the URL of its current file
+and is the only mutable file.
+
+``publish_directory`` publishes everything; the signal handlers re-publish
+the documents a change touches once the transaction commits (when
+``DIRECTORY_PUBLISH_ENABLED`` is set). That runs in a background thread,
+off the request, and changes committed while it is busy are published
+together. Superseded files are kept for ``DIRECTORY_PUBLISH_RETAIN_SECONDS``
+so clients holding an older manifest can still fetch them.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import orjson
+from django.conf import settings
+from django.db import connections, transaction
+from django.http import HttpRequest, QueryDict
+
+from .models import Business, BusinessDirectoryCounter
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+LISTING_DOCUMENT = "businesses"
+CATEGORIES_DOCUMENT = "categories"
+
+HASHED_NAME = re.compile(r"^(?P<name>.+)\.(?P<hash>[0-9a-f]{12})\.json$")
+
+
+class PublishError(Exception):
+    pass
+
+
+def business_document(slug: str) -> str:
+    return f"businesses/{slug}"
+
+
+def category_document(category: str) -> str:
+    return f"categories/{category}"
+
+
+class _PublishRequest(HttpRequest):
+    """Anonymous GET request addressed to ``DIRECTORY_PUBLISH_BASE_URL``."""
+
+    def __init__(self, path: str, params: Optional[Dict[str, str]] = None):
+        super().__init__()
+        base = urlsplit(settings.DIRECTORY_PUBLISH_BASE_URL)
+        query = urlencode(params or {})
+        self.method = "GET"
+        self.path = self.path_info = path
+        self.GET = QueryDict(query)
+        self.META.update(
+            REQUEST_METHOD="GET",
+            PATH_INFO=path,
+            QUERY_STRING=query,
+            HTTP_ACCEPT="application/json",
+            HTTP_HOST=base.netloc,
+        )
+        self._publish_scheme = base.scheme or "https"
+
+    def _get_scheme(self):
+        return self._publish_scheme
+
+
+def _render(view, path: str, params: Optional[Dict[str, str]] = None, **kwargs) -> Optional[bytes]:
+    """Body of a successful response of ``view``, ``None`` on 404."""
+    # As under ATOMIC_REQUESTS: DRF marks the transaction for rollback on an
+    # error response (the 404 of a removed business), so give it its own.
+    with transaction.atomic():
+        response = view(_PublishRequest(path, params), **kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise PublishError(f"{path}: HTTP {response.status_code}")
+    return response.content
+
+
+def _atomic_write(target: Path, payload: bytes) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=target.parent, prefix=".publish-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(payload)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _versions(root: Path, name: str) -> List[Path]:
+    directory = (root / name).parent
+    if not directory.is_dir():
+        return []
+    prefix = Path(name).name
+    return [
+        path
+        for path in directory.iterdir()
+        if (match := HASHED_NAME.match(path.name)) and match["name"] == prefix
+    ]
+
+
+def _remove(path: Path) -> None:
+    for candidate in (path, path.with_name(path.name + ".gz")):
+        try:
+            candidate.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def write_document(root: Path, name: str, payload: bytes) -> Path:
+    """
+    Write ``payload`` as the current version of document ``name``.
+
+    An unchanged payload only refreshes the modification time of its file,
+    which is what ``build_manifest`` uses to pick the current version.
+    """
+    digest = hashlib.md5(payload, usedforsecurity=False).hexdigest()[:12]
+    target = root / f"{name}.{digest}.json"
+    if target.exists():
+        os.utime(target)
+    else:
+        # The compressed sibling goes first: WhiteNoise only looks for it
+        # next to an existing file.
+        _atomic_write(target.with_name(target.name + ".gz"), gzip.compress(payload, mtime=0))
+        _atomic_write(target, payload)
+
+    cutoff = time.time() - settings.DIRECTORY_PUBLISH_RETAIN_SECONDS
+    for path in _versions(root, name):
+        if path != target and path.stat().st_mtime < cutoff:
+            _remove(path)
+    return target
+
+
+def remove_document(root: Path, name: str) -> None:
+    for path in _versions(root, name):
+        _remove(path)
+
+
+def build_manifest(root: Path) -> Dict[str, str]:
+    """
+    Rebuild ``manifest.json`` from the files on disk.
+
+    Deriving it from the directory instead of updating it in place keeps
+    concurrent publishers from losing each other's entries.
+    """
+    current: Dict[str, tuple] = {}
+    if root.is_dir():
+        for path in root.rglob("*.json"):
+            match = HASHED_NAME.match(path.name)
+            if not match:
+                continue
+            name = path.relative_to(root).with_name(match["name"]).as_posix()
+            mtime = path.stat().st_mtime
+            if name not in current or mtime > current[name][0]:
+                current[name] = (mtime, path.relative_to(root).as_posix())
+
+    base_url = settings.DIRECTORY_PUBLISH_URL
+    documents = {name: base_url + relative for name, (_, relative) in sorted(current.items())}
+    payload = orjson.dumps({"documents": documents})
+    _atomic_write(root / (MANIFEST_NAME + ".gz"), gzip.compress(payload, mtime=0))
+    _atomic_write(root / MANIFEST_NAME, payload)
+    return documents
+
+
+@dataclass
+class PublishResult:
+    written: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+
+class DirectoryPublisher:
+    def __init__(self, root: Optional[Path] = None):
+        # Deferred: the views import services and importers, which schedule
+        # publishes through this module.
+        from .views import BusinessCategoryListView, BusinessDetailView, BusinessListView
+
+        self.root = Path(root or settings.DIRECTORY_PUBLISH_ROOT)
+        self.result = PublishResult()
+        self._category_view = BusinessCategoryListView.as_view()
+        self._list_view = BusinessListView.as_view()
+        self._detail_view = BusinessDetailView.as_view()
+
+    def _store(self, name: str, payload: Optional[bytes]) -> None:
+        if payload is None:
+            self.remove(name)
+            return
+        write_document(self.root, name, payload)
+        self.result.written.append(name)
+
+    def remove(self, name: str) -> None:
+        remove_document(self.root, name)
+        self.result.removed.append(name)
+
+    def publish_categories(self) -> None:
+        self._store(CATEGORIES_DOCUMENT, _render(self._category_view, "/api/businesses/categories/"))
+
+    def publish_listing(self, category: Optional[str] = None) -> None:
+        params = {"category": category} if category else {}
+        payload = _render(self._list_view, "/api/businesses/", params)
+        self._store(category_document(category) if category else LISTING_DOCUMENT, payload)
+
+    def publish_business(self, slug: str) -> None:
+        payload = _render(self._detail_view, f"/api/businesses/{slug}/", slug=slug)
+        self._store(business_document(slug), payload)
+
+    def finish(self) -> PublishResult:
+        build_manifest(self.root)
+        return self.result
+
+
+def publish_directory(root: Optional[Path] = None) -> PublishResult:
+    """Publish every directory document and drop those of removed businesses."""
+    publisher = DirectoryPublisher(root)
+    publisher.publish_categories()
+    publisher.publish_listing()
+    for category in Business.Category.values:
+        publisher.publish_listing(category)
+
+    slugs = set(Business.objects.values_list("slug", flat=True).iterator())
+    for slug in sorted(slugs):
+        publisher.publish_business(slug)
+
+    business_root = publisher.root / "businesses"
+    if business_root.is_dir():
+        stale = {
+            match["name"]
+            for path in business_root.iterdir()
+            if (match := HASHED_NAME.match(path.name)) and match["name"] not in slugs
+        }
+        for slug in sorted(stale):
+            publisher.remove(business_document(slug))
+    return publisher.finish()
+
+
+def _new_changes() -> Dict[str, Set[str]]:
+    return {"slugs": set(), "removed": set(), "categories": set()}
+
+
+# Committed changes waiting for the publish thread, merged into one batch.
+_publish_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="directory-publish")
+_queued = _new_changes()
+_queued_lock = threading.Lock()
+
+
+def _drain_publish() -> None:
+    with _queued_lock:
+        changes = {name: set(values) for name, values in _queued.items()}
+        for values in _queued.values():
+            values.clear()
+    try:
+        flush_directory_publish(changes)
+    except Exception:
+        # The next change or ``publish_directory`` catches up.
+        logger.exception("Directory publish failed")
+
+
+def _run_drain() -> None:
+    try:
+        _drain_publish()
+    finally:
+        # The worker thread keeps its own connections; do not leak them.
+        connections.close_all()
+
+
+def _submit_drain() -> None:
+    _publish_executor.submit(_run_drain)
+
+
+def _queue_publish(changes: Dict[str, Set[str]]) -> None:
+    with _queued_lock:
+        idle = not any(_queued.values())
+        for name, values in changes.items():
+            _queued[name].update(values)
+    if idle:
+        _submit_drain()
+
+
+def schedule_directory_publish(
+    slugs: Iterable[str] = (),
+    directory_keys: Iterable[Tuple[str, str]] = (),
+    removed_slugs: Iterable[str] = (),
+) -> None:
+    """
+    Re-publish business profiles and the listings of the categories among
+    ``directory_keys`` (plus the overall listing and category counts) after
+    the current transaction commits. Each call registers its own
+    ``on_commit`` callback, so a rollback drops exactly its changes; the
+    publish thread coalesces what commits in the meantime.
+    """
+    if not settings.DIRECTORY_PUBLISH_ENABLED:
+        return
+    changes = _new_changes()
+    changes["slugs"].update(slug for slug in slugs if slug)
+    changes["removed"].update(slug for slug in removed_slugs if slug)
+    changes["categories"].update(
+        value for dimension, value in directory_keys
+        if dimension == BusinessDirectoryCounter.Dimension.CATEGORY
+    )
+    if not any(changes.values()):
+        return
+    transaction.on_commit(lambda: _queue_publish(changes))
+
+
+def flush_directory_publish(changes: Dict[str, Set[str]]) -> Optional[PublishResult]:
+    """Publish the documents touched by ``changes`` (see ``schedule_directory_publish``)."""
+    if not any(changes.values()):
+        return None
+
+    publisher = DirectoryPublisher()
+    # Removed slugs are rendered too: a missing business drops its document,
+    # one that exists again (a rename back) keeps it.
+    for slug in sorted(changes["slugs"] | changes["removed"]):
+        publisher.publish_business(slug)
+    publisher.publish_categories()
+    publisher.publish_listing()
+    for category in sorted(changes["categories"]):
+        publisher.publish_listing(category)
+    return publisher.finish()
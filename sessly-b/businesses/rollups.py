@@ -0,0 +1,208 @@
+"""
+Daily appointment rollup (``BusinessDailyStats``), one row per business,
+day, service and staff member.
+
+The appointment signals apply every change as a delta: the contribution of
+the appointment before the change is subtracted and the one after it added,
+so creating, moving, cancelling or deleting an appointment touches at most
+a few rows. Revenue is counted at the current service price: a price change
+re-books the rows of its service (``reprice_service_revenue``), so what a
+later cancellation subtracts is what the rows hold. ``rebuild_daily_stats``
+recomputes the rows from the appointments table.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Appointment, Business, BusinessDailyStats, BusinessService
+from .services import _day_bounds, get_business_timezone
+
+STATUS_COLUMNS = {
+    Appointment.Status.PENDING: "pending",
+    Appointment.Status.CONFIRMED: "confirmed",
+    Appointment.Status.CANCELLED: "cancelled",
+}
+
+Row = Dict[str, object]
+# (date, service_id, staff_id) of a rollup row of one business.
+RowKey = Tuple[date, object, object]
+
+
+@dataclass(frozen=True)
+class AppointmentState:
+    """The fields of an appointment the rollup depends on."""
+
+    start: datetime
+    end: datetime
+    status: str
+    created_at: datetime
+    price: Optional[Decimal]
+    service_id: object
+    staff_id: object = None
+
+
+def _contribution(tz, state: AppointmentState) -> Dict[RowKey, Row]:
+    rows: Dict[RowKey, Row] = defaultdict(dict)
+    day = (state.start.astimezone(tz).date(), state.service_id, state.staff_id)
+    rows[day][STATUS_COLUMNS[state.status]] = 1
+    if state.status != Appointment.Status.CANCELLED:
+        rows[day]["booked_minutes"] = int((state.end - state.start).total_seconds() // 60)
+    if state.status == Appointment.Status.CONFIRMED and state.price is not None:
+        rows[day]["revenue"] = state.price
+    rows[(state.created_at.astimezone(tz).date(), state.service_id, state.staff_id)]["created"] = 1
+    return rows
+
+
+def apply_appointment_change(
+    business: Business,
+    previous: Optional[AppointmentState],
+    current: Optional[AppointmentState],
+) -> None:
+    """Move the rollup of ``business`` from ``previous`` to ``current`` (either may be ``None``)."""
+    tz = get_business_timezone(business)
+    deltas: Dict[RowKey, Row] = defaultdict(lambda: defaultdict(int))
+    for sign, state in ((-1, previous), (1, current)):
+        if state is None:
+            continue
+        for key, row in _contribution(tz, state).items():
+            for column, value in row.items():
+                deltas[key][column] += sign * value
+
+    deltas = {
+        key: {column: value for column, value in row.items() if value}
+        for key, row in deltas.items()
+    }
+    deltas = {key: row for key, row in deltas.items() if row}
+    if not deltas:
+        return
+
+    BusinessDailyStats.objects.bulk_create(
+        [
+            BusinessDailyStats(business=business, date=day, service_id=service_id, staff_id=staff_id)
+            for day, service_id, staff_id in deltas
+        ],
+        ignore_conflicts=True,
+    )
+    for (day, service_id, staff_id), row in deltas.items():
+        BusinessDailyStats.objects.filter(
+            business=business, date=day, service_id=service_id, staff_id=staff_id
+        ).update(
+            **{column: F(column) + value for column, value in row.items()},
+            updated_at=timezone.now(),
+        )
+
+
+def reprice_service_revenue(service: BusinessService) -> int:
+    """Re-book the revenue of ``service`` at its current price; returns the number of rows updated."""
+    price = Value(service.price_amount or Decimal("0"), output_field=DecimalField(max_digits=12, decimal_places=2))
+    return BusinessDailyStats.objects.filter(service=service).update(
+        revenue=F("confirmed") * price, updated_at=timezone.now()
+    )
+
+
+def _appointment_rows(business: Business):
+    return (
+        business.appointments.order_by()
+        .values("start", "end", "status", "created_at", "service_id", "staff_id", "service__price_amount")
+        .iterator()
+    )
+
+
+@transaction.atomic
+def rebuild_daily_stats(businesses: Optional[Iterable[Business]] = None) -> int:
+    """Recompute the rollup of ``businesses`` (all by default); returns the number of rows written."""
+    if businesses is None:
+        businesses = Business.objects.only("id", "timezone").iterator()
+
+    written = 0
+    for business in businesses:
+        tz = get_business_timezone(business)
+        totals: Dict[RowKey, Row] = defaultdict(lambda: defaultdict(int))
+        for row in _appointment_rows(business):
+            state = AppointmentState(
+                start=row["start"],
+                end=row["end"],
+                status=row["status"],
+                created_at=row["created_at"],
+                price=row["service__price_amount"],
+                service_id=row["service_id"],
+                staff_id=row["staff_id"],
+            )
+            for key, contribution in _contribution(tz, state).items():
+                for column, value in contribution.items():
+                    totals[key][column] += value
+
+        BusinessDailyStats.objects.filter(business=business).delete()
+        BusinessDailyStats.objects.bulk_create(
+            [
+                BusinessDailyStats(
+                    business=business, date=day, service_id=service_id, staff_id=staff_id, **row
+                )
+                for (day, service_id, staff_id), row in totals.items()
+            ],
+            batch_size=500,
+        )
+        written += len(totals)
+    return written
+
+
+def _sum(column: str, output_field=None, **filters):
+    output_field = output_field or IntegerField()
+    return Coalesce(
+        Sum(column, filter=Q(**filters) if filters else None),
+        Value(0, output_field=output_field),
+        output_field=output_field,
+    )
+
+
+def business_stats(business: Business, now: Optional[datetime] = None) -> Dict[str, object]:
+    """
+    Owner dashboard totals from the rollup.
+
+    Upcoming (pending) and completed (confirmed) appointments are split at
+    ``now``: the rollup answers for the other days, today is counted from
+    the appointments themselves. ``last_30_days`` counts appointments booked
+    on the last 30 days, today included.
+    """
+    now = now or timezone.now()
+    tz = get_business_timezone(business)
+    today = now.astimezone(tz).date()
+
+    # Aliases must not shadow the summed columns.
+    stats = BusinessDailyStats.objects.filter(business=business).aggregate(
+        total_pending=_sum("pending"),
+        total_confirmed=_sum("confirmed"),
+        total_cancelled=_sum("cancelled"),
+        upcoming=_sum("pending", date__gt=today),
+        completed=_sum("confirmed", date__lt=today),
+        last_30_days=_sum("created", date__gt=today - timedelta(days=30)),
+        total_minutes=_sum("booked_minutes"),
+        total_revenue=_sum("revenue", output_field=DecimalField(max_digits=12, decimal_places=2)),
+    )
+
+    day_start, day_end = _day_bounds(today, tz)
+    todays = Appointment.objects.filter(business=business, start__gte=day_start, start__lt=day_end).aggregate(
+        upcoming=Count("id", filter=Q(start__gte=now, status=Appointment.Status.PENDING)),
+        completed=Count("id", filter=Q(start__lt=now, status=Appointment.Status.CONFIRMED)),
+    )
+
+    return {
+        "total": stats["total_pending"] + stats["total_confirmed"] + stats["total_cancelled"],
+        "upcoming": stats["upcoming"] + todays["upcoming"],
+        "confirmed": stats["total_confirmed"],
+        "completed": stats["completed"] + todays["completed"],
+        "cancelled": stats["total_cancelled"],
+        "last_30_days": stats["last_30_days"],
+        "booked_minutes": stats["total_minutes"],
+        "revenue": stats["total_revenue"],
+    }
@@ -0,0 +1,164 @@
+"""
+Fast read path for flat, read-only list endpoints.
+
+A ``RowSerializer`` is compiled once from an existing DRF serializer class.
+It fetches exactly the columns that serializer reads with ``values()`` and
+turns every row into the same representation, without instantiating models
+or running the per-row field machinery.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Expression, QuerySet
+from rest_framework import serializers
+
+from backend.fieldsets import FULL_SELECTION, FieldSelection
+
+Row = Dict[str, Any]
+Reader = Callable[[Row], Any]
+Plan = Tuple[Tuple[Tuple[str, Reader], ...], List[str], Dict[str, Expression]]
+
+# Fields whose representation of a value loaded by ``values()`` is the value
+# itself (or its ``str``); every other field falls back to its own
+# ``to_representation``, which only formats the value and never touches a model.
+_PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.SlugRelatedField,
+)
+
+
+def _converter(field: serializers.Field) -> Optional[Callable[[Any], Any]]:
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == "hex_verbose":
+        return str
+    if isinstance(field, _PASSTHROUGH_FIELDS):
+        return None
+    return field.to_representation
+
+
+def _column_reader(column: str, convert: Optional[Callable[[Any], Any]]) -> Reader:
+    if convert is None:
+        return lambda row: row[column]
+
+    def read(row: Row) -> Any:
+        value = row[column]
+        return None if value is None else convert(value)
+
+    return read
+
+
+def _nested_reader(presence: str, steps: Tuple[Tuple[str, Reader], ...]) -> Reader:
+    def read(row: Row) -> Any:
+        if row[presence] is None:
+            return None
+        return {name: reader(row) for name, reader in steps}
+
+    return read
+
+
+class RowSerializer:
+    """
+    Row formatter producing the output of ``serializer_class`` from ``values()`` rows.
+
+    Supported fields are plain model fields, dotted sources across foreign
+    keys, ``SlugRelatedField``, ``PrimaryKeyRelatedField`` and nested
+    single-object model serializers. Sources that are not columns (model
+    properties) must be given as query expressions in ``expressions``, keyed by
+    their ``__`` path, e.g. ``{"service__total_slot_minutes": F(...) + F(...)}``.
+    ``values()`` and ``format()`` accept a ``FieldSelection`` limiting the
+    top-level fields, and with them the selected columns and joins.
+
+    Args:
+        serializer_class: Read-only serializer whose output is reproduced
+        expressions: Database expressions for non-column sources
+    """
+
+    def __init__(
+        self,
+        serializer_class: type[serializers.Serializer],
+        expressions: Optional[Dict[str, Expression]] = None,
+    ):
+        self._serializer_class = serializer_class
+        self._expressions = expressions or {}
+        self._plans: Dict[FieldSelection, Plan] = {}
+
+    @property
+    def field_names(self) -> List[str]:
+        return [name for name, field in self._serializer_class().fields.items() if not field.write_only]
+
+    @property
+    def nested_field_names(self) -> List[str]:
+        return [
+            name
+            for name, field in self._serializer_class().fields.items()
+            if isinstance(field, serializers.BaseSerializer)
+        ]
+
+    def _plan(self, selection: FieldSelection) -> Plan:
+        # Compiled on first use of every selection, since building serializer
+        # fields needs the app registry.
+        plan = self._plans.get(selection)
+        if plan is None:
+            columns: List[str] = []
+            annotations: Dict[str, Expression] = {}
+            steps = self._compile(self._serializer_class(), "", columns, annotations, selection)
+            plan = self._plans[selection] = (steps, columns, annotations)
+        return plan
+
+    def _compile(self, serializer, prefix, columns, annotations, selection=FULL_SELECTION) -> Tuple[Tuple[str, Reader], ...]:
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only or not selection.includes(name):
+                continue
+            unsupported = (
+                field.source == "*"
+                or isinstance(field, (serializers.ListSerializer, serializers.SerializerMethodField))
+                or (isinstance(field, serializers.RelatedField) and not isinstance(field, _PASSTHROUGH_FIELDS))
+            )
+            if unsupported:
+                raise ImproperlyConfigured(
+                    f"{type(serializer).__name__}.{name} cannot be read from values() rows."
+                )
+
+            path = prefix + field.source.replace(".", "__")
+            if isinstance(field, serializers.BaseSerializer):
+                columns.append(path)
+                nested = self._compile(field, path + "__", columns, annotations)
+                steps.append((name, _nested_reader(path, nested)))
+                continue
+            if isinstance(field, serializers.SlugRelatedField):
+                path = f"{path}__{field.slug_field}"
+
+            if path in self._expressions:
+                alias = path.replace("__", "_") + "_expr"
+                annotations[alias] = self._expressions[path]
+                path = alias
+            else:
+                columns.append(path)
+            steps.append((name, _column_reader(path, _converter(field))))
+        return tuple(steps)
+
+    def values(
+        self,
+        queryset: QuerySet,
+        selection: FieldSelection = FULL_SELECTION,
+        extra: Iterable[str] = (),
+    ) -> QuerySet:
+        """
+        Restrict ``queryset`` to the columns the selected fields need, plus
+        ``extra`` columns the caller reads itself (they are not formatted).
+        """
+        _, columns, annotations = self._plan(selection)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset.values(*dict.fromkeys([*columns, *extra]), *annotations)
+
+    def format(self, rows: Iterable[Row], selection: FieldSelection = FULL_SELECTION) -> List[Dict[str, Any]]:
+        steps = self._plan(selection)[0]
+        return [{name: reader(row) for name, reader in steps} for row in rows]
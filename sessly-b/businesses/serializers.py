@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import Decimal
 
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F
 from django.utils import timezone
 from rest_framework import serializers
 
+from backend.fieldsets import SparseFieldsetMixin
+from .analytics import COMPARISONS, INTERVALS, bucket_count, comparison_range
+from .exports import EXPORT_TYPES
 from .models import (
     Appointment,
     Business,
@@ -12,14 +19,16 @@ from .models import (
     BusinessService,
     BusinessStaff,
 )
+from .rows import RowSerializer
 from .services import (
     SlotUnavailableError,
-    calculate_daily_availability,
     create_appointment,
     get_business_timezone,
+    get_daily_availability,
     is_slot_available,
     serialize_time_list,
 )
+from .sync import decode_cursor
 
 
 class BusinessOpeningHourSerializer(serializers.ModelSerializer):
@@ -30,6 +39,17 @@ class BusinessOpeningHourSerializer(serializers.ModelSerializer):
         fields = ("day_of_week", "day_name", "is_closed", "open_time", "close_time")
 
 
+class OpeningHourImportRowSerializer(BusinessOpeningHourSerializer):
+    """Opening hours row of a bulk import, checked like ``BusinessOpeningHour.clean``."""
+
+    def validate(self, attrs):
+        try:
+            BusinessOpeningHour(**attrs).clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({"non_field_errors": exc.messages}) from exc
+        return attrs
+
+
 class BusinessServiceSerializer(serializers.ModelSerializer):
     total_slot_minutes = serializers.IntegerField(read_only=True)
 
@@ -77,6 +97,28 @@ class BusinessListSerializer(serializers.ModelSerializer):
         return sum(1 for service in services.all() if service.is_active)
 
 
+class BusinessListingSerializer(SparseFieldsetMixin, serializers.Serializer):
+    """Read-only listing row built from ``business_listing_queryset`` values."""
+
+    id = serializers.UUIDField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    slug = serializers.SlugField(read_only=True)
+    category = serializers.CharField(read_only=True)
+    description = serializers.CharField(read_only=True)
+    city = serializers.CharField(read_only=True)
+    address_line1 = serializers.CharField(read_only=True)
+    address_line2 = serializers.CharField(read_only=True)
+    postal_code = serializers.CharField(read_only=True)
+    country = serializers.CharField(read_only=True)
+    phone_number = serializers.CharField(read_only=True)
+    website_url = serializers.CharField(read_only=True)
+    services_count = serializers.IntegerField(read_only=True)
+    min_price = serializers.DecimalField(
+        max_digits=8, decimal_places=2, read_only=True, allow_null=True
+    )
+    max_duration = serializers.IntegerField(read_only=True, allow_null=True)
+
+
 class BusinessStaffSerializer(serializers.ModelSerializer):
     user_id = serializers.UUIDField(write_only=True)
     first_name = serializers.CharField(source="user.first_name", read_only=True)
@@ -98,7 +140,7 @@ class BusinessStaffSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "username", "first_name", "last_name", "email")
 
 
-class BusinessDetailSerializer(BusinessListSerializer):
+class BusinessDetailSerializer(SparseFieldsetMixin, BusinessListSerializer):
     opening_hours = BusinessOpeningHourSerializer(many=True, read_only=True)
     services = BusinessServiceSerializer(many=True, read_only=True)
 
@@ -169,7 +211,12 @@ class BusinessAvailabilitySerializer(serializers.Serializer):
         service: BusinessService = instance["service"]
         target_date = instance["date"]
 
-        availability = calculate_daily_availability(business, service, target_date)
+        availability = get_daily_availability(
+            business, service, target_date, allow_stale=self.context.get("allow_stale", False)
+        )
+        if self.context.get("native_times"):
+            # Binary renderers encode UUIDs and times compactly themselves.
+            return {"date": target_date, "service_id": service.id, "slots": availability}
         return {
             "date": target_date,
             "service_id": str(service.id),
@@ -177,7 +224,185 @@ class BusinessAvailabilitySerializer(serializers.Serializer):
         }
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class ServiceSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=128, required=False, allow_blank=True)
+    category = serializers.ChoiceField(choices=Business.Category.choices, required=False)
+    city = serializers.CharField(max_length=128, required=False, allow_blank=True)
+    min_price = serializers.DecimalField(
+        max_digits=8, decimal_places=2, min_value=Decimal("0"), required=False
+    )
+    max_price = serializers.DecimalField(
+        max_digits=8, decimal_places=2, min_value=Decimal("0"), required=False
+    )
+    min_duration = serializers.IntegerField(min_value=0, required=False)
+    max_duration = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, attrs):
+        min_price, max_price = attrs.get("min_price"), attrs.get("max_price")
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError(
+                {"max_price": "Cena maksymalna musi byc wieksza od minimalnej."}
+            )
+        min_duration, max_duration = attrs.get("min_duration"), attrs.get("max_duration")
+        if min_duration is not None and max_duration is not None and min_duration > max_duration:
+            raise serializers.ValidationError(
+                {"max_duration": "Maksymalny czas musi byc dluzszy od minimalnego."}
+            )
+        return attrs
+
+
+class BusinessAnalyticsQuerySerializer(serializers.Serializer):
+    """Query of the owner analytics; the range defaults to the last 30 days of the business."""
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    interval = serializers.ChoiceField(choices=INTERVALS, default="day")
+    service = serializers.UUIDField(required=False)
+    staff = serializers.UUIDField(required=False)
+    compare = serializers.ChoiceField(choices=COMPARISONS, required=False)
+
+    def validate(self, attrs):
+        business = self.context["business"]
+        today = timezone.now().astimezone(get_business_timezone(business)).date()
+        date_to = attrs.setdefault("date_to", today)
+        date_from = attrs.setdefault("date_from", date_to - timedelta(days=29))
+        if date_from > date_to:
+            raise serializers.ValidationError(
+                {"date_to": "Data koncowa nie moze byc wczesniejsza niz poczatkowa."}
+            )
+        if bucket_count(date_from, date_to, attrs["interval"]) > settings.ANALYTICS_MAX_BUCKETS:
+            raise serializers.ValidationError(
+                {"date_from": "Zakres jest zbyt dlugi dla wybranego przedzialu."}
+            )
+        if attrs.get("compare"):
+            try:
+                comparison_range(date_from, date_to, attrs["compare"])
+            except (OverflowError, ValueError) as exc:
+                raise serializers.ValidationError({"compare": "Brak okresu do porownania."}) from exc
+        return attrs
+
+
+class OwnerAppointmentWindowSerializer(serializers.Serializer):
+    """Date window (business time zone, inclusive) and status filter of the owner appointment reads."""
+
+    # Setting holding the longest window in days.
+    max_window_setting = "OWNER_APPOINTMENTS_MAX_WINDOW_DAYS"
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    status = serializers.ChoiceField(choices=Appointment.Status.choices, required=False)
+
+    def validate(self, attrs):
+        if attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError(
+                {"date_to": "Data koncowa nie moze byc wczesniejsza niz poczatkowa."}
+            )
+        if (attrs["date_to"] - attrs["date_from"]).days >= getattr(settings, self.max_window_setting):
+            raise serializers.ValidationError(
+                {"date_from": "Zakres dat jest zbyt dlugi."}
+            )
+        return attrs
+
+
+class OwnerAppointmentListQuerySerializer(OwnerAppointmentWindowSerializer):
+    cursor = serializers.CharField(required=False, allow_blank=True)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.OWNER_APPOINTMENTS_MAX_PAGE_SIZE,
+        default=settings.OWNER_APPOINTMENTS_PAGE_SIZE,
+    )
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        attrs["cursor"] = decode_cursor(attrs.get("cursor", ""), field="cursor")
+        return attrs
+
+
+class OwnerAgendaQuerySerializer(OwnerAppointmentWindowSerializer):
+    max_window_setting = "OWNER_AGENDA_MAX_WINDOW_DAYS"
+
+
+class OwnerAppointmentExportQuerySerializer(serializers.Serializer):
+    """
+    Query of the owner appointment export; both ends of the range are
+    optional. The file type is ``type``, since DRF reserves ``format``.
+    """
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    status = serializers.ChoiceField(choices=Appointment.Status.choices, required=False)
+    type = serializers.ChoiceField(choices=tuple(EXPORT_TYPES), default="csv")
+
+    def validate(self, attrs):
+        date_from, date_to = attrs.get("date_from"), attrs.get("date_to")
+        if date_from is not None and date_to is not None and date_from > date_to:
+            raise serializers.ValidationError(
+                {"date_to": "Data koncowa nie moze byc wczesniejsza niz poczatkowa."}
+            )
+        return attrs
+
+
+class AppointmentImportRowSerializer(serializers.Serializer):
+    """
+    Historical appointment row of a bulk import.
+
+    Times without an offset are in the business time zone; ``end`` defaults
+    to the service duration. ``service`` is a service name and ``staff`` a
+    staff member's username or e-mail, resolved through the ``services``
+    and ``staff`` maps in the context (keys casefolded).
+    """
+
+    service = serializers.CharField(max_length=128)
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField(required=False)
+    status = serializers.ChoiceField(choices=Appointment.Status.choices, default=Appointment.Status.CONFIRMED)
+    customer_email = serializers.EmailField(max_length=150)
+    customer_first_name = serializers.CharField(max_length=150, required=False, default="")
+    customer_last_name = serializers.CharField(max_length=150, required=False, default="")
+    staff = serializers.CharField(max_length=254, required=False)
+    notes = serializers.CharField(required=False, allow_blank=True, default="")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        tz = get_business_timezone(self.context["business"])
+        for name in ("start", "end"):
+            self.fields[name].timezone = tz
+
+    def validate(self, attrs):
+        service = self.context["services"].get(attrs["service"].casefold())
+        if service is None:
+            raise serializers.ValidationError({"service": "Nie znaleziono uslugi o tej nazwie."})
+        attrs["service"] = service
+
+        if "staff" in attrs:
+            staff = self.context["staff"].get(attrs["staff"].casefold())
+            if staff is None:
+                raise serializers.ValidationError({"staff": "Nie znaleziono pracownika."})
+            attrs["staff"] = staff
+
+        attrs.setdefault("end", attrs["start"] + timedelta(minutes=service.duration_minutes))
+        if attrs["end"] <= attrs["start"]:
+            raise serializers.ValidationError(
+                {"end": "Czas zakonczenia musi byc po czasie rozpoczecia."}
+            )
+        return attrs
+
+
+class ServiceSearchBusinessSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Business
+        fields = ("id", "name", "slug", "category", "city", "address_line1")
+
+
+class ServiceSearchResultSerializer(serializers.Serializer):
+    business = ServiceSearchBusinessSerializer(read_only=True)
+    services = BusinessServiceSerializer(many=True, read_only=True)
+    min_price = serializers.DecimalField(
+        max_digits=8, decimal_places=2, read_only=True, allow_null=True
+    )
+
+
+class AppointmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     service = BusinessServiceSerializer(read_only=True)
     business = serializers.SlugRelatedField(slug_field="slug", read_only=True)
 
@@ -252,7 +477,7 @@ class AppointmentCreateSerializer(serializers.Serializer):
         return AppointmentSerializer(instance).data
 
 
-class AdminAppointmentSerializer(serializers.ModelSerializer):
+class AdminAppointmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     service = BusinessServiceSerializer(read_only=True)
     business = serializers.SlugRelatedField(slug_field="slug", read_only=True)
     customer_email = serializers.EmailField(source="customer.email", read_only=True)
@@ -285,6 +510,15 @@ class AdminAppointmentSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+# ``values()`` based fast paths for the appointment list endpoints; the output
+# is identical to the serializers above.
+_SLOT_MINUTES = {
+    "service__total_slot_minutes": F("service__duration_minutes") + F("service__buffer_minutes"),
+}
+APPOINTMENT_ROWS = RowSerializer(AppointmentSerializer, expressions=_SLOT_MINUTES)
+ADMIN_APPOINTMENT_ROWS = RowSerializer(AdminAppointmentSerializer, expressions=_SLOT_MINUTES)
+
+
 class OwnerAppointmentSerializer(serializers.Serializer):
     service = BusinessServiceSerializer(read_only=True)
     business = serializers.SlugRelatedField(slug_field="slug", read_only=True)
@@ -3,23 +3,215 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta, timezone as dt_timezone
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import Q, QuerySet
+from django.db.models import (
+    Case,
+    CharField,
+    Count,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Value,
+    When,
+)
 from django.utils import timezone
 
+from .cache import (
+    get_or_compute_availability,
+    get_recent_availability,
+    invalidate_availability,
+    invalidate_business_detail,
+)
 from .models import Appointment, Business, BusinessOpeningHour, BusinessService
+from .publishing import schedule_directory_publish
 
 logger = logging.getLogger(__name__)
 
 
+BUSINESS_LISTING_FIELDS = (
+    "id",
+    "name",
+    "slug",
+    "category",
+    "description",
+    "city",
+    "address_line1",
+    "address_line2",
+    "postal_code",
+    "country",
+    "phone_number",
+    "website_url",
+)
+
+BUSINESS_FACETS = ("category", "city", "price_band")
+
+# (slug, lower bound inclusive, upper bound exclusive) applied to the cheapest
+# active service of a business.
+PRICE_BANDS = (
+    ("lt_100", None, 100),
+    ("100_200", 100, 200),
+    ("200_500", 200, 500),
+    ("500_plus", 500, None),
+)
+
+
 class SlotUnavailableError(Exception):
     """Raised when a requested appointment slot is no longer available."""
 
 
+def _listing_aggregates() -> Dict[str, object]:
+    active_services = Q(services__is_active=True)
+    return {
+        "services_count": Count("services", filter=active_services),
+        "min_price": Min("services__price_amount", filter=active_services),
+        "max_duration": Max("services__duration_minutes", filter=active_services),
+    }
+
+
+BUSINESS_LISTING_AGGREGATES = tuple(_listing_aggregates())
+
+
+def business_listing_queryset(
+    queryset: Optional[QuerySet[Business]] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> QuerySet:
+    """
+    Listing rows as dictionaries with the active-service aggregates computed
+    by the database in the same query, so no services are prefetched.
+
+    ``fields`` limits the selected columns; the services join and the
+    ``GROUP BY`` are only added when one of the aggregates is requested.
+    """
+    if queryset is None:
+        queryset = Business.objects.all()
+
+    fields = set(fields) if fields is not None else None
+    columns = [name for name in BUSINESS_LISTING_FIELDS if fields is None or name in fields]
+    aggregates = {
+        name: aggregate
+        for name, aggregate in _listing_aggregates().items()
+        if fields is None or name in fields
+    }
+    queryset = queryset.values(*columns)
+    if aggregates:
+        queryset = queryset.annotate(**aggregates)
+    return queryset.order_by("name", "id")
+
+
+def annotate_price_band(queryset: QuerySet[Business]) -> QuerySet[Business]:
+    """Annotate ``price_band`` derived from the cheapest active service."""
+    cheapest = (
+        BusinessService.objects.filter(
+            business=OuterRef("pk"), is_active=True, price_amount__isnull=False
+        )
+        .order_by("price_amount")
+        .values("price_amount")[:1]
+    )
+    whens = []
+    for band, lower, upper in PRICE_BANDS:
+        bounds = {}
+        if lower is not None:
+            bounds["band_price__gte"] = lower
+        if upper is not None:
+            bounds["band_price__lt"] = upper
+        whens.append(When(**bounds, then=Value(band)))
+
+    return queryset.annotate(band_price=Subquery(cheapest)).annotate(
+        price_band=Case(*whens, default=Value(None), output_field=CharField())
+    )
+
+
+def business_facet_counts(
+    queryset: QuerySet[Business], facets: Sequence[str]
+) -> Dict[str, List[Dict[str, object]]]:
+    """
+    Count the filtered businesses per value of every requested facet.
+
+    All facets come from a single ``GROUP BY`` over their combined columns;
+    the per-facet totals are folded from those rows in Python.
+    """
+    if "price_band" in facets and "price_band" not in queryset.query.annotations:
+        queryset = annotate_price_band(queryset)
+
+    totals: Dict[str, Dict[object, int]] = {facet: {} for facet in facets}
+    rows = queryset.values(*facets).annotate(total=Count("id")).order_by()
+    for row in rows:
+        for facet in facets:
+            value = row[facet]
+            if value in (None, ""):
+                continue
+            totals[facet][value] = totals[facet].get(value, 0) + row["total"]
+
+    return {
+        facet: [
+            {"value": value, "count": count}
+            for value, count in sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+        ]
+        for facet, counts in totals.items()
+    }
+
+
+def service_search_queryset(filters: Dict[str, object]) -> QuerySet[BusinessService]:
+    """Active services matching the validated ``ServiceSearchQuerySerializer`` data."""
+    queryset = BusinessService.objects.filter(is_active=True)
+
+    query = (filters.get("q") or "").strip()
+    if query:
+        queryset = queryset.filter(name__icontains=query)
+    if filters.get("min_price") is not None:
+        queryset = queryset.filter(price_amount__gte=filters["min_price"])
+    if filters.get("max_price") is not None:
+        queryset = queryset.filter(price_amount__lte=filters["max_price"])
+    if filters.get("min_duration") is not None:
+        queryset = queryset.filter(duration_minutes__gte=filters["min_duration"])
+    if filters.get("max_duration") is not None:
+        queryset = queryset.filter(duration_minutes__lte=filters["max_duration"])
+    if filters.get("category"):
+        queryset = queryset.filter(business__category=filters["category"])
+    city = (filters.get("city") or "").strip()
+    if city:
+        queryset = queryset.filter(business__city__iexact=city)
+
+    return queryset
+
+
+def group_services_by_business(
+    services: QuerySet[BusinessService], business_rows: Sequence[Dict[str, object]]
+) -> List[Dict[str, object]]:
+    """
+    Attach the matching services to a page of ``business_id``/``min_price``
+    rows, fetching all of them (and their businesses) in one query.
+    """
+    business_ids = [row["business_id"] for row in business_rows]
+    grouped: Dict[object, List[BusinessService]] = {business_id: [] for business_id in business_ids}
+    businesses: Dict[object, Business] = {}
+    matches = (
+        services.filter(business_id__in=business_ids)
+        .select_related("business")
+        .order_by("business_id", "price_amount", "name")
+    )
+    for service in matches:
+        grouped[service.business_id].append(service)
+        businesses[service.business_id] = service.business
+
+    return [
+        {
+            "business": businesses[row["business_id"]],
+            "services": grouped[row["business_id"]],
+            "min_price": row["min_price"],
+        }
+        for row in business_rows
+        if row["business_id"] in businesses
+    ]
+
+
 def get_business_timezone(business: Business) -> ZoneInfo:
     tz_name = business.timezone or settings.TIME_ZONE
     try:
@@ -29,6 +221,61 @@ def get_business_timezone(business: Business) -> ZoneInfo:
         return ZoneInfo(settings.TIME_ZONE)
 
 
+OPENING_HOUR_FIELDS = ("is_closed", "open_time", "close_time")
+
+
+def replace_opening_hours(
+    business: Business, hours: Iterable[Dict[str, object]]
+) -> Tuple[List[BusinessOpeningHour], Set[int]]:
+    """
+    Make ``hours`` (validated rows, one per weekday) the week of ``business``.
+
+    Only the difference to the stored week is written: weekdays missing from
+    ``hours`` are deleted and new or changed ones upserted in one
+    ``bulk_create``, so unchanged days are never missing in between.
+    ``bulk_create`` sends no signals, hence the caches of the changed
+    weekdays are invalidated here. Returns the week ordered by weekday and
+    the changed weekdays.
+    """
+    week = {row["day_of_week"]: BusinessOpeningHour(business=business, **row) for row in hours}
+    with transaction.atomic():
+        current = {
+            hour.day_of_week: hour
+            for hour in BusinessOpeningHour.objects.select_for_update().filter(business=business)
+        }
+        removed = set(current) - set(week)
+        # Updated weekdays keep their row: the upsert leaves the stored primary
+        # key alone, so the instance must carry it rather than a fresh one.
+        for day in week.keys() & current.keys():
+            week[day].pk = current[day].pk
+        upserted = [
+            hour
+            for day, hour in week.items()
+            if day not in current
+            or any(getattr(hour, name) != getattr(current[day], name) for name in OPENING_HOUR_FIELDS)
+        ]
+        if removed:
+            BusinessOpeningHour.objects.filter(business=business, day_of_week__in=removed).delete()
+        if upserted:
+            BusinessOpeningHour.objects.bulk_create(
+                upserted,
+                update_conflicts=True,
+                unique_fields=["business", "day_of_week"],
+                update_fields=list(OPENING_HOUR_FIELDS),
+            )
+
+        upserted_days = {hour.day_of_week for hour in upserted}
+        changed = removed | upserted_days
+        if changed:
+            invalidate_business_detail(business.slug)
+            invalidate_availability(business.pk, weekdays=changed)
+            schedule_directory_publish(slugs=[business.slug])
+
+    # Unchanged days keep their stored rows (and primary keys).
+    week.update({day: current[day] for day in week if day not in upserted_days})
+    return [week[day] for day in sorted(week)], changed
+
+
 def get_business_hours_for_date(business: Business, target_date: date) -> Optional[BusinessOpeningHour]:
     day_index = target_date.weekday()
     try:
@@ -132,6 +379,33 @@ def calculate_daily_availability(business: Business, service: BusinessService, t
     return available_slots
 
 
+def get_daily_availability(
+    business: Business,
+    service: BusinessService,
+    target_date: date,
+    allow_stale: bool = False,
+) -> List[time]:
+    """
+    ``calculate_daily_availability`` served from the shared cache.
+
+    Entries are invalidated by the appointment, service and opening hour
+    signals; with ``allow_stale`` a recently invalidated list may still be
+    returned while it is refreshed in the background. Slots that passed
+    since an entry was computed are dropped on read. Bookings are always
+    checked against the database by ``is_slot_available``.
+    """
+    lookup = get_recent_availability if allow_stale else get_or_compute_availability
+    slots = lookup(
+        business.id,
+        service.id,
+        target_date,
+        lambda: calculate_daily_availability(business, service, target_date),
+    )
+    tz = get_business_timezone(business)
+    now_local = timezone.now().astimezone(tz)
+    return [slot for slot in slots if _build_local_datetime(target_date, slot, tz) >= now_local]
+
+
 def is_slot_available(business: Business, service: BusinessService, start_local: datetime) -> bool:
     tz = get_business_timezone(business)
     start_local = start_local.astimezone(tz)
@@ -0,0 +1,199 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import invalidate_availability, invalidate_business_detail, invalidate_business_listing
+from .counters import adjust_directory_counters, directory_keys
+from .models import (
+    Appointment,
+    AppointmentTombstone,
+    Business,
+    BusinessOpeningHour,
+    BusinessService,
+)
+from .publishing import schedule_directory_publish
+from .rollups import AppointmentState, apply_appointment_change, reprice_service_revenue
+from .streams import appointment_local_dates, publish_availability_change
+
+
+@receiver(pre_save, sender=Business)
+def remember_previous_state(sender, instance: Business, raw=False, **kwargs):
+    instance._previous_directory_keys = ()
+    instance._previous_slug = None
+    if raw or instance._state.adding:
+        return
+    previous = (
+        Business.objects.filter(pk=instance.pk).values("category", "city", "slug").first()
+    )
+    if previous:
+        instance._previous_directory_keys = directory_keys(previous["category"], previous["city"])
+        instance._previous_slug = previous["slug"]
+
+
+@receiver(post_save, sender=Business)
+def update_directory_counters(sender, instance: Business, created: bool, raw=False, **kwargs):
+    if raw:
+        return
+    current = directory_keys(instance.category, instance.city)
+    previous = getattr(instance, "_previous_directory_keys", ())
+    if created:
+        previous = ()
+    adjust_directory_counters([key for key in previous if key not in current], -1)
+    adjust_directory_counters([key for key in current if key not in previous], 1)
+    invalidate_business_listing(previous + current)
+    previous_slug = getattr(instance, "_previous_slug", None)
+    invalidate_business_detail(instance.slug, previous_slug)
+    invalidate_availability(instance.pk)
+    schedule_directory_publish(
+        slugs=[instance.slug],
+        directory_keys=previous + current,
+        removed_slugs=[previous_slug] if previous_slug != instance.slug else (),
+    )
+
+
+@receiver(post_delete, sender=Business)
+def release_directory_counters(sender, instance: Business, **kwargs):
+    keys = directory_keys(instance.category, instance.city)
+    adjust_directory_counters(keys, -1)
+    invalidate_business_listing(keys)
+    invalidate_business_detail(instance.slug)
+    schedule_directory_publish(directory_keys=keys, removed_slugs=[instance.slug])
+
+
+@receiver(pre_save, sender=BusinessService)
+def remember_previous_price(sender, instance: BusinessService, raw=False, **kwargs):
+    instance._previous_price = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_price = (
+        BusinessService.objects.filter(pk=instance.pk).values_list("price_amount", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=BusinessService)
+def reprice_daily_stats(sender, instance: BusinessService, created: bool, raw=False, **kwargs):
+    if raw or created:
+        return
+    if getattr(instance, "_previous_price", None) != instance.price_amount:
+        reprice_service_revenue(instance)
+
+
+@receiver(post_save, sender=BusinessService)
+@receiver(post_delete, sender=BusinessService)
+def invalidate_service_caches(sender, instance: BusinessService, raw=False, **kwargs):
+    if raw:
+        return
+    business = (
+        Business.objects.filter(pk=instance.business_id).values("category", "city", "slug").first()
+    )
+    if business is None:
+        return
+    invalidate_availability(instance.business_id)
+    keys = directory_keys(business["category"], business["city"])
+    invalidate_business_listing(keys)
+    invalidate_business_detail(business["slug"])
+    schedule_directory_publish(slugs=[business["slug"]], directory_keys=keys)
+
+
+@receiver(post_save, sender=BusinessOpeningHour)
+@receiver(post_delete, sender=BusinessOpeningHour)
+def invalidate_opening_hour_caches(sender, instance: BusinessOpeningHour, raw=False, **kwargs):
+    if raw:
+        return
+    slug = Business.objects.filter(pk=instance.business_id).values_list("slug", flat=True).first()
+    invalidate_business_detail(slug)
+    # A deleted day only affects its weekday; a saved one may have moved.
+    weekdays = [instance.day_of_week] if kwargs.get("signal") is post_delete else ()
+    invalidate_availability(instance.business_id, weekdays=weekdays)
+    schedule_directory_publish(slugs=[slug])
+
+
+@receiver(post_delete, sender=Appointment)
+def record_appointment_tombstone(sender, instance: Appointment, **kwargs):
+    AppointmentTombstone.objects.create(
+        appointment_id=instance.pk, customer_id=instance.customer_id
+    )
+
+
+# Fields whose change can free or take a slot.
+_AVAILABILITY_FIELDS = ("start", "end", "buffer_minutes", "status")
+
+
+@receiver(pre_save, sender=Appointment)
+def remember_previous_slot(sender, instance: Appointment, raw=False, **kwargs):
+    instance._previous_slot = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_slot = (
+        Appointment.objects.filter(pk=instance.pk)
+        .values(*_AVAILABILITY_FIELDS, "service_id", "staff_id", "service__price_amount")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def availability_changed(sender, instance: Appointment, raw=False, created=None, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_slot", None)
+    if created is False and previous is not None:
+        # Plain updates (notes, calendar ids) leave availability alone.
+        if all(previous[field] == getattr(instance, field) for field in _AVAILABILITY_FIELDS):
+            return
+    business = instance.business
+    dates = appointment_local_dates(business, instance.start, instance.end, instance.buffer_minutes)
+    if created is False and previous is not None:
+        dates |= appointment_local_dates(
+            business, previous["start"], previous["end"], previous["buffer_minutes"]
+        )
+    invalidate_availability(instance.business_id, dates)
+    publish_availability_change(instance.business_id, dates)
+
+
+# Fields the daily rollup depends on.
+_STATS_FIELDS = ("start", "end", "status", "service_id", "staff_id")
+
+
+def _stats_state(instance: Appointment, **overrides) -> AppointmentState:
+    fields = {
+        "start": instance.start,
+        "end": instance.end,
+        "status": instance.status,
+        "created_at": instance.created_at,
+        "price": instance.service.price_amount,
+        "service_id": instance.service_id,
+        "staff_id": instance.staff_id,
+    }
+    fields.update(overrides)
+    return AppointmentState(**fields)
+
+
+@receiver(post_save, sender=Appointment)
+def update_daily_stats(sender, instance: Appointment, created: bool, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None
+    if not created:
+        slot = getattr(instance, "_previous_slot", None)
+        if slot is None:
+            return
+        if all(slot[field] == getattr(instance, field) for field in _STATS_FIELDS):
+            return
+        previous = _stats_state(
+            instance,
+            start=slot["start"],
+            end=slot["end"],
+            status=slot["status"],
+            price=slot["service__price_amount"],
+            service_id=slot["service_id"],
+            staff_id=slot["staff_id"],
+        )
+    apply_appointment_change(instance.business, previous, _stats_state(instance))
+
+
+@receiver(post_delete, sender=Appointment)
+def release_daily_stats(sender, instance: Appointment, origin=None, **kwargs):
+    # A deleted business takes its rollup rows with it.
+    if isinstance(origin, Business) or getattr(origin, "model", None) is Business:
+        return
+    apply_appointment_change(instance.business, _stats_state(instance), None)
@@ -0,0 +1,54 @@
+"""
+Availability change notifications for the SSE stream.
+
+Saving or deleting an appointment publishes ``(business_id, local date)``
+keys for every day it touches, after the transaction commits, so
+subscribers re-read availability against committed data. With
+``REDIS_URL`` the notifications are relayed to the subscribers of every
+worker; without it only to those of the worker that made the change, so
+the stream needs a single worker there (see ``gunicorn.conf.py``).
+"""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Iterable, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from backend.broadcast import Broadcaster, RedisRelay
+from .services import get_business_timezone
+
+availability_broadcaster = Broadcaster(
+    relay=RedisRelay(settings.REDIS_URL, "sessly:availability") if settings.REDIS_URL else None
+)
+
+
+def availability_key(business_id, target_date: date) -> Tuple[str, str]:
+    return str(business_id), target_date.isoformat()
+
+
+def appointment_local_dates(business, start, end, buffer_minutes: int = 0) -> Set[date]:
+    """Business-local days covered by an appointment and its trailing buffer."""
+    tz = get_business_timezone(business)
+    end += timedelta(minutes=buffer_minutes)
+    first = start.astimezone(tz).date()
+    last = (end - timedelta(microseconds=1)).astimezone(tz).date() if end > start else first
+    return {first + timedelta(days=offset) for offset in range((last - first).days + 1)}
+
+
+def publish_availability_change(business_id, dates: Iterable[date]) -> None:
+    # Without a relay, notifications only reach subscribers of this process.
+    if availability_broadcaster.relay is None and not availability_broadcaster.has_subscribers():
+        return
+    keys = {availability_key(business_id, day) for day in dates}
+    if not keys:
+        return
+
+    def publish():
+        for key in keys:
+            availability_broadcaster.publish(key)
+
+    # A failed relay must not fail the committed request.
+    transaction.on_commit(publish, robust=True)
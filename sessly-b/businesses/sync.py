@@ -0,0 +1,158 @@
+"""
+Delta sync of a customer's appointments (``?updated_since=<cursor>``).
+
+A cursor is an opaque ``(updated_at, id)`` position. A sync page returns the
+appointments and the tombstones of deleted appointments past that position
+as one stream in ``(time, id)`` order, at most ``limit`` entries, and the
+cursor to continue from. A full sync (no cursor) has nothing to delete and
+skips the tombstones.
+
+Tombstones are kept for ``APPOINTMENT_SYNC_RETENTION_DAYS``
+(``prune_sync_tombstones``); an older cursor gets a full sync with
+``reset`` set, telling the client to drop its copy first.
+
+``updated_at`` and ``deleted_at`` are stamped before the saving transaction
+commits, so a change may become visible behind a cursor already handed
+out. Cursors therefore never pass ``now - APPOINTMENT_SYNC_CURSOR_LAG``:
+newer changes are sent as well and again by the next sync, which clients
+apply idempotently.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import heapq
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Appointment, AppointmentTombstone
+
+Cursor = Tuple[datetime, Optional[uuid.UUID]]
+
+# Columns every fetched row must carry to build the next cursor.
+SYNC_COLUMNS = ("id", "updated_at")
+
+
+def encode_cursor(position: Cursor) -> str:
+    moment, last_id = position
+    raw = f"{moment.isoformat()}|{last_id or ''}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(value: str, field: str = "updated_since") -> Optional[Cursor]:
+    """
+    Decode a cursor; an empty value means a first, full sync.
+
+    Errors are reported under the query parameter ``field``.
+    """
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+        moment, _, last_id = raw.partition("|")
+        moment = datetime.fromisoformat(moment)
+        last_id = uuid.UUID(last_id) if last_id else None
+    except (ValueError, UnicodeDecodeError, binascii.Error) as exc:
+        raise ValidationError({field: "Nieprawidlowy kursor"}) from exc
+    if timezone.is_naive(moment):
+        raise ValidationError({field: "Nieprawidlowy kursor"})
+    return moment, last_id
+
+
+@dataclass
+class SyncPage:
+    changed: List[Dict[str, Any]]
+    deleted: List[uuid.UUID]
+    cursor: str
+    has_more: bool
+    reset: bool = False
+
+
+def _after(cursor: Cursor, moment_field: str, id_field: str) -> Q:
+    moment, last_id = cursor
+    after = Q(**{f"{moment_field}__gt": moment})
+    if last_id is not None:
+        after |= Q(**{moment_field: moment, f"{id_field}__gt": last_id})
+    return after
+
+
+def _retention_start(now: datetime) -> datetime:
+    return now - timedelta(days=settings.APPOINTMENT_SYNC_RETENTION_DAYS)
+
+
+def appointment_changes(
+    customer,
+    cursor: Optional[Cursor],
+    limit: int,
+    rows: Optional[Callable[[QuerySet], QuerySet]] = None,
+) -> SyncPage:
+    """
+    One delta sync page for ``customer``.
+
+    Args:
+        customer: Owner of the appointments
+        cursor: Decoded ``updated_since`` cursor, ``None`` for a full sync
+        limit: Maximum number of changed and deleted appointments in the page
+        rows: Optional callable turning the appointment queryset into the
+            ``values()`` rows to fetch; they must include ``SYNC_COLUMNS``
+    """
+    # Rows saved after this moment are left for the next sync; rows saved
+    # after the horizon may still be joined by slower transactions.
+    now = timezone.now()
+    horizon = now - timedelta(seconds=settings.APPOINTMENT_SYNC_CURSOR_LAG)
+    # Deletions before the retention window may have been pruned.
+    reset = cursor is None or cursor[0] < _retention_start(now)
+    if reset:
+        cursor = None
+    queryset = Appointment.objects.filter(customer=customer, updated_at__lte=now)
+    if cursor is not None:
+        queryset = queryset.filter(_after(cursor, "updated_at", "id"))
+    queryset = queryset.order_by("updated_at", "id")
+    fetched = (rows(queryset) if rows else queryset.values(*SYNC_COLUMNS))[: limit + 1]
+    entries = [((row["updated_at"], row["id"]), row) for row in fetched]
+
+    if cursor is not None:
+        tombstones = (
+            AppointmentTombstone.objects.filter(customer=customer, deleted_at__lte=now)
+            .filter(_after(cursor, "deleted_at", "appointment_id"))
+            .order_by("deleted_at", "appointment_id")
+            .values_list("deleted_at", "appointment_id")[: limit + 1]
+        )
+        removals = [(key, None) for key in tombstones]
+        entries = list(islice(heapq.merge(entries, removals, key=itemgetter(0)), limit + 1))
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    settled = [key for key, _ in entries if key[0] <= horizon]
+    if has_more and settled:
+        position: Cursor = settled[-1]
+    else:
+        # Drained, or only changes within the lag window are left (more than
+        # ``limit`` of them): the next sync resumes at the horizon.
+        position = (horizon, None)
+        has_more = False
+
+    return SyncPage(
+        changed=[row for _, row in entries if row is not None],
+        deleted=[key[1] for key, row in entries if row is None],
+        cursor=encode_cursor(position),
+        has_more=has_more,
+        reset=reset,
+    )
+
+
+def prune_sync_tombstones(now: Optional[datetime] = None) -> int:
+    """Delete the tombstones past the retention window; returns how many."""
+    start = _retention_start(now or timezone.now())
+    deleted, _ = AppointmentTombstone.objects.filter(deleted_at__lt=start).delete()
+    return deleted
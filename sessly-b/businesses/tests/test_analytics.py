@@ -0,0 +1,162 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from businesses.analytics import bucket_starts, business_analytics, comparison_range
+from businesses.models import Appointment, Business, BusinessService, BusinessStaff
+
+User = get_user_model()
+WARSAW = ZoneInfo("Europe/Warsaw")
+
+
+class AnalyticsFixtureMixin:
+    def create_fixture(self):
+        self.customer = User.objects.create_user(username="jan", email="jan@example.com", password="secret123")
+        self.business = Business.objects.create(
+            name="Salon Analiz",
+            slug="salon-analiz",
+            category=Business.Category.BEAUTY,
+            timezone="Europe/Warsaw",
+            address_line1="ul. Wykresowa 2",
+            city="Poznan",
+            postal_code="60-001",
+            country="Polska",
+        )
+        self.massage = BusinessService.objects.create(
+            business=self.business, name="Masaz", duration_minutes=60, price_amount=Decimal("150.00")
+        )
+        self.manicure = BusinessService.objects.create(
+            business=self.business, name="Manicure", duration_minutes=30, price_amount=Decimal("80.00")
+        )
+        stylist = User.objects.create_user(
+            username="ola", email="ola@example.com", password="secret123", first_name="Ola", last_name="Nowak"
+        )
+        self.staff = BusinessStaff.objects.create(business=self.business, user=stylist)
+
+    def book(self, day, service, status=Appointment.Status.CONFIRMED, staff=None):
+        start = datetime.combine(day, time(10), tzinfo=WARSAW)
+        return Appointment.objects.create(
+            business=self.business,
+            service=service,
+            staff=staff,
+            customer=self.customer,
+            start=start,
+            end=start + timedelta(minutes=service.duration_minutes),
+            status=status,
+        )
+
+
+class BusinessAnalyticsTests(AnalyticsFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_fixture()
+        # Monday 2 March 2026 .. Sunday 15 March 2026, and the week before.
+        self.book(date(2026, 3, 2), self.massage, staff=self.staff)
+        self.book(date(2026, 3, 4), self.manicure)
+        self.book(date(2026, 3, 5), self.manicure, status=Appointment.Status.CANCELLED)
+        self.book(date(2026, 3, 12), self.massage, status=Appointment.Status.PENDING, staff=self.staff)
+        self.book(date(2026, 2, 25), self.massage)
+
+    def test_weekly_series_breakdowns_and_comparison(self):
+        with self.assertNumQueries(4):
+            report = business_analytics(
+                self.business, date(2026, 3, 2), date(2026, 3, 15), interval="week", compare="previous"
+            )
+
+        self.assertEqual([bucket["period"] for bucket in report["series"]], [date(2026, 3, 2), date(2026, 3, 9)])
+        first, second = report["series"]
+        self.assertEqual((first["bookings"], first["cancelled"], first["revenue"]), (3, 1, Decimal("230.00")))
+        self.assertEqual(first["cancellation_rate"], round(1 / 3, 4))
+        self.assertEqual((second["bookings"], second["confirmed"], second["booked_minutes"]), (1, 0, 60))
+        self.assertEqual(report["totals"]["bookings"], 4)
+        self.assertEqual(report["totals"]["revenue"], Decimal("230.00"))
+
+        self.assertEqual(
+            [(item["name"], item["bookings"]) for item in report["by_service"]],
+            [("Manicure", 2), ("Masaz", 2)],
+        )
+        self.assertEqual(
+            [(item["name"], item["bookings"]) for item in report["by_staff"]],
+            [("Ola Nowak", 2), (None, 2)],
+        )
+
+        comparison = report["comparison"]
+        self.assertEqual((comparison["date_from"], comparison["date_to"]), (date(2026, 2, 16), date(2026, 3, 1)))
+        self.assertEqual(comparison["totals"]["bookings"], 1)
+        self.assertEqual(comparison["totals"]["revenue"], Decimal("150.00"))
+
+    def test_filters_and_empty_buckets(self):
+        report = business_analytics(
+            self.business, date(2026, 3, 1), date(2026, 3, 5), service_id=self.manicure.id
+        )
+
+        self.assertEqual(len(report["series"]), 5)
+        self.assertEqual([bucket["bookings"] for bucket in report["series"]], [0, 0, 0, 1, 1])
+        self.assertEqual(report["series"][0]["cancellation_rate"], 0.0)
+        self.assertEqual([item["name"] for item in report["by_service"]], ["Manicure"])
+        self.assertIsNone(report["comparison"])
+
+        staff_report = business_analytics(self.business, date(2026, 3, 1), date(2026, 3, 31), staff_id=self.staff.id)
+        self.assertEqual(staff_report["totals"]["bookings"], 2)
+
+    def test_moved_appointments_leave_no_breakdown_rows(self):
+        appointment = Appointment.objects.get(start__date=date(2026, 3, 4))
+        appointment.start += timedelta(days=30)
+        appointment.end += timedelta(days=30)
+        appointment.save()
+
+        report = business_analytics(self.business, date(2026, 3, 4), date(2026, 3, 4))
+
+        self.assertEqual(report["by_service"], [])
+        self.assertEqual(report["by_staff"], [])
+
+    def test_ranges(self):
+        self.assertEqual(bucket_starts(date(2026, 1, 31), date(2026, 3, 1), "month"), [
+            date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1),
+        ])
+        self.assertEqual(
+            comparison_range(date(2024, 2, 1), date(2024, 2, 29), "year"),
+            (date(2023, 2, 1), date(2023, 2, 28)),
+        )
+
+
+class BusinessAnalyticsAPITests(AnalyticsFixtureMixin, APITestCase):
+    def setUp(self):
+        self.create_fixture()
+        self.owner = User.objects.create_user(
+            username="wlasciciel",
+            email="wlasciciel@example.com",
+            password="secret123",
+            role=User.Role.BUSINESS_OWNER,
+            business=self.business,
+        )
+        self.client.force_authenticate(self.owner)
+        self.url = reverse("my-business-analytics", args=[self.business.id])
+
+    def test_monthly_report(self):
+        self.book(date(2026, 1, 10), self.massage)
+        response = self.client.get(
+            self.url, {"date_from": "2026-01-01", "date_to": "2026-03-31", "interval": "month", "compare": "year"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()["data"]
+        self.assertEqual(data["interval"], "month")
+        self.assertEqual([bucket["period"] for bucket in data["series"]], ["2026-01-01", "2026-02-01", "2026-03-01"])
+        self.assertEqual(data["series"][0]["bookings"], 1)
+        self.assertEqual(data["comparison"]["date_from"], "2025-01-01")
+
+    def test_invalid_ranges(self):
+        response = self.client.get(self.url, {"date_from": "2026-03-02", "date_to": "2026-03-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {"date_from": "2020-01-01", "date_to": "2026-01-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {"interval": "year"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
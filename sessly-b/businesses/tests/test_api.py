@@ -1,12 +1,26 @@
 from datetime import time, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from businesses.models import Appointment, Business, BusinessOpeningHour, BusinessService
+from backend.parsers import MessagePackParser
+from businesses.models import (
+    Appointment,
+    Business,
+    BusinessDirectoryCounter,
+    BusinessOpeningHour,
+    BusinessService,
+)
+from businesses.services import replace_opening_hours
 
 User = get_user_model()
 
@@ -62,6 +76,169 @@ class BusinessAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(any(item["slug"] == self.business.slug for item in response.data))
 
+    def test_list_businesses_aggregates_active_services(self):
+        BusinessService.objects.create(
+            business=self.business,
+            name="Koloryzacja",
+            duration_minutes=90,
+            price_amount=250,
+        )
+        BusinessService.objects.create(
+            business=self.business,
+            name="Usluga archiwalna",
+            duration_minutes=240,
+            price_amount=10,
+            is_active=False,
+        )
+
+        url = reverse("business-list")
+        # Savepoint pair from ATOMIC_REQUESTS, the page count and the page itself.
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = next(row for row in response.data["results"] if row["slug"] == self.business.slug)
+        self.assertEqual(item["services_count"], 2)
+        self.assertEqual(item["min_price"], "120.00")
+        self.assertEqual(item["max_duration"], 90)
+
+    def test_list_businesses_sparse_fields(self):
+        url = reverse("business-list")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"fields": "id,name,slug"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = next(row for row in response.data["results"] if row["slug"] == self.business.slug)
+        self.assertEqual(set(item), {"id", "name", "slug"})
+        page_sql = queries.captured_queries[-2]["sql"]
+        self.assertNotIn("GROUP BY", page_sql)
+        self.assertNotIn("description", page_sql)
+
+        response = self.client.get(url, {"fields": "slug,min_price"})
+        item = next(row for row in response.data["results"] if row["slug"] == self.business.slug)
+        self.assertEqual(item, {"slug": self.business.slug, "min_price": "120.00"})
+
+        response = self.client.get(url, {"fields": "slug,owner"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_businesses_cached_until_category_changes(self):
+        url = reverse("business-list")
+        params = {"category": Business.Category.HAIRDRESSER}
+
+        first = self.client.get(url, params)
+        self.assertEqual(first["X-Cache"], "MISS")
+        second = self.client.get(url, params)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+
+        self.business.name = "Zmieniony Salon"
+        self.business.save()
+
+        third = self.client.get(url, params)
+        self.assertEqual(third["X-Cache"], "MISS")
+        self.assertIn("Zmieniony Salon", [item["name"] for item in third.data["results"]])
+
+    def test_list_businesses_with_facets(self):
+        spa = Business.objects.create(
+            name="Spa Krakow",
+            slug="spa-krakow",
+            category=Business.Category.SPA,
+            address_line1="ul. Dluga 2",
+            city="Krakow",
+            postal_code="30-001",
+        )
+        BusinessService.objects.create(
+            business=spa, name="Masaz", duration_minutes=60, price_amount=320
+        )
+
+        url = reverse("business-list")
+        response = self.client.get(url, {"facets": "category,city,price_band", "city": "krakow"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["slug"] for item in response.data["results"]], ["spa-krakow"])
+        facets = response.data["facets"]
+        self.assertEqual(facets["category"], [{"value": "spa", "count": 1}])
+        self.assertEqual(facets["city"], [{"value": "Krakow", "count": 1}])
+        self.assertEqual(facets["price_band"], [{"value": "200_500", "count": 1}])
+
+        response = self.client.get(url, {"price_band": "100_200"})
+        slugs = [item["slug"] for item in response.data["results"]]
+        self.assertIn(self.business.slug, slugs)
+        self.assertNotIn("spa-krakow", slugs)
+
+    def test_list_businesses_rejects_unknown_facet(self):
+        response = self.client.get(reverse("business-list"), {"facets": "owner"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_service_search_groups_matches_by_business(self):
+        BusinessService.objects.create(
+            business=self.business, name="Strzyzenie premium", duration_minutes=90, price_amount=200
+        )
+        BusinessService.objects.create(
+            business=self.business,
+            name="Strzyzenie archiwalne",
+            duration_minutes=30,
+            price_amount=50,
+            is_active=False,
+        )
+        other = Business.objects.create(
+            name="Salon Gdansk",
+            slug="salon-gdansk",
+            category=Business.Category.HAIRDRESSER,
+            address_line1="ul. Morska 3",
+            city="Gdansk",
+            postal_code="80-001",
+        )
+        BusinessService.objects.create(
+            business=other, name="Strzyzenie meskie", duration_minutes=45, price_amount=80
+        )
+
+        url = reverse("service-search")
+        response = self.client.get(url, {"q": "strzyzenie", "max_price": "150", "max_duration": 60})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = [
+            item
+            for item in response.data["results"]
+            if item["business"]["slug"] in {"salon-gdansk", self.business.slug}
+        ]
+        self.assertEqual([item["business"]["slug"] for item in results], ["salon-gdansk", self.business.slug])
+        self.assertEqual([service["name"] for service in results[1]["services"]], ["Strzyzenie testowe"])
+        self.assertEqual(results[0]["min_price"], "80.00")
+
+        response = self.client.get(url, {"q": "strzyzenie", "city": "gdansk"})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["business"]["slug"], "salon-gdansk")
+
+    def _category_counts(self):
+        response = self.client.get(reverse("business-category-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {item["slug"]: item["count"] for item in response.data}
+
+    def test_category_counters_follow_business_changes(self):
+        hairdressers = self._category_counts()["hairdresser"]
+        spas = self._category_counts()["spa"]
+
+        self.business.category = Business.Category.SPA
+        self.business.save()
+        counts = self._category_counts()
+        self.assertEqual(counts["hairdresser"], hairdressers - 1)
+        self.assertEqual(counts["spa"], spas + 1)
+
+        self.business.delete()
+        self.assertEqual(self._category_counts()["spa"], spas)
+
+    def test_reconcile_directory_counters(self):
+        BusinessDirectoryCounter.objects.filter(
+            dimension=BusinessDirectoryCounter.Dimension.CITY, value="Warszawa"
+        ).update(total=99)
+
+        call_command("reconcile_directory_counters", stdout=StringIO())
+
+        response = self.client.get(reverse("business-city-list"))
+        cities = {item["name"]: item["count"] for item in response.data}
+        self.assertEqual(cities["Warszawa"], Business.objects.filter(city="Warszawa").count())
+
     def test_retrieve_business_details(self):
         url = reverse("business-detail", args=[self.business.slug])
         response = self.client.get(url)
@@ -71,6 +248,202 @@ class BusinessAPITests(APITestCase):
         self.assertGreaterEqual(len(response.data["services"]), 1)
         self.assertEqual(response.data["services"][0]["duration_minutes"], self.service.duration_minutes)
 
+    def test_business_detail_sparse_fields_and_expand(self):
+        url = reverse("business-detail", args=[self.business.slug])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"fields": "name,slug"})
+        self.assertEqual(response.data, {"name": self.business.name, "slug": self.business.slug})
+        self.assertEqual(len([q for q in queries.captured_queries if q["sql"].startswith("SELECT")]), 1)
+
+        response = self.client.get(url, {"fields": "slug", "expand": "services"})
+        self.assertEqual(set(response.data), {"slug", "services"})
+        self.assertEqual(response.data["services"][0]["id"], str(self.service.id))
+
+        full = self.client.get(url)
+        self.assertIn("opening_hours", full.data)
+        self.assertNotEqual(full["ETag"], response["ETag"])
+
+        response = self.client.get(url, {"fields": "slug", "expand": "city"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_business_detail_served_from_cache_until_edited(self):
+        url = reverse("business-detail", args=[self.business.slug])
+        first = self.client.get(url)
+        self.assertEqual(first["X-Cache"], "MISS")
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        self.assertFalse([q for q in queries.captured_queries if q["sql"].startswith("SELECT")])
+
+        self.service.price_amount = 150
+        self.service.save()
+        third = self.client.get(url)
+        self.assertEqual(third["X-Cache"], "MISS")
+        self.assertEqual(third.data["services"][0]["price_amount"], "150.00")
+
+        BusinessOpeningHour.objects.filter(business=self.business, day_of_week=6).delete()
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+
+    def test_business_detail_conditional_get(self):
+        url = reverse("business-detail", args=[self.business.slug])
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.service.name = "Strzyzenie damskie"
+        self.service.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    @override_settings(RESPONSE_CACHES_ENABLED=False)
+    def test_business_detail_without_shared_cache(self):
+        # Per-process tag versions would differ between workers.
+        url = reverse("business-detail", args=[self.business.slug])
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertFalse(response.has_header("ETag"))
+        self.assertFalse(response.has_header("Last-Modified"))
+
+    def test_availability_conditional_get_tracks_bookings(self):
+        target_date = timezone.localdate() + timedelta(days=1)
+        url = reverse("business-availability", args=[self.business.slug])
+        params = {"date": target_date.isoformat(), "service_id": str(self.service.id)}
+
+        etag = self.client.get(url, params)["ETag"]
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_authenticate(self.user)
+        booking = self.client.post(
+            reverse("business-appointment-create", args=[self.business.slug]),
+            {"service_id": str(self.service.id), "date": target_date.isoformat(), "start_time": "13:00"},
+            format="json",
+        )
+        self.assertEqual(booking.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("13:00", response.data["slots"])
+
+    @override_settings(AVAILABILITY_SWR=True, AVAILABILITY_SWR_SOFT_TTL=5, AVAILABILITY_SWR_MAX_STALE=30)
+    @mock.patch("backend.caching._submit_refresh", lambda refresh: refresh())
+    def test_availability_stale_while_revalidate_for_anonymous_reads(self):
+        target_date = timezone.localdate() + timedelta(days=2)
+        url = reverse("business-availability", args=[self.business.slug])
+        params = {"date": target_date.isoformat(), "service_id": str(self.service.id)}
+
+        first = self.client.get(url, params)
+        self.assertIn("13:00", first.data["slots"])
+        self.assertIn("stale-while-revalidate=25", first["Cache-Control"])
+        self.assertIn("max-age=5", first["Cache-Control"])
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        self.client.force_authenticate(self.user)
+        booking = self.client.post(
+            reverse("business-appointment-create", args=[self.business.slug]),
+            {"service_id": str(self.service.id), "date": target_date.isoformat(), "start_time": "13:00"},
+            format="json",
+        )
+        self.assertEqual(booking.status_code, status.HTTP_201_CREATED)
+        # Signed-in users always get the current list.
+        current = self.client.get(url, params)
+        self.assertNotIn("13:00", current.data["slots"])
+        self.assertNotIn("stale-while-revalidate", current.get("Cache-Control", ""))
+
+        self.client.force_authenticate(None)
+        stale = self.client.get(url, params)
+        self.assertIn("13:00", stale.data["slots"])
+        self.assertEqual(stale["ETag"], first["ETag"])
+
+        refreshed = self.client.get(url, params)
+        self.assertNotIn("13:00", refreshed.data["slots"])
+        self.assertNotEqual(refreshed["ETag"], first["ETag"])
+
+        # The stale list never lets a taken slot be booked.
+        self.client.force_authenticate(self.user)
+        again = self.client.post(
+            reverse("business-appointment-create", args=[self.business.slug]),
+            {"service_id": str(self.service.id), "date": target_date.isoformat(), "start_time": "13:00"},
+            format="json",
+        )
+        self.assertEqual(again.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_opening_hours_touches_only_changed_weekdays(self):
+        owner = User.objects.create_user(
+            username="wlasciciel",
+            email="wlasciciel@example.com",
+            password="secret123",
+            role=User.Role.BUSINESS_OWNER,
+            business=self.business,
+        )
+        url = reverse("business-opening-hours-bulk-update", args=[self.business.slug])
+        availability_url = reverse("business-availability", args=[self.business.slug])
+        first, second = (timezone.localdate() + timedelta(days=offset) for offset in (1, 2))
+        week = [
+            {"day_of_week": day, "is_closed": False, "open_time": "09:00", "close_time": "17:00"}
+            for day in range(6)
+        ] + [{"day_of_week": 6, "is_closed": True}]
+        ids = dict(BusinessOpeningHour.objects.filter(business=self.business).values_list("day_of_week", "id"))
+
+        def computed_days(payload):
+            with mock.patch("businesses.services.calculate_daily_availability", return_value=[]) as compute:
+                for day in (first, second):
+                    self.client.get(availability_url, {"date": day.isoformat(), "service_id": str(self.service.id)})
+                self.client.force_authenticate(owner)
+                response = self.client.post(url, payload, format="json")
+                self.client.force_authenticate(None)
+                compute.reset_mock()
+                for day in (first, second):
+                    self.client.get(availability_url, {"date": day.isoformat(), "service_id": str(self.service.id)})
+            return response, [call.args[2] for call in compute.call_args_list]
+
+        week[first.weekday()] = {**week[first.weekday()], "is_closed": False, "open_time": "10:00", "close_time": "18:00"}
+        response, recomputed = computed_days(week)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 7)
+        self.assertEqual(recomputed, [first])
+        hours = {hour.day_of_week: hour for hour in BusinessOpeningHour.objects.filter(business=self.business)}
+        self.assertEqual(hours[first.weekday()].open_time, time(10, 0))
+        self.assertEqual(hours[second.weekday()].id, ids[second.weekday()])
+        self.assertEqual(hours[first.weekday()].id, ids[first.weekday()])
+
+        # A dropped day is deleted and only its weekday recomputed.
+        response, recomputed = computed_days([day for day in week if day["day_of_week"] != second.weekday()])
+        self.assertEqual(recomputed, [second])
+        self.assertFalse(
+            BusinessOpeningHour.objects.filter(business=self.business, day_of_week=second.weekday()).exists()
+        )
+
+        self.client.force_authenticate(owner)
+        response = self.client.post(url, [week[0], week[0]], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_replace_opening_hours_returns_stored_rows(self):
+        stored_ids = BusinessOpeningHour.objects.filter(business=self.business).values_list("day_of_week", "id")
+        ids = dict(stored_ids)
+        week = [
+            {"day_of_week": 0, "is_closed": False, "open_time": time(10), "close_time": time(18)},
+            {"day_of_week": 1, "is_closed": False, "open_time": time(9), "close_time": time(17)},
+            {"day_of_week": 6, "is_closed": True, "open_time": None, "close_time": None},
+        ]
+
+        hours, changed = replace_opening_hours(self.business, week)
+
+        stored = dict(stored_ids.all())
+        self.assertEqual({hour.day_of_week: hour.pk for hour in hours}, stored)
+        self.assertEqual(stored[0], ids[0])
+        self.assertIn(0, changed)
+
     def test_check_availability(self):
         target_date = timezone.localdate() + timedelta(days=1)
         url = reverse("business-availability", args=[self.business.slug])
@@ -85,6 +458,22 @@ class BusinessAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("09:00", response.data["slots"])
 
+    def test_check_availability_as_msgpack(self):
+        target_date = timezone.localdate() + timedelta(days=1)
+        url = reverse("business-availability", args=[self.business.slug])
+        params = {"date": target_date.isoformat(), "service_id": str(self.service.id)}
+
+        response = self.client.get(url, params, HTTP_ACCEPT="application/msgpack")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        data = MessagePackParser().parse(BytesIO(response.content))
+        self.assertEqual(data["service_id"], self.service.id)
+        self.assertIn(time(9, 0), data["slots"])
+
+        # JSON stays the default representation.
+        self.assertEqual(self.client.get(url, params)["Content-Type"], "application/json")
+
     def test_create_appointment_requires_authentication(self):
         target_date = timezone.localdate() + timedelta(days=1)
         url = reverse("business-appointment-create", args=[self.business.slug])
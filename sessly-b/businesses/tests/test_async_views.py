@@ -0,0 +1,244 @@
+import asyncio
+import json
+from datetime import datetime, time, timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from backend.broadcast import Broadcaster
+from backend.caching import cache_store
+from businesses.async_views import (
+    AsyncBusinessAvailabilityStreamView,
+    AsyncBusinessAvailabilityView,
+    AsyncBusinessDetailView,
+    AsyncBusinessListView,
+)
+from businesses.cache import business_detail_cache_key, business_list_cache
+from businesses.models import Appointment, Business, BusinessOpeningHour, BusinessService
+from businesses.services import get_business_timezone
+from businesses.streams import availability_broadcaster, availability_key
+
+
+class AsyncReadViewTests(TestCase):
+    """The async views must answer exactly like the sync ones."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.business = Business.objects.create(
+            name="Asynchroniczny Salon",
+            slug="asynchroniczny-salon",
+            category=Business.Category.BEAUTY,
+            timezone="Europe/Warsaw",
+            address_line1="ul. Testowa 2",
+            city="Gdansk",
+            postal_code="80-001",
+            country="Polska",
+        )
+        for day in range(7):
+            BusinessOpeningHour.objects.create(
+                business=cls.business,
+                day_of_week=day,
+                is_closed=False,
+                open_time=time(9, 0),
+                close_time=time(12, 0),
+            )
+        cls.service = BusinessService.objects.create(
+            business=cls.business,
+            name="Manicure",
+            duration_minutes=45,
+            price_amount=90,
+        )
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+    async def call(self, view_class, path, params=None, **kwargs):
+        request = self.factory.get(path, params or {}, headers=kwargs.pop("headers", None))
+        response = await view_class.as_view()(request, **kwargs)
+        if hasattr(response, "render"):
+            response = await sync_to_async(response.render)()
+        return response
+
+    async def test_views_are_async_and_non_atomic(self):
+        for view_class in (AsyncBusinessListView, AsyncBusinessDetailView, AsyncBusinessAvailabilityView):
+            self.assertTrue(view_class.view_is_async)
+            self.assertTrue(view_class.as_view()._non_atomic_requests)
+
+    async def test_list_matches_sync_view(self):
+        url = reverse("business-list")
+        params = {"city": "gdansk", "fields": "slug,services_count", "facets": "category"}
+        expected = await sync_to_async(self.client.get)(url, params)
+        business_list_cache.clear()
+
+        response = await self.call(AsyncBusinessListView, url, params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.content, expected.content)
+
+        response = await self.call(AsyncBusinessListView, url, params)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    async def test_list_invalid_page_is_not_found(self):
+        response = await self.call(AsyncBusinessListView, reverse("business-list"), {"page": 99})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_detail_matches_sync_view_and_honours_etag(self):
+        url = reverse("business-detail", args=[self.business.slug])
+        expected = await sync_to_async(self.client.get)(url)
+        # Drop the stored payload but keep the version the ETag is built from.
+        await cache.adelete(await sync_to_async(business_detail_cache_key)(self.business.slug, "json"))
+
+        response = await self.call(AsyncBusinessDetailView, url, slug=self.business.slug)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response["ETag"], expected["ETag"])
+
+        response = await self.call(
+            AsyncBusinessDetailView,
+            url,
+            slug=self.business.slug,
+            headers={"If-None-Match": expected["ETag"]},
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = await self.call(AsyncBusinessDetailView, url, slug="brak-takiego")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(CACHE_EARLY_REFRESH_BETA=1e9)
+    async def test_detail_refresh_is_left_to_the_lock_holder(self):
+        url = reverse("business-detail", args=[self.business.slug])
+        key = await sync_to_async(business_detail_cache_key)(self.business.slug, "json")
+        # Due for an early refresh, which another process is already doing.
+        await sync_to_async(cache_store)(key, (b'{"stary": true}', "application/json"), 60, delta=1.0)
+        await cache.aadd(f"{key}:lock", 1, 60)
+        self.addCleanup(cache.delete_many, [key, f"{key}:lock"])
+
+        response = await self.call(AsyncBusinessDetailView, url, slug=self.business.slug)
+
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.content, b'{"stary": true}')
+
+    async def test_availability_matches_sync_view(self):
+        url = reverse("business-availability", args=[self.business.slug])
+        params = {
+            "date": (timezone.localdate() + timedelta(days=1)).isoformat(),
+            "service_id": str(self.service.id),
+        }
+        expected = await sync_to_async(self.client.get)(url, params)
+
+        response = await self.call(AsyncBusinessAvailabilityView, url, params, slug=self.business.slug)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, expected.content)
+
+        response = await self.call(AsyncBusinessAvailabilityView, url, {"date": "jutro"}, slug=self.business.slug)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def read_event(self, iterator):
+        return await asyncio.wait_for(anext(iterator), timeout=5)
+
+    @override_settings(AVAILABILITY_STREAM_KEEPALIVE=60)
+    async def test_availability_stream_pushes_slots_on_booking(self):
+        day = timezone.localdate() + timedelta(days=1)
+        path = f"/api/businesses/{self.business.slug}/availability/stream/"
+        params = {"date": day.isoformat(), "service_id": str(self.service.id)}
+        expected = await sync_to_async(self.client.get)(
+            reverse("business-availability", args=[self.business.slug]), params
+        )
+
+        response = await self.call(AsyncBusinessAvailabilityStreamView, path, params, slug=self.business.slug)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+
+        event = await self.read_event(events)
+        self.assertTrue(event.startswith(b"event: availability\ndata: "))
+        self.assertEqual(json.loads(event.split(b"data: ", 1)[1]), expected.json())
+        self.assertTrue(availability_broadcaster.has_subscribers(availability_key(self.business.pk, day)))
+
+        def book():
+            customer = get_user_model().objects.create_user(
+                username="ola", email="ola@example.com", password="secret123"
+            )
+            start = datetime.combine(day, time(9, 0), tzinfo=get_business_timezone(self.business))
+            with self.captureOnCommitCallbacks(execute=True):
+                Appointment.objects.create(
+                    business=self.business,
+                    service=self.service,
+                    customer=customer,
+                    start=start,
+                    end=start + timedelta(minutes=45),
+                )
+
+        await sync_to_async(book)()
+
+        slots = json.loads((await self.read_event(events)).split(b"data: ", 1)[1])["slots"]
+        self.assertNotIn("09:00", slots)
+        self.assertLess(len(slots), len(expected.json()["slots"]))
+
+        # A client disconnect cancels the pending read, like the ASGI handler does.
+        pending = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertFalse(availability_broadcaster.has_subscribers())
+
+    @override_settings(AVAILABILITY_STREAM_MAX_SECONDS=0)
+    async def test_availability_stream_ends_after_max_duration(self):
+        path = f"/api/businesses/{self.business.slug}/availability/stream/"
+        params = {"date": timezone.localdate().isoformat(), "service_id": str(self.service.id)}
+        response = await self.call(AsyncBusinessAvailabilityStreamView, path, params, slug=self.business.slug)
+
+        events = [event async for event in response.streaming_content]
+
+        self.assertEqual(len(events), 1)
+        self.assertFalse(availability_broadcaster.has_subscribers())
+
+    async def test_availability_stream_rejects_unknown_service(self):
+        path = f"/api/businesses/{self.business.slug}/availability/stream/"
+        params = {"date": timezone.localdate().isoformat(), "service_id": str(self.business.pk)}
+        response = await self.call(AsyncBusinessAvailabilityStreamView, path, params, slug=self.business.slug)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BroadcasterTests(TestCase):
+    async def test_notifications_collapse_and_subscriptions_are_dropped(self):
+        broadcaster = Broadcaster()
+        async with broadcaster.subscribe("a") as subscription:
+            self.assertTrue(broadcaster.has_subscribers("a"))
+            broadcaster.publish("b")
+            broadcaster.publish("a", 1)
+            broadcaster.publish("a", 2)
+            self.assertEqual(await subscription.wait(1), 1)
+            with self.assertRaises(asyncio.TimeoutError):
+                await subscription.wait(0.05)
+        self.assertFalse(broadcaster.has_subscribers())
+
+    async def test_relay_reaches_subscribers_of_other_workers(self):
+        channel = []
+
+        class ChannelRelay:
+            """Stands in for the Redis channel shared by the workers."""
+
+            listening = False
+
+            def send(self, key, event=None):
+                for deliver in channel:
+                    deliver(key, event)
+
+            def listen(self, deliver):
+                channel.append(deliver)
+                self.listening = True
+
+        worker_a, worker_b = Broadcaster(relay=ChannelRelay()), Broadcaster(relay=ChannelRelay())
+        async with worker_b.subscribe(("1", "2026-05-04")) as subscription:
+            worker_a.publish(("1", "2026-05-04"), "zmiana")
+            self.assertEqual(await subscription.wait(1), "zmiana")
+            self.assertFalse(worker_a.has_subscribers())
@@ -0,0 +1,92 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from backend.caching import SingleFlight, cache_store, get_or_compute
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_computation(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "wynik"
+
+        def call():
+            results.append(flight.do("klucz", compute))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        waiters = [threading.Thread(target=call) for _ in range(3)]
+        for thread in waiters:
+            thread.start()
+        # Wait until all of them block on the leader's call.
+        while len(flight._calls["klucz"].done._cond._waiters) < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in [leader, *waiters]:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("wynik", False)] + [("wynik", True)] * 3)
+        self.assertFalse(flight.is_running("klucz"))
+
+    def test_errors_are_raised_and_not_remembered(self):
+        flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do("klucz", mock.Mock(side_effect=ValueError))
+        self.assertEqual(flight.do("klucz", lambda: 1), (1, False))
+
+
+@override_settings(CACHE_EARLY_REFRESH_BETA=0, CACHE_STAMPEDE_LOCK_TIMEOUT=1)
+class GetOrComputeTests(SimpleTestCase):
+    def setUp(self):
+        cache.delete_many(["test-entry", "test-entry:lock"])
+        self.addCleanup(cache.delete_many, ["test-entry", "test-entry:lock"])
+
+    def test_miss_computes_once_and_hit_reuses(self):
+        compute = mock.Mock(return_value=[1, 2])
+        self.assertEqual(get_or_compute("test-entry", compute, 60), ([1, 2], True))
+        self.assertEqual(get_or_compute("test-entry", compute, 60), ([1, 2], False))
+        compute.assert_called_once()
+
+    def test_locked_refresh_serves_current_value(self):
+        # Past its logical expiry, still present in the cache.
+        cache.set("test-entry", ("stare", 0.1, time.time() - 1), 60)
+        cache.add("test-entry:lock", 1, 60)
+        compute = mock.Mock(return_value="nowe")
+
+        self.assertEqual(get_or_compute("test-entry", compute, 60), ("stare", False))
+        compute.assert_not_called()
+
+    def test_cold_miss_waits_for_lock_holder(self):
+        cache.add("test-entry:lock", 1, 60)
+        threading.Timer(0.1, cache_store, args=("test-entry", "od-innego", 60)).start()
+        compute = mock.Mock(return_value="wlasne")
+
+        self.assertEqual(get_or_compute("test-entry", compute, 60), ("od-innego", False))
+        compute.assert_not_called()
+
+    @override_settings(RESPONSE_CACHES_ENABLED=False)
+    def test_disabled_caches_always_compute(self):
+        compute = mock.Mock(return_value="nowe")
+        self.assertEqual(get_or_compute("test-entry", compute, 60), ("nowe", True))
+        self.assertEqual(get_or_compute("test-entry", compute, 60), ("nowe", True))
+        self.assertIsNone(cache.get("test-entry"))
+
+    @override_settings(CACHE_EARLY_REFRESH_BETA=1e9)
+    def test_entry_is_refreshed_before_expiry(self):
+        cache.set("test-entry", ("stare", 1.0, time.time() + 30), 60)
+        self.assertEqual(get_or_compute("test-entry", lambda: "nowe", 60), ("nowe", True))
+        self.assertEqual(cache.get("test-entry")[0], "nowe")
@@ -3,13 +3,24 @@ Additional comprehensive tests for businesses app.
 """
 
 from datetime import time, timedelta
+from decimal import Decimal
+from io import StringIO
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 
-from businesses.models import Appointment, Business, BusinessOpeningHour, BusinessService
+from businesses.models import Appointment, AppointmentTombstone, Business, BusinessOpeningHour, BusinessService
+from businesses.sync import encode_cursor
+from businesses.serializers import (
+    ADMIN_APPOINTMENT_ROWS,
+    AdminAppointmentSerializer,
+    AppointmentSerializer,
+)
 
 User = get_user_model()
 
@@ -66,6 +77,190 @@ class CustomerAppointmentTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
     
+    def test_list_my_appointments_conditional_get(self):
+        """Unchanged appointment list answers 304 to a matching ETag."""
+        url = reverse('customer-appointments-list')
+        etag = self.client.get(url)['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        self.appointment.notes = "Prosze o kontakt"
+        self.appointment.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_list_my_appointments_etag_covers_the_service(self):
+        """An owner's edit of the embedded service changes the validator."""
+        url = reverse('customer-appointments-list')
+        etag = self.client.get(url)['ETag']
+        
+        self.service.price_amount = Decimal('99.00')
+        self.service.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['service']['price_amount'], '99.00')
+    
+    def test_list_my_appointments_matches_serializer(self):
+        """The values() fast path renders exactly what the serializers render."""
+        self.appointment.confirmed_at = timezone.now()
+        self.appointment.notes = "Zażółć gęślą jaźń"
+        self.appointment.save()
+        url = reverse('customer-appointments-list')
+        response = self.client.get(url)
+        
+        queryset = Appointment.objects.filter(customer=self.user).order_by('-start')
+        expected = JSONRenderer().render(AppointmentSerializer(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(response.data['results']), expected)
+        
+        rows = ADMIN_APPOINTMENT_ROWS.format(ADMIN_APPOINTMENT_ROWS.values(queryset))
+        expected = JSONRenderer().render(AdminAppointmentSerializer(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(rows), expected)
+    
+    def test_list_my_appointments_sparse_fields(self):
+        """Only the requested fields are returned; the service block needs expand."""
+        url = reverse('customer-appointments-list')
+        response = self.client.get(url, {'fields': 'id,status'})
+        self.assertEqual(response.data['results'][0], {'id': str(self.appointment.id), 'status': 'pending'})
+        
+        response = self.client.get(url, {'fields': 'id', 'expand': 'service'})
+        self.assertEqual(response.data['results'][0]['service']['name'], self.service.name)
+        self.assertEqual(response.data['results'][0]['service']['total_slot_minutes'], 60)
+        
+        response = self.client.get(reverse('customer-appointments-detail', args=[self.appointment.id]), {'fields': 'id'})
+        self.assertEqual(response.data, {'id': str(self.appointment.id)})
+    
+    @override_settings(APPOINTMENT_SYNC_CURSOR_LAG=0)
+    def test_delta_sync(self):
+        """Only changes after the cursor are returned, deletions as tombstones."""
+        url = reverse('customer-appointments-list')
+        response = self.client.get(url, {'updated_since': ''})
+        self.assertEqual([row['id'] for row in response.data['results']], [str(self.appointment.id)])
+        self.assertEqual(response.data['deleted'], [])
+        cursor = response.data['cursor']
+        
+        response = self.client.get(url, {'updated_since': cursor})
+        self.assertEqual(response.data['results'], [])
+        
+        other = Appointment.objects.create(
+            business=self.business,
+            service=self.service,
+            customer=self.user,
+            start=self.appointment.start + timedelta(hours=2),
+            end=self.appointment.end + timedelta(hours=2),
+        )
+        self.appointment.status = Appointment.Status.CONFIRMED
+        self.appointment.save()
+        response = self.client.get(url, {'updated_since': cursor, 'fields': 'status'})
+        self.assertEqual(response.data['results'], [{'status': 'pending'}, {'status': 'confirmed'}])
+        cursor = response.data['cursor']
+        
+        deleted_id = other.id
+        other.delete()
+        response = self.client.get(url, {'updated_since': cursor})
+        self.assertEqual(response.data['results'], [])
+        self.assertEqual(response.data['deleted'], [deleted_id])
+        
+        response = self.client.get(url, {'updated_since': 'nie-kursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    @override_settings(APPOINTMENT_SYNC_BATCH_SIZE=1, APPOINTMENT_SYNC_CURSOR_LAG=0)
+    def test_delta_sync_pages_through_changes(self):
+        """A full page hands out a cursor continuing right after its last row."""
+        Appointment.objects.create(
+            business=self.business,
+            service=self.service,
+            customer=self.user,
+            start=self.appointment.start + timedelta(hours=2),
+            end=self.appointment.end + timedelta(hours=2),
+        )
+        url = reverse('customer-appointments-list')
+        seen, cursor, has_more = [], '', True
+        while has_more:
+            response = self.client.get(url, {'updated_since': cursor})
+            seen += [row['id'] for row in response.data['results']]
+            cursor, has_more = response.data['cursor'], response.data['has_more']
+        
+        self.assertEqual(len(seen), 2)
+        self.assertEqual(len(set(seen)), 2)
+    
+    @override_settings(APPOINTMENT_SYNC_CURSOR_LAG=60)
+    def test_delta_sync_resends_changes_committed_behind_the_cursor(self):
+        """A change stamped before a cursor was issued but committed later still arrives."""
+        url = reverse('customer-appointments-list')
+        response = self.client.get(url, {'updated_since': ''})
+        cursor = response.data['cursor']
+        
+        # Saved by a transaction that was still open during the sync above.
+        late = Appointment.objects.create(
+            business=self.business,
+            service=self.service,
+            customer=self.user,
+            start=self.appointment.start + timedelta(hours=2),
+            end=self.appointment.end + timedelta(hours=2),
+        )
+        Appointment.objects.filter(pk=late.pk).update(updated_at=timezone.now() - timedelta(seconds=30))
+        
+        response = self.client.get(url, {'updated_since': cursor})
+        ids = [row['id'] for row in response.data['results']]
+        self.assertIn(str(late.id), ids)
+        # Changes within the lag window are sent again.
+        self.assertIn(str(self.appointment.id), ids)
+        self.assertFalse(response.data['has_more'])
+    
+    @override_settings(APPOINTMENT_SYNC_BATCH_SIZE=2, APPOINTMENT_SYNC_CURSOR_LAG=0)
+    def test_delta_sync_pages_tombstones_with_the_changes(self):
+        """Deletions count towards the page size; a full sync skips them."""
+        url = reverse('customer-appointments-list')
+        cursor = self.client.get(url, {'updated_since': ''}).data['cursor']
+        deleted = []
+        for hours in (2, 4, 6):
+            appointment = Appointment.objects.create(
+                business=self.business,
+                service=self.service,
+                customer=self.user,
+                start=self.appointment.start + timedelta(hours=hours),
+                end=self.appointment.end + timedelta(hours=hours),
+            )
+            deleted.append(appointment.id)
+            appointment.delete()
+        self.appointment.save()
+        
+        response = self.client.get(url, {'updated_since': ''})
+        self.assertEqual(response.data['deleted'], [])
+        self.assertEqual(len(response.data['results']), 1)
+        
+        seen, removed, has_more = [], [], True
+        while has_more:
+            response = self.client.get(url, {'updated_since': cursor})
+            self.assertLessEqual(len(response.data['results']) + len(response.data['deleted']), 2)
+            self.assertFalse(response.data['reset'])
+            seen += [row['id'] for row in response.data['results']]
+            removed += response.data['deleted']
+            cursor, has_more = response.data['cursor'], response.data['has_more']
+        self.assertEqual(seen, [str(self.appointment.id)])
+        self.assertEqual(sorted(removed), sorted(deleted))
+    
+    @override_settings(APPOINTMENT_SYNC_RETENTION_DAYS=30)
+    def test_delta_sync_past_the_retention_window_resets(self):
+        """Tombstones are pruned after the retention window; older cursors resync in full."""
+        url = reverse('customer-appointments-list')
+        cursor = self.client.get(url, {'updated_since': ''}).data['cursor']
+        AppointmentTombstone.objects.create(appointment_id=self.appointment.id, customer=self.user)
+        AppointmentTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=31))
+        old_cursor = encode_cursor((timezone.now() - timedelta(days=40), None))
+        
+        out = StringIO()
+        call_command('prune_sync_tombstones', stdout=out)
+        self.assertIn('Usunieto znacznikow usuniecia: 1', out.getvalue())
+        self.assertFalse(AppointmentTombstone.objects.exists())
+        
+        response = self.client.get(url, {'updated_since': old_cursor})
+        self.assertTrue(response.data['reset'])
+        self.assertEqual([row['id'] for row in response.data['results']], [str(self.appointment.id)])
+        response = self.client.get(url, {'updated_since': cursor})
+        self.assertFalse(response.data['reset'])
+    
     def test_filter_appointments_by_status(self):
         """Test filtering appointments by status."""
         url = reverse('customer-appointments-list')
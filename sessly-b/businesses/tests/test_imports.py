@@ -0,0 +1,173 @@
+import io
+import os
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from businesses.imports import OpeningHourImporter, ServiceImporter, read_rows
+from businesses.models import (
+    Appointment,
+    Business,
+    BusinessDailyStats,
+    BusinessOpeningHour,
+    BusinessService,
+    BusinessStaff,
+)
+
+User = get_user_model()
+WARSAW = ZoneInfo("Europe/Warsaw")
+
+
+def make_business():
+    return Business.objects.create(
+        name="Salon Import",
+        slug="salon-import",
+        category=Business.Category.HAIRDRESSER,
+        timezone="Europe/Warsaw",
+        address_line1="ul. Hurtowa 1",
+        city="Lodz",
+        postal_code="90-001",
+        country="Polska",
+    )
+
+
+class ImporterTests(TestCase):
+    def setUp(self):
+        self.business = make_business()
+        BusinessService.objects.create(business=self.business, name="Strzyzenie", duration_minutes=30)
+
+    def test_services_from_csv_report_invalid_rows(self):
+        data = (
+            "name,duration_minutes,price_amount,description\n"
+            "Koloryzacja,90,200.00,\n"
+            "strzyzenie,30,,\n"
+            "Modelowanie,abc,,\n"
+            "Koloryzacja,60,,duplikat\n"
+            "Grzywka,15,,\n"
+        ).encode()
+
+        result = ServiceImporter(self.business, chunk_size=1).run(read_rows(io.BytesIO(data), "csv"))
+
+        self.assertEqual((result.imported, result.failed), (2, 3))
+        self.assertEqual([error["row"] for error in result.errors], [2, 3, 4])
+        self.assertIn("duration_minutes", result.errors[1]["errors"])
+        coloring = BusinessService.objects.get(business=self.business, name="Koloryzacja")
+        self.assertEqual((coloring.duration_minutes, coloring.price_amount), (90, Decimal("200.00")))
+        self.assertTrue(BusinessService.objects.filter(business=self.business, name="Grzywka").exists())
+
+    def test_opening_hours_upsert_and_dry_run(self):
+        BusinessOpeningHour.objects.create(
+            business=self.business, day_of_week=0, open_time=time(8), close_time=time(16)
+        )
+        data = (
+            b'[{"day_of_week": 0, "open_time": "10:00", "close_time": "18:00"},'
+            b' {"day_of_week": 6, "is_closed": true},'
+            b' {"day_of_week": 1, "open_time": "18:00", "close_time": "10:00"}]'
+        )
+
+        result = OpeningHourImporter(self.business, dry_run=True).run(read_rows(io.BytesIO(data), "json"))
+        self.assertEqual((result.imported, result.failed, result.dry_run), (2, 1, True))
+        self.assertEqual(BusinessOpeningHour.objects.get(business=self.business).open_time, time(8))
+
+        result = OpeningHourImporter(self.business).run(read_rows(io.BytesIO(data), "json"))
+        self.assertEqual((result.imported, result.failed), (2, 1))
+        hours = {hour.day_of_week: hour for hour in BusinessOpeningHour.objects.filter(business=self.business)}
+        self.assertEqual(sorted(hours), [0, 6])
+        self.assertEqual((hours[0].open_time, hours[0].close_time), (time(10), time(18)))
+        self.assertTrue(hours[6].is_closed)
+
+
+class ImportCommandTests(TestCase):
+    def test_imports_appointments_from_json_lines(self):
+        business = make_business()
+        BusinessService.objects.create(
+            business=business, name="Strzyzenie", duration_minutes=30, price_amount=Decimal("50.00")
+        )
+        stylist = User.objects.create_user(username="fryzjer", email="fryzjer@example.com", password="x")
+        staff = BusinessStaff.objects.create(business=business, user=stylist)
+        existing = User.objects.create_user(username="stala", email="stala@example.com", password="x")
+        path = self._write(
+            '{"service": "strzyzenie", "start": "2025-03-03T09:00", "customer_email": "Stala@example.com"}\n'
+            '\n'
+            '{"service": "Strzyzenie", "start": "2025-03-03T10:00", "customer_email": "nowa@example.com",'
+            ' "customer_first_name": "Ewa", "staff": "fryzjer", "status": "cancelled"}\n'
+            '{"service": "Manicure", "start": "2025-03-03T11:00", "customer_email": "nowa@example.com"}\n'
+        )
+        out, err = io.StringIO(), io.StringIO()
+
+        call_command("import_business_data", business.slug, "appointments", path, "--type=jsonl", stdout=out, stderr=err)
+
+        self.assertIn("Zaimportowano wierszy: 2, odrzucono: 1", out.getvalue())
+        self.assertIn("Wiersz 3", err.getvalue())
+        first, second = Appointment.objects.filter(business=business).order_by("start")
+        self.assertEqual(first.customer, existing)
+        self.assertEqual(first.start, datetime(2025, 3, 3, 9, tzinfo=WARSAW))
+        self.assertEqual(first.end, datetime(2025, 3, 3, 9, 30, tzinfo=WARSAW))
+        self.assertEqual(first.status, Appointment.Status.CONFIRMED)
+        self.assertEqual((second.staff, second.status), (staff, Appointment.Status.CANCELLED))
+        customer = second.customer
+        self.assertEqual((customer.email, customer.first_name, customer.is_active), ("nowa@example.com", "Ewa", False))
+        self.assertFalse(customer.has_usable_password())
+
+        stats = BusinessDailyStats.objects.filter(business=business, date=date(2025, 3, 3))
+        self.assertEqual(sum(row.confirmed for row in stats), 1)
+        self.assertEqual(sum(row.cancelled for row in stats), 1)
+        self.assertEqual(sum(row.revenue for row in stats), Decimal("50.00"))
+
+    def test_command_commits_each_chunk(self):
+        business = make_business()
+        path = self._write('{"name": "Broda", "duration_minutes": 20}\n{"name": "Wasy", "duration_minutes": 10}\n')
+        save = ServiceImporter.save
+
+        def failing_save(importer, chunk, result):
+            if chunk[0][0] == 2:
+                raise IntegrityError("wiersz 2")
+            save(importer, chunk, result)
+
+        with mock.patch.object(ServiceImporter, "save", failing_save), self.assertRaises(IntegrityError):
+            call_command(
+                "import_business_data", business.slug, "services", path, "--type=jsonl", "--chunk-size=1",
+                stdout=io.StringIO(),
+            )
+
+        names = BusinessService.objects.filter(business=business).values_list("name", flat=True)
+        self.assertEqual(list(names), ["Broda"])
+
+    def _write(self, content):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8")
+        with handle:
+            handle.write(content)
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+
+
+class ImportApiTests(APITestCase):
+    def test_owner_uploads_services_csv(self):
+        business = make_business()
+        owner = User.objects.create_user(
+            username="szef", email="szef@example.com", password="x", role=User.Role.BUSINESS_OWNER, business=business
+        )
+        self.client.force_authenticate(owner)
+        url = reverse("business-services-import", args=[business.slug])
+        upload = SimpleUploadedFile("uslugi.csv", b"name,duration_minutes\nBroda,20\nWasy,dlugo\n", content_type="text/csv")
+
+        response = self.client.post(url, {"file": upload}, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["imported"], 1)
+        self.assertEqual(response.data["data"]["errors"][0]["row"], 2)
+        self.assertTrue(BusinessService.objects.filter(business=business, name="Broda").exists())
+
+        response = self.client.post(url, {"file": SimpleUploadedFile("uslugi.pdf", b"%PDF")}, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,237 @@
+import csv
+import io
+import zipfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from businesses.models import Appointment, Business, BusinessService, BusinessStaff
+
+User = get_user_model()
+WARSAW = ZoneInfo("Europe/Warsaw")
+
+
+class OwnerAppointmentListTests(APITestCase):
+    def setUp(self):
+        self.business = Business.objects.create(
+            name="Salon Kalendarz",
+            slug="salon-kalendarz",
+            category=Business.Category.HAIRDRESSER,
+            timezone="Europe/Warsaw",
+            address_line1="ul. Terminowa 3",
+            city="Gdansk",
+            postal_code="80-001",
+            country="Polska",
+        )
+        self.service = BusinessService.objects.create(
+            business=self.business, name="Strzyzenie", duration_minutes=30, price_amount=Decimal("60.00")
+        )
+        self.customer = User.objects.create_user(
+            username="klient", email="klient@example.com", password="secret123", first_name="Adam"
+        )
+        self.owner = User.objects.create_user(
+            username="szef",
+            email="szef@example.com",
+            password="secret123",
+            role=User.Role.BUSINESS_OWNER,
+            business=self.business,
+        )
+        self.client.force_authenticate(self.owner)
+        self.url = reverse("business-appointments-list", args=[self.business.slug])
+
+    def book(self, day, hour, status=Appointment.Status.PENDING, staff=None):
+        start = datetime.combine(day, time(hour), tzinfo=WARSAW)
+        return Appointment.objects.create(
+            business=self.business,
+            service=self.service,
+            staff=staff,
+            customer=self.customer,
+            start=start,
+            end=start + timedelta(minutes=30),
+            status=status,
+        )
+
+    def test_list_shares_the_booking_url(self):
+        self.assertEqual(self.url, reverse("business-appointment-create", args=[self.business.slug]))
+        self.book(date(2026, 5, 4), 9)
+
+        response = self.client.get(self.url, {"date_from": "2026-05-01", "date_to": "2026-05-31"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.client.post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("service_id", response.data["error"]["details"])
+        self.assertEqual(self.client.delete(self.url).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_window_is_required(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {"date_from": "2026-01-01", "date_to": "2026-12-31"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pages_through_the_window_in_start_order(self):
+        day = date(2026, 5, 4)
+        late = self.book(day, 15)
+        early = self.book(day, 9)
+        # Local midnight edges: 23:30 belongs to the window, 00:00 next day does not.
+        last = self.book(day + timedelta(days=1), 23)
+        self.book(day + timedelta(days=2), 0)
+        self.book(day - timedelta(days=1), 23)
+        params = {"date_from": "2026-05-04", "date_to": "2026-05-05", "limit": 2}
+
+        # Savepoint pair from ATOMIC_REQUESTS, the business and the page.
+        with self.assertNumQueries(4):
+            first = self.client.get(self.url, params)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in first.data["results"]], [str(early.id), str(late.id)])
+        self.assertEqual(first.data["results"][0]["customer_first_name"], "Adam")
+        self.assertTrue(first.data["has_more"])
+
+        second = self.client.get(self.url, {**params, "cursor": first.data["cursor"]})
+        self.assertEqual([row["id"] for row in second.data["results"]], [str(last.id)])
+        self.assertFalse(second.data["has_more"])
+        self.assertIsNone(second.data["cursor"])
+
+    def test_status_filter_and_invalid_parameters(self):
+        day = date(2026, 5, 4)
+        self.book(day, 9)
+        confirmed = self.book(day, 10, status=Appointment.Status.CONFIRMED)
+        params = {"date_from": "2026-05-04", "date_to": "2026-05-04"}
+
+        response = self.client.get(self.url, {**params, "status": "confirmed"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [str(confirmed.id)])
+
+        response = self.client.get(self.url, {**params, "status": "done"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {**params, "cursor": "nie-kursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_confirm(self):
+        appointment = self.book(date(2026, 5, 4), 9)
+        url = reverse("business-appointments-confirm", args=[self.business.slug, appointment.id])
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], Appointment.Status.CONFIRMED)
+        self.assertEqual(response.data["business"], self.business.slug)
+        self.assertEqual(response.data["customer_email"], "klient@example.com")
+
+    def test_agenda_groups_by_staff_and_day(self):
+        self.service.color = "#ff8800"
+        self.service.save()
+        barber = BusinessStaff.objects.create(
+            business=self.business,
+            user=User.objects.create_user(
+                username="marek", email="marek@example.com", password="secret123", first_name="Marek"
+            ),
+        )
+        day = date(2026, 3, 28)
+        # The night Poland moves to summer time: minutes follow the wall clock.
+        summer = self.book(day + timedelta(days=1), 9, staff=barber)
+        first = self.book(day, 9, staff=barber)
+        unassigned = self.book(day, 10)
+        self.book(day, 11, status=Appointment.Status.CANCELLED, staff=barber)
+        url = reverse("business-appointments-agenda", args=[self.business.slug])
+
+        # Savepoint pair from ATOMIC_REQUESTS, the business and the agenda.
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {"date_from": "2026-03-28", "date_to": "2026-03-29"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["timezone"], "Europe/Warsaw")
+        self.assertEqual([group["name"] for group in data["staff"]], ["Marek", None])
+        marek = data["staff"][0]
+        self.assertEqual([day["date"] for day in marek["days"]], ["2026-03-28", "2026-03-29"])
+        entry = marek["days"][0]["appointments"][0]
+        self.assertEqual(
+            entry,
+            {
+                "id": str(first.id),
+                "start": 540,
+                "end": 570,
+                "status": "pending",
+                "service_id": str(self.service.id),
+                "service": "Strzyzenie",
+                "color": "#ff8800",
+                "customer": "Adam",
+            },
+        )
+        self.assertEqual(marek["days"][1]["appointments"][0]["id"], str(summer.id))
+        self.assertEqual(marek["days"][1]["appointments"][0]["start"], 540)
+        self.assertEqual(data["staff"][1]["days"][0]["appointments"][0]["id"], str(unassigned.id))
+
+        response = self.client.get(url, {"date_from": "2026-03-01", "date_to": "2026-04-30"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_streams_csv_and_xlsx(self):
+        self.book(date(2026, 5, 4), 9)
+        self.book(date(2026, 5, 5), 10, status=Appointment.Status.CONFIRMED)
+        self.book(date(2026, 6, 1), 10)
+        url = reverse("business-appointments-export", args=[self.business.slug])
+        params = {"date_from": "2026-05-01", "date_to": "2026-05-31"}
+
+        response = self.client.get(url, params, HTTP_ACCEPT="text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('filename="salon-kalendarz-wizyty.csv"', response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:4], ["id", "start", "end", "status"])
+        self.assertEqual([row[1:4] for row in rows[1:]], [
+            ["2026-05-04 09:00:00", "2026-05-04 09:30:00", "pending"],
+            ["2026-05-05 10:00:00", "2026-05-05 10:30:00", "confirmed"],
+        ])
+        self.assertEqual(rows[1][4:6], ["Strzyzenie", "60.00"])
+
+        response = self.client.get(url, {**params, "status": "confirmed", "type": "xlsx"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        workbook = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row "), 2)
+        self.assertIn("2026-05-05 10:00:00", sheet)
+
+        response = self.client.get(url, {"type": "pdf"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_csv_neutralises_formulas(self):
+        appointment = self.book(date(2026, 5, 4), 9)
+        appointment.notes = '=HYPERLINK("http://example.com","x")'
+        appointment.save()
+        self.customer.last_name = "@SUM(A1)"
+        self.customer.save()
+        url = reverse("business-appointments-export", args=[self.business.slug])
+
+        response = self.client.get(url)
+
+        row = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))[1]
+        self.assertEqual(row[9], "'@SUM(A1)")
+        self.assertEqual(row[11], '\'=HYPERLINK("http://example.com","x")')
+        self.assertEqual(row[5], "60.00")
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        await sync_to_async(self.book)(date(2026, 5, 4), 9)
+        await sync_to_async(self.book)(date(2026, 5, 5), 10)
+        url = reverse("business-appointments-export", args=[self.business.slug])
+        token = await sync_to_async(AccessToken.for_user)(self.owner)
+
+        response = await self.async_client.get(url, headers={"authorization": f"Bearer {token}"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        self.assertTrue(hasattr(response.streaming_content, "__aiter__"))
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual([row[1] for row in rows[1:]], ["2026-05-04 09:00:00", "2026-05-05 10:00:00"])
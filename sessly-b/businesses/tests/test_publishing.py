@@ -0,0 +1,139 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from backend.static import PublishedDirectoryMiddleware
+from businesses.models import Business, BusinessService
+from businesses.publishing import MANIFEST_NAME, DirectoryPublisher, _drain_publish
+
+
+class DirectoryPublishingTests(TestCase):
+    def setUp(self):
+        self.root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(override_settings(DIRECTORY_PUBLISH_ROOT=self.root))
+        # The publish thread would not see the test transaction.
+        self.enterContext(mock.patch("businesses.publishing._submit_drain", lambda: _drain_publish()))
+        self.business = Business.objects.create(
+            name="Publikowany Salon",
+            slug="publikowany-salon",
+            category=Business.Category.HAIRDRESSER,
+            timezone="Europe/Warsaw",
+            address_line1="ul. Statyczna 1",
+            city="Poznan",
+            postal_code="60-001",
+            country="Polska",
+        )
+
+    def manifest(self):
+        return json.loads((self.root / MANIFEST_NAME).read_bytes())["documents"]
+
+    def document(self, name):
+        url = self.manifest()[name]
+        return self.root / url.removeprefix("/static/directory/")
+
+    def test_command_publishes_hashed_precompressed_documents(self):
+        out = StringIO()
+        call_command("publish_directory", stdout=out)
+        self.assertIn("Opublikowano dokumentow", out.getvalue())
+
+        documents = self.manifest()
+        self.assertIn("categories", documents)
+        self.assertIn("businesses", documents)
+        self.assertIn(f"categories/{Business.Category.HAIRDRESSER}", documents)
+        self.assertRegex(documents["businesses/publikowany-salon"], r"^/static/directory/businesses/publikowany-salon\.[0-9a-f]{12}\.json$")
+
+        path = self.document("businesses/publikowany-salon")
+        expected = self.client.get(reverse("business-detail", args=[self.business.slug]))
+        self.assertEqual(path.read_bytes(), expected.content)
+        self.assertEqual(gzip.decompress(path.with_name(path.name + ".gz").read_bytes()), expected.content)
+
+        listing = json.loads(self.document("businesses").read_bytes())
+        self.assertIn("publikowany-salon", [item["slug"] for item in listing["results"]])
+
+    def test_command_drops_documents_of_removed_businesses(self):
+        call_command("publish_directory", stdout=StringIO())
+        Business.objects.filter(pk=self.business.pk).delete()
+        call_command("publish_directory", stdout=StringIO())
+
+        self.assertNotIn("businesses/publikowany-salon", self.manifest())
+        self.assertEqual(list((self.root / "businesses").glob("publikowany-salon.*")), [])
+
+    @override_settings(DIRECTORY_PUBLISH_ENABLED=True, DIRECTORY_PUBLISH_RETAIN_SECONDS=0)
+    def test_changes_are_republished_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            BusinessService.objects.create(
+                business=self.business, name="Strzyzenie", duration_minutes=30, price_amount=60
+            )
+        first = self.document("businesses/publikowany-salon")
+        self.assertEqual(json.loads(first.read_bytes())["services"][0]["name"], "Strzyzenie")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business.slug = "nowy-adres"
+            self.business.save()
+        documents = self.manifest()
+        self.assertNotIn("businesses/publikowany-salon", documents)
+        self.assertIn("businesses/nowy-adres", documents)
+        self.assertFalse(first.exists())
+
+    @override_settings(DIRECTORY_PUBLISH_ENABLED=True)
+    def test_rolled_back_changes_are_not_published(self):
+        with mock.patch.object(DirectoryPublisher, "publish_business", autospec=True) as publish_business:
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    Business.objects.create(
+                        name="Wycofany Salon",
+                        slug="wycofany-salon",
+                        category=Business.Category.BEAUTY,
+                        address_line1="ul. Cofnieta 1",
+                        city="Opole",
+                        postal_code="45-001",
+                        country="Polska",
+                    )
+                    raise RuntimeError
+                self.business.name = "Zmieniony"
+                self.business.save()
+
+        self.assertEqual([call.args[1] for call in publish_business.call_args_list], ["publikowany-salon"])
+
+    @override_settings(DIRECTORY_PUBLISH_ENABLED=True)
+    def test_commits_are_published_together_off_the_request(self):
+        with mock.patch("businesses.publishing._submit_drain") as submit_drain:
+            for name in ("Pierwsza zmiana", "Druga zmiana"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.business.name = name
+                    self.business.save()
+        self.assertEqual(submit_drain.call_count, 1)
+        self.assertFalse((self.root / MANIFEST_NAME).exists())
+
+        with mock.patch.object(DirectoryPublisher, "publish_business", autospec=True) as publish_business:
+            _drain_publish()
+        self.assertEqual([call.args[1] for call in publish_business.call_args_list], ["publikowany-salon"])
+
+    def test_nothing_is_published_when_disabled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.business.name = "Zmieniony"
+            self.business.save()
+        self.assertFalse((self.root / MANIFEST_NAME).exists())
+
+    def test_middleware_serves_documents_published_after_startup(self):
+        middleware = PublishedDirectoryMiddleware(lambda request: HttpResponse(status=404))
+        call_command("publish_directory", stdout=StringIO())
+        url = self.manifest()["businesses/publikowany-salon"]
+
+        response = middleware(RequestFactory().get(url, headers={"Accept-Encoding": "gzip"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("immutable", response["Cache-Control"])
+
+        response = middleware(RequestFactory().get("/static/directory/manifest.json"))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("immutable", response.get("Cache-Control", ""))
@@ -0,0 +1,75 @@
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+
+from backend.parsers import MessagePackParser, ORJSONParser
+from backend.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def assertSameOutput(self, data, renderer_context=None):
+        expected = JSONRenderer().render(data, "application/json", renderer_context)
+        self.assertEqual(ORJSONRenderer().render(data, "application/json", renderer_context), expected)
+
+    def test_native_types_match_stock_renderer(self):
+        self.assertSameOutput(
+            {
+                "id": uuid.uuid4(),
+                "price": Decimal("120.50"),
+                "start": datetime(2026, 1, 5, 9, 30, tzinfo=dt_timezone.utc),
+                "precise": datetime(2026, 1, 5, 9, 30, 0, 1234, tzinfo=dt_timezone(timedelta(hours=1))),
+                "day": date(2026, 1, 5),
+                "slot": time(9, 30),
+                "length": timedelta(minutes=90),
+                "label": gettext_lazy("Salon"),
+                "error": ErrorDetail("Nieprawidłowe dane", code="invalid"),
+                "nested": [{"tuple": (1, 2)}, None, True],
+                "separator": "a\u2028b",
+            }
+        )
+
+    def test_indent_falls_back_to_stock_renderer(self):
+        self.assertSameOutput({"name": "Salon", "count": 2}, {"indent": 2})
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class ORJSONParserTests(SimpleTestCase):
+    def parse(self, body):
+        return ORJSONParser().parse(BytesIO(body), "application/json", {})
+
+    def test_parses_unicode_body(self):
+        self.assertEqual(self.parse('{"notes": "Proszę"}'.encode()), {"notes": "Proszę"})
+
+    def test_rejects_invalid_json(self):
+        with self.assertRaises(ParseError):
+            self.parse(b'{"value": NaN}')
+
+
+class MessagePackTests(SimpleTestCase):
+    def test_round_trip_with_compact_extensions(self):
+        data = {
+            "id": uuid.uuid4(),
+            "start": datetime(2026, 1, 5, 9, 30, tzinfo=dt_timezone.utc),
+            "day": date(2026, 1, 5),
+            "slots": [time(9, 0), time(9, 45, 30)],
+            "price": Decimal("120.50"),
+            "notes": "Proszę",
+        }
+        body = MessagePackRenderer().render(data)
+
+        parsed = MessagePackParser().parse(BytesIO(body))
+        self.assertEqual(parsed["id"], data["id"])
+        self.assertEqual(parsed["start"], data["start"])
+        self.assertEqual(parsed["day"], data["day"])
+        self.assertEqual(parsed["slots"], data["slots"])
+        self.assertEqual(parsed["price"], 120.5)
+        self.assertEqual(parsed["notes"], "Proszę")
+        self.assertLess(len(body), len(ORJSONRenderer().render(data)))
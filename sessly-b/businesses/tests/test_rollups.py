@@ -0,0 +1,153 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from businesses.models import Appointment, Business, BusinessDailyStats, BusinessService
+from businesses.rollups import business_stats, rebuild_daily_stats
+
+User = get_user_model()
+WARSAW = ZoneInfo("Europe/Warsaw")
+
+
+class DailyStatsTests(TestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(username="ewa", email="ewa@example.com", password="secret123")
+        self.business = Business.objects.create(
+            name="Salon Statystyk",
+            slug="salon-statystyk",
+            category=Business.Category.BEAUTY,
+            timezone="Europe/Warsaw",
+            address_line1="ul. Liczbowa 1",
+            city="Lodz",
+            postal_code="90-001",
+            country="Polska",
+        )
+        self.service = BusinessService.objects.create(
+            business=self.business, name="Masaz", duration_minutes=60, price_amount=Decimal("120.00")
+        )
+        self.today = timezone.now().astimezone(WARSAW).date()
+
+    def book(self, days_ahead, hour=10, status=Appointment.Status.PENDING):
+        start = datetime.combine(self.today + timedelta(days=days_ahead), time(hour), tzinfo=WARSAW)
+        return Appointment.objects.create(
+            business=self.business,
+            service=self.service,
+            customer=self.customer,
+            start=start,
+            end=start + timedelta(minutes=60),
+            status=status,
+        )
+
+    def rollup(self):
+        return {
+            row["date"]: row
+            for row in BusinessDailyStats.objects.filter(business=self.business).values(
+                "date", "pending", "confirmed", "cancelled", "created", "booked_minutes", "revenue"
+            )
+        }
+
+    def test_incremental_updates_match_a_rebuild(self):
+        upcoming = self.book(3)
+        done = self.book(-2, status=Appointment.Status.CONFIRMED)
+        moved = self.book(5)
+
+        upcoming.status = Appointment.Status.CANCELLED
+        upcoming.save()
+        moved.start += timedelta(days=1)
+        moved.end += timedelta(days=1)
+        moved.status = Appointment.Status.CONFIRMED
+        moved.save()
+        done.delete()
+
+        incremental = self.rollup()
+        rebuild_daily_stats([self.business])
+        rebuilt = self.rollup()
+        self.assertEqual(
+            {day: row for day, row in incremental.items() if any(v for k, v in row.items() if k != "date")},
+            rebuilt,
+        )
+        self.assertEqual(rebuilt[self.today + timedelta(days=6)]["revenue"], Decimal("120.00"))
+        self.assertEqual(rebuilt[self.today]["created"], 2)
+
+    def test_business_stats(self):
+        self.book(2)
+        self.book(-3, status=Appointment.Status.CONFIRMED)
+        self.book(1, status=Appointment.Status.CANCELLED)
+
+        with self.assertNumQueries(2):
+            stats = business_stats(self.business)
+
+        self.assertEqual(
+            stats,
+            {
+                "total": 3,
+                "upcoming": 1,
+                "confirmed": 1,
+                "completed": 1,
+                "cancelled": 1,
+                "last_30_days": 3,
+                "booked_minutes": 120,
+                "revenue": Decimal("120.00"),
+            },
+        )
+
+    def test_today_is_split_at_the_current_time(self):
+        earlier = self.book(0, hour=9, status=Appointment.Status.CONFIRMED)
+        later = self.book(0, hour=15)
+        now = datetime.combine(self.today, time(12), tzinfo=WARSAW)
+
+        stats = business_stats(self.business, now=now)
+
+        self.assertEqual((stats["completed"], stats["upcoming"]), (1, 1))
+        self.assertLess(earlier.start, now)
+        self.assertGreater(later.start, now)
+
+    def test_unpriced_services_add_no_revenue(self):
+        self.service.price_amount = None
+        self.service.save()
+        appointment = self.book(1, status=Appointment.Status.CONFIRMED)
+        appointment.delete()
+        self.book(2, status=Appointment.Status.CONFIRMED)
+
+        stats = business_stats(self.business)
+
+        self.assertEqual((stats["confirmed"], stats["revenue"]), (1, Decimal("0")))
+        self.assertEqual(rebuild_daily_stats([self.business]), 2)
+
+    def test_price_change_is_booked_before_a_cancellation(self):
+        appointment = self.book(1, status=Appointment.Status.CONFIRMED)
+        self.book(1, hour=12, status=Appointment.Status.CONFIRMED)
+        self.service.price_amount = Decimal("150.00")
+        self.service.save()
+
+        self.assertEqual(business_stats(self.business)["revenue"], Decimal("300.00"))
+        appointment.status = Appointment.Status.CANCELLED
+        appointment.save()
+        self.assertEqual(business_stats(self.business)["revenue"], Decimal("150.00"))
+
+        self.service.price_amount = None
+        self.service.save()
+        self.book(2, status=Appointment.Status.CONFIRMED).delete()
+        self.assertEqual(business_stats(self.business)["revenue"], Decimal("0"))
+        incremental = self.rollup()
+        rebuild_daily_stats([self.business])
+        self.assertEqual(self.rollup()[self.today + timedelta(days=1)], incremental[self.today + timedelta(days=1)])
+
+    def test_deleting_the_business_drops_its_rollup(self):
+        self.book(1)
+        self.business.delete()
+        self.assertFalse(BusinessDailyStats.objects.exists())
+
+    def test_rebuild_command(self):
+        self.book(1)
+        BusinessDailyStats.objects.update(pending=7)
+        out = StringIO()
+        call_command("rebuild_business_stats", self.business.slug, stdout=out)
+        self.assertIn("Zapisano wierszy statystyk", out.getvalue())
+        self.assertEqual(business_stats(self.business)["upcoming"], 1)
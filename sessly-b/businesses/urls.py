@@ -1,15 +1,25 @@
+from django.conf import settings
 from django.urls import path, include
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.routers import DefaultRouter
 
 from .views import (
     BusinessAppointmentCreateView,
     BusinessAvailabilityView,
     BusinessCategoryListView,
+    BusinessCityListView,
     BusinessDetailView,
     BusinessListView,
     BusinessStaffViewSet,
+    ServiceSearchView,
     BusinessAppointmentViewSet,
 )
+from .async_views import (
+    AsyncBusinessAvailabilityView,
+    AsyncBusinessAvailabilityStreamView,
+    AsyncBusinessDetailView,
+    AsyncBusinessListView,
+)
 from .customer_views import CustomerAppointmentViewSet
 from .owner_views import (
     BusinessManagementViewSet,
@@ -17,6 +27,20 @@ from .owner_views import (
     BusinessOpeningHoursViewSet,
 )
 
+
+def by_method(**views):
+    """
+    One URL served by a view per HTTP method; other methods go to the GET
+    view, which answers 405. URLs resolve before methods are looked at.
+    """
+    @csrf_exempt
+    def view(request, *args, **kwargs):
+        handler = views.get(request.method.lower(), views["get"])
+        return handler(request, *args, **kwargs)
+
+    return view
+
+
 router = DefaultRouter()
 
 # Business owner routes
@@ -44,11 +68,38 @@ router.register(
     basename="business-appointments",
 )
 
+if settings.ASYNC_READ_VIEWS:
+    BusinessListView = AsyncBusinessListView
+    BusinessDetailView = AsyncBusinessDetailView
+    BusinessAvailabilityView = AsyncBusinessAvailabilityView
+
 urlpatterns = [
     path("categories/", BusinessCategoryListView.as_view(), name="business-category-list"),
+    path("cities/", BusinessCityListView.as_view(), name="business-city-list"),
+    path("services/search/", ServiceSearchView.as_view(), name="service-search"),
     path("", BusinessListView.as_view(), name="business-list"),
     path("<slug:slug>/", BusinessDetailView.as_view(), name="business-detail"),
     path("<slug:slug>/availability/", BusinessAvailabilityView.as_view(), name="business-availability"),
-    path("<slug:slug>/appointments/", BusinessAppointmentCreateView.as_view(), name="business-appointment-create"),
+    # Owners list the appointments (also reversible as
+    # "business-appointments-list") where customers book one.
+    path(
+        "<slug:slug>/appointments/",
+        by_method(
+            get=BusinessAppointmentViewSet.as_view({"get": "list"}),
+            post=BusinessAppointmentCreateView.as_view(),
+        ),
+        name="business-appointment-create",
+    ),
     path("", include(router.urls)),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    # Under WSGI the stream would be buffered until it closes.
+    urlpatterns.insert(
+        0,
+        path(
+            "<slug:slug>/availability/stream/",
+            AsyncBusinessAvailabilityStreamView.as_view(),
+            name="business-availability-stream",
+        ),
+    )
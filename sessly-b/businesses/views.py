@@ -1,96 +1,349 @@
-from django.db.models import Count, Prefetch, Q
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import F, Min, Prefetch, Q
 from django.shortcuts import get_object_or_404
-from rest_framework import generics, status
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import generics, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from .models import Business, BusinessService
+from backend.caching import is_cacheable_request, payload_response, store_rendered_content
+from backend.fieldsets import parse_field_selection
+from backend.renderers import IgnoreClientContentNegotiation
+from users.permissions import IsBusinessOwner
+from .agenda import build_agenda
+from .cache import (
+    business_detail_cache_key,
+    business_list_cache,
+    business_list_tags,
+    get_or_render_business_detail,
+)
+from .conditional import (
+    business_availability_etag,
+    business_categories_etag,
+    business_detail_etag,
+    business_detail_last_modified,
+    serves_stale_availability,
+    stale_availability_etag,
+)
+from .counters import get_directory_counts
+from .exports import export_response
+from .imports import AppointmentImporter, import_request
+from .models import Appointment, Business, BusinessDirectoryCounter, BusinessService, BusinessStaff
+from .owner_appointments import PAGE_COLUMNS, appointment_page, appointments_in_window
 from .serializers import (
+    ADMIN_APPOINTMENT_ROWS,
+    AdminAppointmentSerializer,
     AppointmentCreateSerializer,
     BusinessAvailabilitySerializer,
     BusinessDetailSerializer,
-    BusinessListSerializer,
+    BusinessListingSerializer,
+    BusinessStaffSerializer,
+    OwnerAgendaQuerySerializer,
+    OwnerAppointmentExportQuerySerializer,
+    OwnerAppointmentListQuerySerializer,
+    ServiceSearchQuerySerializer,
+    ServiceSearchResultSerializer,
+)
+from .services import (
+    BUSINESS_FACETS,
+    PRICE_BANDS,
+    annotate_price_band,
+    business_facet_counts,
+    business_listing_queryset,
+    group_services_by_business,
+    service_search_queryset,
 )
 
 
 class BusinessCategoryListView(APIView):
     permission_classes = (AllowAny,)
+    cache_max_age = 60
 
+    @method_decorator(condition(etag_func=business_categories_etag))
     def get(self, request):
-        counts = (
-            Business.objects.values("category").annotate(total=Count("id")).order_by()
-        )
-        count_map = {entry["category"]: entry["total"] for entry in counts}
+        count_map = get_directory_counts(BusinessDirectoryCounter.Dimension.CATEGORY)
 
         data = [
             {"slug": value, "name": label, "count": count_map.get(value, 0)}
             for value, label in Business.Category.choices
         ]
-        return Response(data, status=status.HTTP_200_OK)
+        response = Response(data, status=status.HTTP_200_OK)
+        patch_cache_control(response, public=True, max_age=self.cache_max_age)
+        return response
+
+
+class BusinessCityListView(APIView):
+    permission_classes = (AllowAny,)
+    cache_max_age = 60
+
+    def get(self, request):
+        count_map = get_directory_counts(BusinessDirectoryCounter.Dimension.CITY)
+        data = [
+            {"name": city, "count": total}
+            for city, total in sorted(count_map.items(), key=lambda item: (-item[1], item[0]))
+        ]
+        response = Response(data, status=status.HTTP_200_OK)
+        patch_cache_control(response, public=True, max_age=self.cache_max_age)
+        return response
 
 
 class BusinessListView(generics.ListAPIView):
-    serializer_class = BusinessListSerializer
+    serializer_class = BusinessListingSerializer
     permission_classes = (AllowAny,)
 
-    def get_queryset(self):
-        queryset = Business.objects.prefetch_related(
-            Prefetch(
-                "services", queryset=BusinessService.objects.filter(is_active=True)
-            )
-        )
+    def get_filtered_queryset(self):
+        queryset = Business.objects.all()
         category = self.request.query_params.get("category")
         if category:
             queryset = queryset.filter(category=category)
 
+        city = self.request.query_params.get("city")
+        if city:
+            queryset = queryset.filter(city__iexact=city.strip())
+
         search = self.request.query_params.get("search")
         if search:
             queryset = queryset.filter(
                 Q(name__icontains=search) | Q(city__icontains=search)
             )
 
+        price_band = self.request.query_params.get("price_band")
+        if price_band:
+            if price_band not in {band for band, _, _ in PRICE_BANDS}:
+                raise ValidationError({"price_band": "Nieznany przedzial cenowy"})
+            queryset = annotate_price_band(queryset).filter(price_band=price_band)
+
         return queryset
 
+    def get_requested_facets(self):
+        raw = self.request.query_params.get("facets", "")
+        facets = [item.strip() for item in raw.split(",") if item.strip()]
+        unknown = [facet for facet in facets if facet not in BUSINESS_FACETS]
+        if unknown:
+            raise ValidationError({"facets": f"Nieobslugiwane facety: {', '.join(unknown)}"})
+        return list(dict.fromkeys(facets))
+
+    def get_selection(self):
+        if not hasattr(self, "_selection"):
+            self._selection = parse_field_selection(self.request, BusinessListingSerializer().fields)
+        return self._selection
+
+    def get_queryset(self):
+        return business_listing_queryset(self.get_filtered_queryset(), fields=self.get_selection().fields)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["selection"] = self.get_selection()
+        return context
+
+    def get_cache_key(self, facets):
+        params = self.request.query_params
+        normalized = (
+            ("category", params.get("category", "")),
+            ("city", params.get("city", "").strip().lower()),
+            ("search", params.get("search", "").strip().lower()),
+            ("price_band", params.get("price_band", "")),
+            ("facets", ",".join(sorted(facets))),
+            ("fields", self.get_selection().cache_token),
+            ("page", params.get(self.paginator.page_query_param, "1")),
+        )
+        return (self.request.accepted_renderer.format,) + normalized
+
+    def get_cached_response(self, facets):
+        """
+        Return ``(cache_key, cached_response)``. The key is ``None`` for
+        requests that are not cached, the response ``None`` on a miss.
+        """
+        if not is_cacheable_request(self.request):
+            return None, None
+        params = self.request.query_params
+        tags = business_list_tags(params.get("category"), params.get("city"))
+        cache_key = business_list_cache.make_key(self.get_cache_key(facets), tags)
+        cached = business_list_cache.get(cache_key)
+        if cached is None:
+            return cache_key, None
+        return cache_key, payload_response(*cached, cache_status="HIT")
+
+    def finalize_listing(self, response, facets, cache_key):
+        if facets:
+            response.data["facets"] = business_facet_counts(self.get_filtered_queryset(), facets)
+        if cache_key is not None:
+            response["X-Cache"] = "MISS"
+            store_rendered_content(
+                response,
+                lambda payload, content_type: business_list_cache.set(cache_key, payload, content_type),
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        facets = self.get_requested_facets()
+        cache_key, cached = self.get_cached_response(facets)
+        if cached is not None:
+            return cached
+
+        response = super().list(request, *args, **kwargs)
+        return self.finalize_listing(response, facets, cache_key)
+
+
+class ServiceSearchView(generics.GenericAPIView):
+    """
+    Search active services across businesses, paginated by business.
+
+    One page costs three queries: the business count, the page of
+    ``(business_id, min_price)`` rows and the matching services of that page.
+    """
+
+    serializer_class = ServiceSearchResultSerializer
+    permission_classes = (AllowAny,)
+
+    def get(self, request):
+        params = ServiceSearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        services = service_search_queryset(params.validated_data)
+
+        business_rows = (
+            services.values("business_id")
+            .annotate(min_price=Min("price_amount"))
+            .order_by(F("min_price").asc(nulls_last=True), "business_id")
+        )
+        page = self.paginate_queryset(business_rows)
+        results = group_services_by_business(services, page)
+        serializer = self.get_serializer(results, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 class BusinessDetailView(generics.RetrieveAPIView):
-    queryset = Business.objects.prefetch_related(
-        Prefetch("services", queryset=BusinessService.objects.filter(is_active=True)),
-        "opening_hours",
-    )
     serializer_class = BusinessDetailSerializer
     lookup_field = "slug"
     permission_classes = (AllowAny,)
+    expandable_fields = ("opening_hours", "services")
+
+    def get_selection(self):
+        if not hasattr(self, "_selection"):
+            self._selection = parse_field_selection(
+                self.request, BusinessDetailSerializer().fields, self.expandable_fields
+            )
+        return self._selection
+
+    def get_queryset(self):
+        selection = self.get_selection()
+        queryset = Business.objects.all()
+        if not selection.is_full:
+            model_fields = {field.name for field in Business._meta.concrete_fields}
+            queryset = queryset.only("id", "slug", *(name for name in selection.fields if name in model_fields))
+        # ``services_count`` is computed from the prefetched active services.
+        if selection.includes("services") or selection.includes("services_count"):
+            queryset = queryset.prefetch_related(
+                Prefetch("services", queryset=BusinessService.objects.filter(is_active=True))
+            )
+        if selection.includes("opening_hours"):
+            queryset = queryset.prefetch_related("opening_hours")
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["selection"] = self.get_selection()
+        return context
+
+    @method_decorator(
+        condition(
+            etag_func=business_detail_etag,
+            last_modified_func=business_detail_last_modified,
+        )
+    )
+    def retrieve(self, request, *args, **kwargs):
+        self.get_selection()
+        if not is_cacheable_request(request):
+            return super().retrieve(request, *args, **kwargs)
+        return self.retrieve_cached(request, *args, **kwargs)
+
+    def retrieve_cached(self, request, *args, **kwargs):
+        """The detail response from the shared cache, rendered on a miss."""
+        cache_key = self.get_cache_key(kwargs["slug"])
+        retrieve = super().retrieve
+        rendered = []
+
+        def render():
+            response = self.finalize_response(request, retrieve(request, *args, **kwargs), *args, **kwargs)
+            response.render()
+            rendered.append(response)
+            return response.content, response["Content-Type"]
+
+        # Concurrent misses for one entry render it once (see get_or_compute).
+        (payload, content_type), _ = get_or_render_business_detail(cache_key, render)
+        if rendered:
+            rendered[0]["X-Cache"] = "MISS"
+            return rendered[0]
+        return payload_response(payload, content_type, cache_status="HIT")
+
+    def get_cache_key(self, slug):
+        return business_detail_cache_key(
+            slug, self.request.accepted_renderer.format, self.get_selection().cache_token
+        )
+
 
 
 class BusinessAvailabilityView(APIView):
     permission_classes = (AllowAny,)
 
-    def get_business(self, slug: str) -> Business:
-        return get_object_or_404(
-            Business.objects.prefetch_related(
-                Prefetch(
-                    "services", queryset=BusinessService.objects.filter(is_active=True)
-                ),
-                "opening_hours",
+    def get_business_queryset(self):
+        return Business.objects.prefetch_related(
+            Prefetch(
+                "services", queryset=BusinessService.objects.filter(is_active=True)
             ),
-            slug=slug,
+            "opening_hours",
         )
 
+    def get_business(self, slug: str) -> Business:
+        return get_object_or_404(self.get_business_queryset(), slug=slug)
+
+    @method_decorator(condition(etag_func=business_availability_etag))
     def get(self, request, slug: str):
         business = self.get_business(slug)
+        return self.availability_response(request, self.get_availability_data(request, business))
+
+    def get_availability_data(self, request, business: Business):
         serializer = BusinessAvailabilitySerializer(
             data=request.query_params,
-            context={"business": business},
+            context={
+                "business": business,
+                "native_times": getattr(request.accepted_renderer, "native_times", False),
+                "allow_stale": serves_stale_availability(request),
+            },
         )
         serializer.is_valid(raise_exception=True)
-        data = serializer.to_representation(
+        return serializer.to_representation(
             {
                 "service": serializer.validated_data["service"],
                 "date": serializer.validated_data["date"],
             }
         )
-        return Response(data, status=status.HTTP_200_OK)
+
+    def availability_response(self, request, data):
+        if not serves_stale_availability(request):
+            return Response(data, status=status.HTTP_200_OK)
+
+        # Shared caches may keep serving the list while they revalidate it;
+        # bookings re-check the slot either way.
+        etag = stale_availability_etag(request, data)
+        response = get_conditional_response(request, etag=etag) or Response(data, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.AVAILABILITY_SWR_SOFT_TTL,
+            stale_while_revalidate=settings.AVAILABILITY_SWR_MAX_STALE - settings.AVAILABILITY_SWR_SOFT_TTL,
+        )
+        return response
 
 
 class BusinessAppointmentCreateView(generics.CreateAPIView):
@@ -128,12 +381,6 @@ class BusinessAppointmentCreateView(generics.CreateAPIView):
         )
 
 
-from rest_framework import viewsets
-from users.permissions import IsBusinessOwner
-from .models import BusinessStaff
-from .serializers import BusinessStaffSerializer
-
-
 class BusinessStaffViewSet(viewsets.ModelViewSet):
     serializer_class = BusinessStaffSerializer
     permission_classes = (IsAuthenticated, IsBusinessOwner)
@@ -145,13 +392,6 @@ class BusinessStaffViewSet(viewsets.ModelViewSet):
         return BusinessStaff.objects.filter(business=business)
 
 
-from rest_framework.decorators import action
-from rest_framework import status
-from .models import Appointment
-from .serializers import AdminAppointmentSerializer
-from django.utils import timezone
-
-
 class BusinessAppointmentViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAuthenticated, IsBusinessOwner)
 
@@ -161,25 +401,107 @@ class BusinessAppointmentViewSet(viewsets.ModelViewSet):
         )
         return business
 
+    def get_appointment(self, business, pk):
+        # Everything AdminAppointmentSerializer reads, in one query.
+        appointment = get_object_or_404(
+            Appointment.objects.select_related("service", "customer").only(
+                *(field.name for field in Appointment._meta.concrete_fields),
+                "customer__email",
+                "customer__first_name",
+                "customer__last_name",
+            ),
+            id=pk,
+            business=business,
+        )
+        appointment.business = business
+        return appointment
+
     def list(self, request, slug):
+        """
+        Appointments starting within ``date_from``..``date_to`` (required,
+        business time zone), optionally of one ``status``, in start order.
+
+        Pages hold ``limit`` appointments; pass the returned ``cursor`` to
+        get the next one while ``has_more`` is set.
+        """
+        business = self.get_business()
+        params = OwnerAppointmentListQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+        selection = parse_field_selection(
+            request, ADMIN_APPOINTMENT_ROWS.field_names, ADMIN_APPOINTMENT_ROWS.nested_field_names
+        )
+        appointments = appointments_in_window(
+            business, query["date_from"], query["date_to"], query.get("status")
+        )
+        page = appointment_page(
+            appointments,
+            query["cursor"],
+            query["limit"],
+            rows=lambda queryset: ADMIN_APPOINTMENT_ROWS.values(queryset, selection, extra=PAGE_COLUMNS),
+        )
+        return Response({
+            "results": ADMIN_APPOINTMENT_ROWS.format(page.rows, selection),
+            "cursor": page.cursor,
+            "has_more": page.has_more,
+        })
+
+    @action(detail=False, methods=["get"])
+    def agenda(self, request, slug):
+        """
+        Calendar agenda of ``date_from``..``date_to`` (required, business
+        time zone): appointments grouped by staff member and day, with
+        start/end as minutes since local midnight and the service color.
+        """
         business = self.get_business()
-        appointments = Appointment.objects.filter(business=business)
-        status_filter = request.query_params.get("status")
-        if status_filter:
-            appointments = appointments.filter(status=status_filter)
+        params = OwnerAgendaQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+        return Response(
+            build_agenda(business, query["date_from"], query["date_to"], query.get("status"))
+        )
 
-        serializer = AdminAppointmentSerializer(appointments, many=True)
-        return Response(serializer.data)
+    @action(detail=False, methods=["get"], content_negotiation_class=IgnoreClientContentNegotiation)
+    def export(self, request, slug):
+        """
+        Stream the appointments as a CSV (default) or XLSX (``?type=xlsx``)
+        file, optionally limited to ``date_from``..``date_to`` and a ``status``.
+        """
+        business = self.get_business()
+        params = OwnerAppointmentExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+        appointments = appointments_in_window(
+            business, query.get("date_from"), query.get("date_to"), query.get("status")
+        )
+        return export_response(
+            business,
+            appointments,
+            query["type"],
+            filename=f"{business.slug}-wizyty",
+            asynchronous=isinstance(request._request, ASGIRequest),
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        parser_classes=[*api_settings.DEFAULT_PARSER_CLASSES, MultiPartParser],
+    )
+    def import_rows(self, request, slug):
+        """
+        Bulk create (historical) appointments from a CSV/JSON/JSON Lines
+        ``file`` upload or a JSON list of rows; ``?dry_run=true`` only
+        validates. Large files go through ``manage.py import_business_data``.
+        """
+        result = import_request(request, self.get_business(), AppointmentImporter)
+        return Response(result.as_dict())
 
     @action(detail=True, methods=["post"])
     def confirm(self, request, slug, pk):
         business = self.get_business()
-
-        appointment = get_object_or_404(
-            Appointment,
-            id=pk,
-            business=business,
-        )
+        appointment = self.get_appointment(business, pk)
 
         appointment.status = Appointment.Status.CONFIRMED
         appointment.confirmed_at = timezone.now()
@@ -191,12 +513,7 @@ class BusinessAppointmentViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"])
     def cancel(self, request, slug, pk):
         business = self.get_business()
-
-        appointment = get_object_or_404(
-            Appointment,
-            id=pk,
-            business=business,
-        )
+        appointment = self.get_appointment(business, pk)
 
         appointment.status = Appointment.Status.CANCELLED
         appointment.save()
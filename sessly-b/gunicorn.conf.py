@@ -0,0 +1,28 @@
+"""
+Gunicorn settings for the ASGI deployment.
+
+    gunicorn backend.asgi:application -c gunicorn.conf.py
+
+Each uvicorn worker runs one event loop, so a handful of workers hold many
+concurrent (and slow) connections; tune with ``WEB_CONCURRENCY``.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Workers only share cache invalidations through a shared cache (REDIS_URL);
+# without one the tag-versioned response caches must stay off. The
+# environment set here is inherited by the forked workers.
+# The same goes for the availability stream: without REDIS_URL a booking only
+# wakes the subscribers connected to the worker that handled it, so run a
+# single worker (WEB_CONCURRENCY=1) if the stream is used without Redis.
+if workers > 1 and not os.environ.get("REDIS_URL"):
+    os.environ.setdefault("RESPONSE_CACHES_ENABLED", "False")
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
@@ -3,7 +3,7 @@ Comprehensive tests for users app.
 """
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -288,3 +288,93 @@ class LogoutTests(TestCase):
         
         self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
 
+
+
+class BatchRequestTests(TestCase):
+    """Tests for the app-launch batch endpoint."""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.batch_url = reverse('api-batch')
+        
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='Test123!@#',
+            is_active=True
+        )
+        
+        from rest_framework_simplejwt.tokens import RefreshToken
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    
+    def test_launch_batch(self):
+        """Every item gets the status and body of its own view."""
+        data = {
+            'requests': [
+                {'path': reverse('me')},
+                {'path': reverse('user_favorites')},
+                {'path': reverse('customer-appointments-list') + '?time=upcoming'},
+                {'path': reverse('business-category-list')},
+                {'path': '/api/businesses/brak-takiego/'},
+            ]
+        }
+        
+        response = self.client.post(self.batch_url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        items = response.data['responses']
+        self.assertEqual([item['status'] for item in items], [200, 200, 200, 200, 404])
+        self.assertEqual(items[0]['body']['email'], self.user.email)
+        self.assertEqual(items[2]['body']['count'], 0)
+        self.assertEqual(items[2]['path'], data['requests'][2]['path'])
+    
+    def test_batch_items_share_anonymous_user(self):
+        """Without credentials the protected items answer 401 on their own."""
+        self.client.credentials()
+        data = {'requests': [{'path': reverse('me')}, {'path': reverse('business-category-list')}]}
+        
+        response = self.client.post(self.batch_url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['status'] for item in response.data['responses']], [401, 200])
+    
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_batch_size_cap(self):
+        """Batches above the limit are rejected as a whole."""
+        data = {'requests': [{'path': reverse('me')}] * 3}
+        
+        response = self.client.post(self.batch_url, data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_batch_rejects_foreign_and_nested_paths(self):
+        """Only GET requests to the API can be batched."""
+        for item in ({'path': '/admin/'}, {'path': reverse('api-batch')}, {'path': reverse('me'), 'method': 'POST'}):
+            response = self.client.post(self.batch_url, {'requests': [item]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_streaming_items_fail_on_their_own(self):
+        """A streamed export is refused per item instead of failing the batch."""
+        from businesses.models import Business
+        business = Business.objects.create(
+            name='Salon Paczka',
+            slug='salon-paczka',
+            category=Business.Category.HAIRDRESSER,
+            address_line1='ul. Zbiorcza 1',
+            city='Poznan',
+            postal_code='60-001',
+            country='Polska',
+        )
+        self.user.role = User.Role.BUSINESS_OWNER
+        self.user.business = business
+        self.user.save(update_fields=['role', 'business'])
+        data = {'requests': [
+            {'path': reverse('business-appointments-export', args=[business.slug])},
+            {'path': reverse('me')},
+        ]}
+
+        response = self.client.post(self.batch_url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['status'] for item in response.data['responses']], [400, 200])